@@ -288,7 +288,8 @@ class Authorize(object):
                                                     merge_lists=merge_lists)
 
         if 'ldap' in auth_data and __opts__.get('auth.ldap.activedirectory', False):
-            auth_data['ldap'] = salt.auth.ldap.expand_ldap_entries(auth_data['ldap'])
+            from salt.auth.ldap import expand_ldap_entries
+            auth_data['ldap'] = expand_ldap_entries(auth_data['ldap'])
             log.debug(auth_data['ldap'])
 
         #for auth_back in self.opts.get('external_auth_sources', []):
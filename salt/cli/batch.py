@@ -5,6 +5,7 @@ Execute batch runs
 
 # Import python libs
 from __future__ import absolute_import, print_function
+import logging
 import math
 import time
 import copy
@@ -14,6 +15,7 @@ from datetime import datetime, timedelta
 import salt.client
 import salt.output
 import salt.exceptions
+import salt.utils.minions
 from salt.utils import print_cli
 
 # Import 3rd-party libs
@@ -22,6 +24,51 @@ import salt.ext.six as six
 from salt.ext.six.moves import range
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 
+log = logging.getLogger(__name__)
+
+# The target types matched from the minion data cache of the master
+CACHE_TARGET_TYPES = ('grain', 'grain_pcre', 'pillar', 'pillar_pcre',
+                      'pillar_exact', 'ipcidr', 'compound',
+                      'compound_pillar_exact', 'nodegroup')
+
+
+def resolve_minions(opts, tgt, expr_form='glob'):
+    '''
+    Return the minions matching a target from the data of the master, without
+    publishing anything: the minions known to be connected, and the other
+    ones
+
+    The connected minions come from the minion data cache, when it is
+    disabled all the matching minions are considered connected. The minions
+    the cache has no data for do not match the target types in
+    ``CACHE_TARGET_TYPES``.
+    '''
+    if expr_form == 'nodegroup':
+        tgt, expr_form = 'N@{0}'.format(tgt), 'compound'
+    ckminions = salt.utils.minions.CkMinions(opts)
+    minions = set(ckminions.check_minions(tgt, expr_form, greedy=False))
+    if not minions or not opts.get('minion_data_cache', False):
+        return sorted(minions), set()
+    connected = ckminions.connected_ids(subset=minions)
+    return sorted(minions & connected), minions - connected
+
+
+def use_presence(opts, expr_form='glob'):
+    '''
+    Whether the minions of a batch run are taken from the targeting data of
+    the master instead of pinging the target. Without the minion data cache
+    only the minions can match grains and pillar, so the target is pinged.
+    '''
+    if not opts.get('batch_presence'):
+        return False
+    if not opts.get('minion_data_cache', False) and \
+            expr_form in CACHE_TARGET_TYPES:
+        log.debug('Pinging the target of the batch run, the minion data '
+                  'cache is needed to match {0} targets on the master'
+                  .format(expr_form))
+        return False
+    return True
+
 
 class Batch(object):
     '''
@@ -33,9 +80,18 @@ class Batch(object):
         self.pub_kwargs = eauth if eauth else {}
         self.quiet = quiet
         self.local = salt.client.get_local_client(opts['conf_file'])
-        self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
+        if use_presence(opts, self.__expr_form()):
+            self.minions, self.ping_gen, self.down_minions = self.__resolve_minions()
+        else:
+            self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
         self.options = parser
 
+    def __expr_form(self):
+        expr_form = self.opts.get('selected_target_option', None)
+        if expr_form is None:
+            expr_form = self.opts.get('expr_form', 'glob')
+        return expr_form
+
     def __gather_minions(self):
         '''
         Return a list of minions to use for the batch run
@@ -74,6 +130,17 @@ class Batch(object):
                 print_cli('No minions matched the target.')
         return list(fret), ping_gen
 
+    def __resolve_minions(self):
+        '''
+        Return the list of minions to use for the batch run from the
+        targeting data of the master, instead of pinging the target
+        '''
+        minions, down_minions = resolve_minions(
+            self.opts, self.opts['tgt'], self.__expr_form())
+        if not minions and not self.quiet:
+            print_cli('No minions matched the target.')
+        return minions, None, down_minions
+
     def get_bnum(self):
         '''
         Return the active number of minions to maintain
@@ -101,9 +168,14 @@ class Batch(object):
         if i:
             del wait[:i]
 
-    def run(self):
+    def run(self, block=True):
         '''
         Execute the batch run
+
+        A new job is published to the next minions as soon as returns free
+        their place in the batch. When ``block`` is False, None is yielded
+        instead of waiting for returns, so that the caller can do other work
+        between two iterations.
         '''
         args = [[],
                 self.opts['fun'],
@@ -117,7 +189,8 @@ class Batch(object):
             return
         to_run = copy.deepcopy(self.minions)
         active = []
-        ret = {}
+        # Only the minions which returned are kept, the returns are yielded
+        returned = set()
         iters = []
         # wait the specified time before decide a job is actually done
         bwait = self.opts.get('batch_wait', 0)
@@ -133,7 +206,7 @@ class Batch(object):
         # the minion tracker keeps track of responses and iterators
         # - it removes finished iterators from iters[]
         # - if a previously detected minion does not respond, its
-        #   added with an empty answer to ret{} once the timeout is reached
+        #   added with an empty answer once the timeout is reached
         # - unresponsive minions are removed from active[] to make
         #   sure that the main while loop finishes even with unresp minions
         minion_tracker = {}
@@ -144,7 +217,7 @@ class Batch(object):
             print_cli('Minion {0} did not respond. No job will be sent.'.format(down_minion))
 
         # Iterate while we still have things to execute
-        while len(ret) < len(self.minions):
+        while len(returned) < len(self.minions):
             next_ = []
             if bwait and wait:
                 self.__update_wait(wait)
@@ -182,31 +255,24 @@ class Batch(object):
                 minion_tracker[new_iter]['minions'] = next_
                 minion_tracker[new_iter]['active'] = True
 
-            else:
-                time.sleep(0.02)
             parts = {}
 
             # see if we found more minions
-            for ping_ret in self.ping_gen:
+            for ping_ret in self.ping_gen or ():
                 if ping_ret is None:
                     break
-                m = next(ping_ret.iterkeys())
+                m = next(six.iterkeys(ping_ret))
                 if m not in self.minions:
                     self.minions.append(m)
                     to_run.append(m)
 
             for queue in iters:
                 try:
-                    # Gather returns until we get to the bottom
-                    ncnt = 0
+                    # Gather the returns received so far
                     while True:
                         part = next(queue)
                         if part is None:
-                            time.sleep(0.01)
-                            ncnt += 1
-                            if ncnt > 5:
-                                break
-                            continue
+                            break
                         if self.opts.get('raw'):
                             parts.update({part['data']['id']: part})
                             if part['data']['id'] in minion_tracker[queue]['minions']:
@@ -241,14 +307,12 @@ class Batch(object):
                     active.remove(minion)
                     if bwait:
                         wait.append(datetime.now() + timedelta(seconds=bwait))
+                returned.add(minion)
                 if self.opts.get('raw'):
-                    ret[minion] = data
                     yield data
                 else:
-                    ret[minion] = data
                     yield {minion: data}
                 if not self.quiet:
-                    ret[minion] = data['ret']
                     data[minion] = data.pop('ret')
                     if 'out' in data:
                         out = data.pop('out')
@@ -270,3 +334,10 @@ class Batch(object):
                             active.remove(minion)
                             if bwait:
                                 wait.append(datetime.now() + timedelta(seconds=bwait))
+
+            if not next_ and not parts and len(returned) < len(self.minions):
+                # don't spin
+                if block:
+                    time.sleep(0.01)
+                else:
+                    yield None
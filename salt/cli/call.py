@@ -45,7 +45,11 @@ class SaltCall(parsers.SaltCallOptionParser):
         self.setup_logfile_logger()
         verify_log(self.config)
 
-        caller = salt.cli.caller.Caller.factory(self.config)
+        caller = None
+        if self._use_exec_service():
+            caller = salt.cli.caller.ServiceCaller.connect(self.config)
+        if caller is None:
+            caller = salt.cli.caller.Caller.factory(self.config)
 
         if self.options.doc:
             caller.print_docs()
@@ -56,3 +60,16 @@ class SaltCall(parsers.SaltCallOptionParser):
             self.exit(salt.defaults.exitcodes.EX_OK)
 
         caller.run()
+
+    def _use_exec_service(self):
+        '''
+        Tell whether the call can run in the local execution service of the
+        running minion, which only runs functions with its own configuration
+        '''
+        if not self.config.get('local_exec_service', False):
+            return False
+        return not (self.options.local or self.options.master
+                    or self.options.file_root or self.options.pillar_root
+                    or self.options.states_dir or self.options.doc
+                    or self.options.grains_run
+                    or self.config.get('file_client') == 'local')
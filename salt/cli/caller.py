@@ -10,6 +10,7 @@ from __future__ import absolute_import, print_function
 import os
 import sys
 import time
+import socket
 import logging
 import traceback
 
@@ -47,6 +48,13 @@ except ImportError:
 
 # Import 3rd-party libs
 import salt.ext.six as six
+try:
+    import msgpack
+    import salt.transport.frame
+    HAS_MSGPACK = True
+except ImportError:
+    # Don't require msgpack with local
+    HAS_MSGPACK = False
 
 # Custom exceptions
 from salt.exceptions import (
@@ -291,6 +299,125 @@ class ZeroMQCaller(BaseCaller):
         channel.send(load)
 
 
+class ServiceCaller(BaseCaller):
+    '''
+    Run the function in the local execution service of the running minion,
+    which already has the modules, grains and pillar loaded
+    '''
+    def __init__(self, opts, sock):  # pylint: disable=super-init-not-called
+        '''
+        Pass in the command line options and the socket connected to the
+        service
+        '''
+        self.opts = opts
+        self.opts['caller'] = True
+        self.serial = salt.payload.Serial(self.opts)
+        self.sock = sock
+
+    @classmethod
+    def connect(cls, opts):
+        '''
+        Return a caller connected to the local execution service of the
+        minion, or None when the service cannot be reached
+        '''
+        if not HAS_MSGPACK:
+            return None
+        sock_path = salt.minion.local_exec_sock_path(opts)
+        if sock_path is None or not os.path.exists(sock_path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(sock_path)
+        except socket.error as exc:
+            log.debug('Unable to connect to the local execution service: '
+                      '{0}'.format(exc))
+            sock.close()
+            return None
+        return cls(opts, sock)
+
+    def send(self, load):
+        '''
+        Send a request to the service, return False when it could not be
+        delivered
+        '''
+        try:
+            self.sock.sendall(salt.transport.frame.frame_msg_ipc(
+                load, header={'mid': 1}, raw_body=True))
+        except socket.error as exc:
+            log.debug('Unable to send the request to the local execution '
+                      'service: {0}'.format(exc))
+            return False
+        return True
+
+    def request(self, load):
+        '''
+        Wait for the reply of the service to a request already sent. Once
+        sent, the function may run in the minion, so it is never run again
+        by salt-call: a SaltClientError is raised when the service did not
+        start it within ``local_exec_timeout`` seconds
+        '''
+        if six.PY2:
+            unpacker = msgpack.Unpacker()
+        else:
+            unpacker = msgpack.Unpacker(encoding='utf-8')
+        started = False
+        self.sock.settimeout(self.opts.get('local_exec_timeout', 10) or None)
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                if started:
+                    raise
+                raise SaltClientError(
+                    'The local execution service of the minion did not start '
+                    '{0} within {1} seconds, it may still run in the '
+                    'minion'.format(load['fun'],
+                                    self.opts.get('local_exec_timeout', 10)))
+            if not data:
+                raise SaltClientError(
+                    'The minion closed the connection to the local '
+                    'execution service')
+            unpacker.feed(data)
+            for framed_msg in unpacker:
+                body = framed_msg['body']
+                if 'started' in body:
+                    # The function runs as long as it needs
+                    started = True
+                    self.sock.settimeout(None)
+                    continue
+                return body
+
+    def call(self):
+        '''
+        Call the function in the minion
+        '''
+        load = {'fun': self.opts['fun'],
+                'arg': self.opts['arg'],
+                'return': [returner for returner in
+                           self.opts.get('return', '').split(',') if returner]}
+        metadata = self.opts.get('metadata')
+        if metadata is not None:
+            load['metadata'] = salt.utils.args.yamlify_arg(metadata)
+        try:
+            if not self.send(load):
+                # The minion never got the request, it is safe to run it here
+                log.warning('The local execution service of the minion is '
+                            'not reachable, running {0} in '
+                            'salt-call'.format(load['fun']))
+                return Caller.factory(self.opts).call()
+            try:
+                reply = self.request(load)
+            except SaltClientError as exc:
+                reply = {'error': str(exc),
+                         'retcode': salt.defaults.exitcodes.EX_GENERIC}
+        finally:
+            self.sock.close()
+        if 'error' in reply:
+            sys.stderr.write('{0}\n'.format(reply['error']))
+            sys.exit(reply.get('retcode', salt.defaults.exitcodes.EX_GENERIC))
+        return reply['ret']
+
+
 def raet_minion_run(cleanup_protecteds):
     '''
     Set up the minion caller. Should be run in its own process.
@@ -4,6 +4,7 @@
 from __future__ import absolute_import, print_function
 import os
 import sys
+import errno
 
 # Import Salt libs
 from salt.ext.six import string_types
@@ -164,13 +165,16 @@ class SaltCMD(parsers.SaltCMDOptionParser):
             else:
                 if self.options.verbose:
                     kwargs['verbose'] = True
+                # Only keep the returns for the summary
+                summary = self.config['cli_summary'] is True and self.options.output is None
                 ret = {}
                 for full_ret in cmd_func(**kwargs):
                     try:
                         ret_, out, retcode = self._format_ret(full_ret)
                         retcodes.append(retcode)
                         self._output_ret(ret_, out)
-                        ret.update(full_ret)
+                        if summary:
+                            ret.update(full_ret)
                     except KeyError:
                         errors.append(full_ret)
 
@@ -229,6 +233,10 @@ class SaltCMD(parsers.SaltCMDOptionParser):
             except salt.exceptions.SaltClientError as exc:
                 sys.exit(2)
 
+            if self.config.get('static_json_lines') and self.options.output == 'json':
+                self._output_json_lines(batch)
+                return
+
             ret = {}
 
             for res in batch.run():
@@ -330,6 +338,38 @@ class SaltCMD(parsers.SaltCMDOptionParser):
                                                   'Requested job was still run but output cannot be displayed.\n')
         salt.output.update_progress(self.config, progress, self.progress_bar, out)
 
+    def _output_json_lines(self, batch):
+        '''
+        Print the returns of a static batch as they come in, one JSON object
+        for each minion on its own line
+        '''
+        import salt.output
+        printer = salt.output.get_printout('json', self.config, output_indent=None)
+        output_filename = self.config.get('output_file')
+        if not output_filename:
+            ofh = sys.stdout
+        elif hasattr(output_filename, 'write'):
+            ofh = output_filename
+        else:
+            ofh = salt.utils.fopen(output_filename, 'a')
+        returned = False
+        try:
+            for res in batch.run():
+                for minion, data in six.iteritems(res):
+                    salt.output.write_stream(ofh, printer({minion: data}) + '\n')
+                    ofh.flush()
+                    returned = True
+        except IOError as exc:
+            # Only raise if it's NOT a broken pipe
+            if exc.errno != errno.EPIPE:
+                raise
+        finally:
+            if ofh is not sys.stdout and ofh is not output_filename:
+                ofh.close()
+        if not returned:
+            sys.stderr.write('ERROR: No return received\n')
+            sys.exit(2)
+
     def _output_ret(self, ret, out):
         '''
         Print the output from a single return to the terminal
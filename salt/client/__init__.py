@@ -21,9 +21,11 @@ The data structure needs to be:
 # Import python libs
 from __future__ import absolute_import, print_function
 import os
+import itertools
 import time
 import random
 import logging
+import weakref
 from datetime import datetime
 
 # Import salt libs
@@ -35,6 +37,7 @@ import salt.loader
 import salt.utils
 import salt.utils.args
 import salt.utils.event
+import salt.utils.job
 import salt.utils.minions
 import salt.utils.verify
 import salt.utils.jid
@@ -64,6 +67,8 @@ except ImportError:
 
 # Import tornado
 import tornado.gen  # pylint: disable=F0401
+import tornado.ioloop  # pylint: disable=F0401
+import tornado.queues  # pylint: disable=F0401
 
 log = logging.getLogger(__name__)
 
@@ -448,6 +453,47 @@ class LocalClient(object):
             {'dave': {...}}
             {'stewart': {...}}
         '''
+        batch = self._get_batch(tgt, fun, arg, expr_form, ret, kwarg, batch, **kwargs)
+        for ret in batch.run():
+            yield ret
+
+    def cmd_batch_no_block(
+            self,
+            tgt,
+            fun,
+            arg=(),
+            expr_form='glob',
+            ret='',
+            kwarg=None,
+            batch='10%',
+            **kwargs):
+        '''
+        Iteratively execute a command on subsets of minions at a time, without
+        blocking while waiting for the returns
+
+        The function signature is the same as :py:meth:`cmd_batch`.
+
+        :returns: A generator of minion returns, which yields None when no
+            return is ready
+
+        .. code-block:: python
+
+            >>> returns = local.cmd_batch_no_block('*', 'state.highstate', batch='10%')
+            >>> for ret in returns:
+            ...     print(ret)
+            None
+            {'jerry': {...}}
+            None
+            {'dave': {...}}
+        '''
+        batch = self._get_batch(tgt, fun, arg, expr_form, ret, kwarg, batch, **kwargs)
+        for ret in batch.run(block=False):
+            yield ret
+
+    def _get_batch(self, tgt, fun, arg, expr_form, ret, kwarg, batch, **kwargs):
+        '''
+        Return the batch run of a command
+        '''
         import salt.cli.batch
         arg = salt.utils.args.condition_input(arg, kwarg)
         opts = {'tgt': tgt,
@@ -460,9 +506,7 @@ class LocalClient(object):
         for key, val in six.iteritems(self.opts):
             if key not in opts:
                 opts[key] = val
-        batch = salt.cli.batch.Batch(opts, quiet=True)
-        for ret in batch.run():
-            yield ret
+        return salt.cli.batch.Batch(opts, quiet=True)
 
     def cmd(
             self,
@@ -956,9 +1000,18 @@ class LocalClient(object):
         # iterator for this job's return
         if self.opts['order_masters']:
             # If we are a MoM, we need to gather expected minions from downstreams masters.
-            ret_iter = self.get_returns_no_block('(salt/job|syndic/.*)/{0}'.format(jid), 'regex')
+            ret_tag, ret_match = '(salt/job|syndic/.*)/{0}'.format(jid), 'regex'
         else:
-            ret_iter = self.get_returns_no_block('salt/job/{0}'.format(jid))
+            ret_tag, ret_match = 'salt/job/{0}'.format(jid), None
+        ret_iter = self.get_returns_no_block(ret_tag, ret_match)
+        # events received while waiting, handled before the next ones
+        waited = []
+        # minions which reported that they are still running the job, and when
+        liveness = None
+        if self.opts.get('job_liveness'):
+            liveness = salt.utils.job.JobLiveness(self.opts)
+        liveness_timeout = self.opts.get('job_liveness_timeout', 30)
+        heartbeats = {}
         # iterator for the info of this job
         jinfo_iter = []
         # open event jids that need to be un-subscribed from later
@@ -975,7 +1028,7 @@ class LocalClient(object):
         )
         while True:
             # Process events until timeout is reached or all minions have returned
-            for raw in ret_iter:
+            for raw in itertools.chain(waited, ret_iter):
                 # if we got None, then there were no events
                 if raw is None:
                     break
@@ -983,6 +1036,11 @@ class LocalClient(object):
                     minions.update(raw['data']['minions'])
                     continue
                 if 'return' not in raw['data']:
+                    id_ = salt.utils.job.heartbeat_minion(raw.get('tag'), jid)
+                    if id_:
+                        # The minion is still running the job
+                        heartbeats[id_] = time.time()
+                        minion_timeouts[id_] = time.time() + timeout
                     continue
                 if kwargs.get('raw', False):
                     found.add(raw['data']['id'])
@@ -1027,9 +1085,23 @@ class LocalClient(object):
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
+                # the minions which recently reported that they are still
+                # running the job do not need to be asked
+                now = time.time()
+                alive = set(id_ for id_, beat in six.iteritems(heartbeats)
+                            if now - beat < liveness_timeout)
+                if liveness is not None:
+                    alive.update(liveness.alive(jid, liveness_timeout))
+                alive &= minions - found
+                for id_ in alive:
+                    minion_timeouts[id_] = now + timeout
                 # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(jid, list(minions - found), 'list', **kwargs)
-                minions_running = False
+                if minions - found - alive:
+                    jinfo = self.gather_job_info(jid, list(minions - found - alive), 'list', **kwargs)
+                else:
+                    log.debug('jid {0} is still running on {1}'.format(jid, alive))
+                    jinfo = {}
+                minions_running = bool(alive)
                 # if we weren't assigned any jid that means the master thinks
                 # we have nothing to send
                 if 'jid' not in jinfo:
@@ -1094,9 +1166,22 @@ class LocalClient(object):
             if done:
                 break
 
-            # don't spin
+            # don't spin, wait for the next event of the job or the next
+            # deadline
+            waited = []
             if block:
-                time.sleep(0.01)
+                now = time.time()
+                deadlines = [timeout_at] + [
+                    minion_timeouts[id_] for id_ in minions - found
+                    if id_ in minion_timeouts]
+                wait = min([deadline - now for deadline in deadlines if deadline > now] or [0])
+                # wake up at least once a second for the syndics and the
+                # replies of find_job
+                wait = min(max(wait, 0.01), 1)
+                raw = self.event.get_event(wait=wait, tag=ret_tag, match_type=ret_match,
+                                           full=True, auto_reconnect=self.auto_reconnect)
+                if raw is not None:
+                    waited.append(raw)
             else:
                 yield
 
@@ -1702,6 +1787,369 @@ class LocalClient(object):
         self.event.unsubscribe('salt/job/{0}'.format(job_id))
 
 
+class JobEventDispatcher(object):
+    '''
+    Share one subscription to the event bus of the master between the
+    asynchronous clients of a process, and dispatch the events of the jobs to
+    the clients waiting for them by jid
+
+    There is one dispatcher per IOLoop and master.
+    '''
+    instance_map = weakref.WeakKeyDictionary()
+
+    def __new__(cls, opts, io_loop=None):
+        '''
+        Only create one dispatcher per io_loop and sock_dir
+        '''
+        if io_loop is None:
+            io_loop = tornado.ioloop.IOLoop.current()
+        if io_loop not in cls.instance_map:
+            cls.instance_map[io_loop] = weakref.WeakValueDictionary()
+        loop_instance_map = cls.instance_map[io_loop]
+        key = opts['sock_dir']
+        dispatcher = loop_instance_map.get(key)
+        if dispatcher is None:
+            log.debug('Initializing new JobEventDispatcher for {0}'.format(key))
+            dispatcher = object.__new__(cls)
+            dispatcher.__singleton_init__(opts, io_loop)
+            loop_instance_map[key] = dispatcher
+        return dispatcher
+
+    def __init__(self, opts, io_loop=None):
+        pass
+
+    def __singleton_init__(self, opts, io_loop):
+        self.opts = opts
+        self.io_loop = io_loop
+        # jid -> queues of the clients waiting for the events of the job
+        self.jobs = {}
+        self.event = salt.utils.event.get_event(
+                'master',
+                opts['sock_dir'],
+                opts['transport'],
+                opts=opts,
+                listen=True,
+                io_loop=io_loop)
+        self.event.set_event_handler(self._handle_event)
+
+    @tornado.gen.coroutine
+    def connect(self, timeout=None):
+        '''
+        Wait until the subscription to the event bus is connected
+        '''
+        if not self.event.subscriber.connected():
+            yield self.event.subscriber.connect(timeout=timeout)
+
+    def subscribe(self, jid):
+        '''
+        Return a queue receiving the events of a job
+        '''
+        queue = tornado.queues.Queue()
+        self.jobs.setdefault(jid, []).append(queue)
+        return queue
+
+    def unsubscribe(self, jid, queue):
+        '''
+        Stop sending the events of a job to a queue
+        '''
+        queues = self.jobs.get(jid, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self.jobs.pop(jid, None)
+
+    def _handle_event(self, raw):
+        '''
+        Send an event to the queues of its job
+        '''
+        if not self.jobs:
+            return
+        mtag, data = self.event.unpack(raw, self.event.serial)
+        # The jid is in the tags of the jobs (salt/job/<jid>/...) and of the
+        # syndics (syndic/<syndic id>/<jid>/...)
+        for part in mtag.split('/')[2:4]:
+            if part in self.jobs:
+                for queue in self.jobs[part]:
+                    queue.put_nowait({'tag': mtag, 'data': data})
+                break
+
+
+class JobReturnIterator(object):
+    '''
+    Iterate over the returns of a job as they arrive, see
+    :py:meth:`AsyncLocalClient.iter_returns`
+    '''
+    def __init__(self, client, jid, queue, timeout):
+        self.client = client
+        self.io_loop = client.io_loop
+        self.jid = jid
+        self.queue = queue
+        self.timeout = timeout
+        self.minions = set()
+        self.found = set()
+        self.closed = False
+        # Whether a coroutine waits in next(), and when it last returned
+        self.waiting = False
+        self.last_read = self.io_loop.time()
+
+    @tornado.gen.coroutine
+    def next(self):
+        '''
+        Wait for the next return, ``{<minion id>: <return data>}``, or None
+        when the iteration ended
+        '''
+        self.waiting = True
+        try:
+            deadline = self.io_loop.time() + self.timeout
+            while not self.closed and (not self.minions or
+                                       self.minions - self.found):
+                try:
+                    raw = yield self.queue.get(timeout=deadline)
+                except tornado.gen.TimeoutError:
+                    break
+                data = raw['data']
+                if 'minions' in data:
+                    self.minions.update(data['minions'])
+                    continue
+                if salt.utils.job.heartbeat_minion(raw['tag'], self.jid):
+                    deadline = self.io_loop.time() + self.timeout
+                    continue
+                id_ = data.get('id')
+                if 'return' not in data or not id_:
+                    continue
+                ret = {'ret': data['return']}
+                for key in ('out', 'retcode', 'jid'):
+                    if key in data:
+                        ret[key] = data[key]
+                self.found.add(id_)
+                raise tornado.gen.Return({id_: ret})
+            self.close()
+        finally:
+            self.waiting = False
+            self.last_read = self.io_loop.time()
+
+    def close(self):
+        '''
+        Stop receiving the events of the job
+        '''
+        if not self.closed:
+            self.closed = True
+            self.client._release(self.jid, self)
+
+
+class AsyncLocalClient(object):
+    '''
+    The coroutine interface of the :py:class:`LocalClient`, for the tornado
+    applications running many jobs at once
+
+    The clients of a process running on the same IOLoop share one
+    subscription to the event bus of the master, the returns are dispatched to
+    the jobs waiting for them by jid.
+
+    .. code-block:: python
+
+        import salt.client
+        import tornado.gen
+
+        @tornado.gen.coroutine
+        def fib():
+            local = salt.client.AsyncLocalClient()
+            ret = yield local.cmd('*', 'test.fib', [10])
+    '''
+    def __init__(self,
+                 c_path=os.path.join(syspaths.CONFIG_DIR, 'master'),
+                 mopts=None, io_loop=None):
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.local = LocalClient(c_path, mopts=mopts, io_loop=self.io_loop)
+        self.opts = self.local.opts
+        self.dispatcher = JobEventDispatcher(self.opts, io_loop=self.io_loop)
+        # jid -> JobReturnIterator of the jobs run with listen=True, until
+        # their returns are read
+        self.queues = {}
+
+    @tornado.gen.coroutine
+    def run_job(
+            self,
+            tgt,
+            fun,
+            arg=(),
+            expr_form='glob',
+            ret='',
+            timeout=None,
+            jid='',
+            kwarg=None,
+            listen=True,
+            **kwargs):
+        '''
+        Publish a command to the targeted minions
+
+        The function signature is the same as :py:meth:`LocalClient.run_job`.
+        When ``listen`` is True, the returns of the job are queued from the
+        time it is published until they are read with :py:meth:`iter_returns`
+        or :py:meth:`get_returns`. They are dropped when they were not read for
+        ``timeout`` seconds.
+
+        :return: A dictionary of (validated) ``pub_data`` or an empty
+            dictionary on failure.
+        '''
+        arg = salt.utils.args.condition_input(arg, kwarg)
+        timeout = self.local._get_timeout(timeout)
+        if listen:
+            # Subscribe before publishing, to not miss the fast returns
+            if not jid:
+                jid = salt.utils.jid.gen_jid()
+            yield self.dispatcher.connect(timeout=timeout)
+            self.queues[jid] = self._subscribe(jid, timeout)
+        try:
+            pub_data = yield self.local.pub_async(
+                tgt,
+                fun,
+                arg,
+                expr_form,
+                ret,
+                jid=jid,
+                timeout=timeout,
+                io_loop=self.io_loop,
+                listen=False,
+                **kwargs)
+        except SaltClientError:
+            self._release(jid)
+            raise SaltClientError(
+                'The salt master could not be contacted. Is master running?'
+            )
+        except Exception as general_exception:
+            self._release(jid)
+            raise SaltClientError(general_exception)
+
+        pub_data = self.local._check_pub_data(pub_data)
+        if pub_data:
+            # The events are read from the dispatcher, not from the event of
+            # the LocalClient
+            self.local._clean_up_subscriptions(pub_data['jid'])
+        else:
+            self._release(jid)
+        raise tornado.gen.Return(pub_data)
+
+    def _subscribe(self, jid, timeout):
+        '''
+        Subscribe to the events of a job, the subscription is released when
+        its returns were not read for ``timeout`` seconds
+        '''
+        returns = JobReturnIterator(
+            self, jid, self.dispatcher.subscribe(jid), timeout)
+        self.io_loop.call_later(timeout, self._expire, returns)
+        return returns
+
+    def _expire(self, returns):
+        '''
+        Release the subscription of a job nobody reads the returns of
+        '''
+        if returns.closed:
+            return
+        idle = self.io_loop.time() - returns.last_read
+        if returns.waiting or idle < returns.timeout:
+            self.io_loop.call_later(
+                max(returns.timeout - idle, returns.timeout / 10.0),
+                self._expire, returns)
+            return
+        log.debug('The returns of job {0} were not read for {1} seconds, '
+                  'dropping them'.format(returns.jid, returns.timeout))
+        returns.close()
+
+    def _release(self, jid, returns=None):
+        '''
+        Drop the subscription of a job
+        '''
+        if returns is None:
+            returns = self.queues.get(jid)
+            if returns is None:
+                return
+        returns.closed = True
+        if self.queues.get(jid) is returns:
+            del self.queues[jid]
+        self.dispatcher.unsubscribe(jid, returns.queue)
+
+    @tornado.gen.coroutine
+    def iter_returns(self, jid, minions, timeout=None):
+        '''
+        Return a :py:class:`JobReturnIterator` over the returns of a job, as
+        they arrive
+
+        The iteration ends when all the minions returned, or when nothing was
+        heard from them for ``timeout`` seconds. The heartbeats of the
+        minions running the job count as news.
+
+        .. code-block:: python
+
+            returns = yield local.iter_returns(pub_data['jid'], pub_data['minions'])
+            while True:
+                ret = yield returns.next()
+                if ret is None:
+                    break
+        '''
+        timeout = self.local._get_timeout(timeout)
+        returns = self.queues.pop(jid, None)
+        if returns is None or returns.closed:
+            yield self.dispatcher.connect()
+            returns = self._subscribe(jid, timeout)
+        returns.timeout = timeout
+        returns.minions.update(minions)
+        returns.last_read = self.io_loop.time()
+        raise tornado.gen.Return(returns)
+
+    @tornado.gen.coroutine
+    def get_returns(self, jid, minions, timeout=None, callback=None):
+        '''
+        Wait for the returns of a job, see :py:meth:`iter_returns`
+
+        :param callback: Called with ``{<minion id>: <return data>}`` for each
+            return as it arrives
+
+        :return: A dictionary of the return data of the minions which returned
+        '''
+        returns = yield self.iter_returns(jid, minions, timeout=timeout)
+        found = {}
+        while True:
+            ret = yield returns.next()
+            if ret is None:
+                break
+            found.update(ret)
+            if callback is not None:
+                callback(ret)
+        raise tornado.gen.Return(found)
+
+    @tornado.gen.coroutine
+    def cmd(
+            self,
+            tgt,
+            fun,
+            arg=(),
+            timeout=None,
+            expr_form='glob',
+            ret='',
+            jid='',
+            kwarg=None,
+            **kwargs):
+        '''
+        Execute a command on the targeted minions and return their returns
+
+        The function signature is the same as :py:meth:`LocalClient.cmd`.
+
+        .. code-block:: python
+
+            >>> ret = yield local.cmd('*', 'cmd.run', ['whoami'])
+            {'jerry': 'root'}
+        '''
+        pub_data = yield self.run_job(
+            tgt, fun, arg, expr_form, ret, timeout, jid, kwarg, listen=True, **kwargs)
+        if not pub_data:
+            raise tornado.gen.Return(pub_data)
+        rets = yield self.get_returns(
+            pub_data['jid'], pub_data['minions'], timeout=timeout)
+        raise tornado.gen.Return(
+            dict((id_, data['ret']) for id_, data in six.iteritems(rets)))
+
+
 class FunctionWrapper(dict):
     '''
     Create a function wrapper that looks like the functions dict on the minion
@@ -14,7 +14,6 @@ import copy as pycopy
 
 # Import Salt libs
 import salt.exceptions
-import salt.minion
 import salt.utils
 import salt.utils.doc
 import salt.utils.error
@@ -222,7 +221,7 @@ class SyncClientMixin(object):
             kwarg['__kwarg__'] = True
             arglist.append(kwarg)
 
-        args, kwargs = salt.minion.load_args_and_kwargs(
+        args, kwargs = salt.utils.args.load_args_and_kwargs(
             self.functions[fun], arglist, pub_data
         )
         low = {'fun': fun,
@@ -233,6 +232,7 @@ class SyncClientMixin(object):
     @property
     def mminion(self):
         if not hasattr(self, '_mminion'):
+            import salt.minion
             self._mminion = salt.minion.MasterMinion(self.opts, states=False, rend=False)
         return self._mminion
 
@@ -309,6 +309,9 @@ class SSH(object):
                                              overwrite=self.opts['regen_thin'],
                                              python2_bin=self.opts['python2_bin'],
                                              python3_bin=self.opts['python3_bin'])
+        if self.opts.get('ssh_thin_chunks'):
+            # Split the thin tarball once, before the routines need it
+            salt.utils.thin.thin_chunks(self.opts['cachedir'])
         self.mods = mod_data(self.fsclient)
 
     def get_pubkey(self):
@@ -446,11 +449,14 @@ class SSH(object):
         returned = set()
         rets = set()
         init = False
+        max_procs = self.opts.get('ssh_max_procs', 25)
         while True:
             if not self.targets:
                 log.error('No matching targets found in roster.')
                 break
-            if len(running) < self.opts.get('ssh_max_procs', 25) and not init:
+            # The routines which sent their return are exiting, they do not
+            # hold a place anymore
+            if len(set(running) - returned) < max_procs and not init:
                 try:
                     host = next(target_iter)
                 except StopIteration:
@@ -474,7 +480,14 @@ class SSH(object):
                 continue
             ret = {}
             try:
-                ret = que.get(False)
+                # Wait for the next return. The routines which exit without
+                # sending one are found within a second, the ones which sent
+                # one are joined right away.
+                if returned.intersection(running):
+                    timeout = 0.01
+                else:
+                    timeout = 1
+                ret = que.get(True, timeout)
                 if 'id' in ret:
                     returned.add(ret['id'])
                     yield {ret['id']: ret['ret']}
@@ -512,9 +525,6 @@ class SSH(object):
                     running.pop(host)
             if len(rets) >= len(self.targets):
                 break
-            # Sleep when limit or all threads started
-            if len(running) >= self.opts.get('ssh_max_procs', 25) or len(self.targets) >= len(running):
-                time.sleep(0.1)
 
     def run_iter(self, mine=False, jid=None):
         '''
@@ -801,6 +811,26 @@ class Single(object):
         self.deploy_ext()
         return True
 
+    def deploy_chunks(self, chunks):
+        '''
+        Deploy the chunks of salt-thin missing on the target
+        '''
+        if '_caller_cachedir' in self.opts:
+            cachedir = self.opts['_caller_cachedir']
+        else:
+            cachedir = self.opts['cachedir']
+        # Only send the chunks of the current thin tarball
+        known = salt.utils.thin.thin_chunks(cachedir)
+        paths = [salt.utils.thin.thin_chunk_path(cachedir, chunk)
+                 for chunk in chunks if chunk in known]
+        if paths:
+            self.shell.send(
+                ' '.join(paths),
+                '{0}_chunks/'.format(self.thin_dir.rstrip('/')),
+            )
+        self.deploy_ext()
+        return True
+
     def deploy_ext(self):
         '''
         Deploy the ext_mods tarball
@@ -992,6 +1022,9 @@ class Single(object):
         else:
             cachedir = self.opts['cachedir']
         thin_sum = salt.utils.thin.thin_sum(cachedir, 'sha1')
+        thin_chunks = []
+        if self.opts.get('ssh_thin_chunks'):
+            thin_chunks = salt.utils.thin.thin_chunks(cachedir, 'sha1')
         debug = ''
         if not self.opts.get('log_level'):
             self.opts['log_level'] = 'info'
@@ -1012,6 +1045,7 @@ OPTIONS.ext_mods = '{6}'
 OPTIONS.wipe = {7}
 OPTIONS.tty = {8}
 OPTIONS.cmd_umask = {9}
+OPTIONS.chunks = {11}
 ARGS = {10}\n'''.format(self.minion_config,
                          RSTR,
                          self.thin_dir,
@@ -1022,7 +1056,8 @@ ARGS = {10}\n'''.format(self.minion_config,
                          self.wipe,
                          self.tty,
                          self.cmd_umask,
-                         self.argv)
+                         self.argv,
+                         thin_chunks)
         py_code = SSH_PY_SHIM.replace('#%%OPTS', arg_str)
         if six.PY2:
             py_code_enc = py_code.encode('base64')
@@ -1124,8 +1159,12 @@ ARGS = {10}\n'''.format(self.minion_config,
             # is a SHIM command for the master.
             shim_command = re.split(r'\r?\n', stdout, 1)[0].strip()
             log.debug('SHIM retcode({0}) and command: {1}'.format(retcode, shim_command))
-            if 'deploy' == shim_command and retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY:
-                self.deploy()
+            if retcode == salt.defaults.exitcodes.EX_THIN_DEPLOY and \
+                    shim_command.split(' ', 1)[0] in ('deploy', 'chunks'):
+                if shim_command == 'deploy':
+                    self.deploy()
+                else:
+                    self.deploy_chunks(shim_command.split()[1:])
                 stdout, stderr, retcode = self.shim_cmd(cmd_str)
                 if not re.search(RSTR_RE, stdout) or not re.search(RSTR_RE, stderr):
                     if not self.tty:
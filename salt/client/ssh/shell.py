@@ -8,6 +8,7 @@ from __future__ import absolute_import
 import re
 import os
 import json
+import hashlib
 import time
 import logging
 import subprocess
@@ -128,6 +129,37 @@ class Shell(object):
             ret.append('-o {0} '.format(option))
         return ''.join(ret)
 
+    def control_path(self):
+        '''
+        Return the path of the socket shared by the connections to the host
+        '''
+        key = '{0}@{1}:{2}'.format(self.user or '', self.host, self.port or '')
+        return os.path.join(
+            self.opts['cachedir'],
+            'ssh_control',
+            hashlib.sha1(salt.utils.to_bytes(key)).hexdigest()[:20])
+
+    def _control_opts(self):
+        '''
+        Return options making the ssh and scp commands to the host share one
+        connection, kept open between the runs of salt-ssh
+        '''
+        persist = self.opts.get('ssh_control_persist')
+        # ControlPersist is available since OpenSSH 5.6
+        if not persist or self.opts.get('_ssh_version', (0,)) < (5, 6):
+            return ''
+        path = self.control_path()
+        if not os.path.isdir(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path), 0o700)
+            except OSError:
+                if not os.path.isdir(os.path.dirname(path)):
+                    raise
+        options = ['ControlMaster=auto',
+                   'ControlPath={0}'.format(path),
+                   'ControlPersist={0}'.format(persist)]
+        return ''.join('-o {0} '.format(option) for option in options)
+
     def _passwd_opts(self):
         '''
         Return options to pass to ssh
@@ -223,6 +255,9 @@ class Shell(object):
             command.append(self.host)
         if self.tty and ssh == 'ssh':
             command.append('-t -t')
+        control_opts = self._control_opts()
+        if control_opts:
+            command.append(control_opts)
         if self.passwd or self.priv:
             command.append(self.priv and self._key_opts() or self._passwd_opts())
         if ssh != 'scp' and self.remote_port_forwards:
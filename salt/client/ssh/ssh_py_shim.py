@@ -36,6 +36,8 @@ class OBJ(object):
 
 OPTIONS = None
 ARGS = None
+# Set once the thin directory was rebuilt from its chunks
+CHUNKS_UNPACKED = False
 # The below line is where OPTIONS can be redefined with internal options
 # (rather than cli arguments) when the shim is bundled by
 # client.ssh.Single._cmd_str()
@@ -43,42 +45,102 @@ ARGS = None
 #%%OPTS
 
 
-def need_deployment():
+def prep_dir(path):
     """
-    Salt thin needs to be deployed - prep the target directory and emit the
-    delimeter and exit code that signals a required deployment.
+    Create an empty directory only usable by the current user
     """
-    if os.path.exists(OPTIONS.saltdir):
-        shutil.rmtree(OPTIONS.saltdir)
+    if os.path.exists(path):
+        shutil.rmtree(path)
     old_umask = os.umask(0o077)
-    os.makedirs(OPTIONS.saltdir)
+    os.makedirs(path)
     os.umask(old_umask)
-    # Verify perms on saltdir
+    # Verify perms on the directory
     euid = os.geteuid()
-    dstat = os.stat(OPTIONS.saltdir)
+    dstat = os.stat(path)
     if dstat.st_uid != euid:
         # Attack detected, try again
-        need_deployment()
+        return prep_dir(path)
     if dstat.st_mode != 16832:
         # Attack detected
-        need_deployment()
+        return prep_dir(path)
     # If SUDOing then also give the super user group write permissions
     sudo_gid = os.environ.get('SUDO_GID')
     if sudo_gid:
         try:
-            os.chown(OPTIONS.saltdir, -1, int(sudo_gid))
-            stt = os.stat(OPTIONS.saltdir)
-            os.chmod(OPTIONS.saltdir, stt.st_mode | stat.S_IWGRP | stat.S_IRGRP | stat.S_IXGRP)
+            os.chown(path, -1, int(sudo_gid))
+            stt = os.stat(path)
+            os.chmod(path, stt.st_mode | stat.S_IWGRP | stat.S_IRGRP | stat.S_IXGRP)
         except OSError:
             sys.stdout.write('\n\nUnable to set permissions on thin directory.\nIf sudo_user is set '
                     'and is not root, be certain the user is in the same group\nas the login user')
             sys.exit(1)
 
+
+def need_deployment():
+    """
+    Salt thin needs to be deployed - prep the target directory and emit the
+    delimeter and exit code that signals a required deployment.
+    """
+    if OPTIONS.chunks:
+        need_chunks()
+    prep_dir(OPTIONS.saltdir)
+
     # Delimiter emitted on stdout *only* to indicate shim message to master.
     sys.stdout.write("{0}\ndeploy\n".format(OPTIONS.delimiter))
     sys.exit(EX_THIN_DEPLOY)
 
 
+def chunks_dir():
+    """
+    Return the directory keeping the chunks of salt thin between deployments
+    """
+    return OPTIONS.saltdir.rstrip(os.sep) + '_chunks'
+
+
+def need_chunks():
+    """
+    Salt thin needs to be deployed from its chunks - rebuild the target
+    directory from the chunks already there and run, or emit the delimiter,
+    the missing chunks and the exit code that signals a required deployment.
+    """
+    global CHUNKS_UNPACKED
+    cdir = chunks_dir()
+    if os.path.isdir(cdir):
+        dstat = os.stat(cdir)
+        # prep_dir gives the super user group access when SUDOing
+        sudo_gid = os.environ.get('SUDO_GID')
+        mask = 0o007 if sudo_gid else 0o077
+        if dstat.st_uid != os.geteuid() or dstat.st_mode & mask or \
+                (sudo_gid and str(dstat.st_gid) != sudo_gid):
+            prep_dir(cdir)
+    else:
+        prep_dir(cdir)
+    missing = []
+    for chunk in OPTIONS.chunks:
+        path = os.path.join(cdir, chunk + '.tgz')
+        if os.path.isfile(path) and (CHUNKS_UNPACKED or get_hash(path, OPTIONS.hashfunc) != chunk):
+            # A thin rebuilt from these chunks is broken, get them again
+            os.unlink(path)
+        if not os.path.isfile(path):
+            missing.append(chunk)
+    prep_dir(OPTIONS.saltdir)
+    if missing:
+        sys.stdout.write("{0}\nchunks {1}\n".format(OPTIONS.delimiter, ' '.join(missing)))
+        sys.exit(EX_THIN_DEPLOY)
+    old_umask = os.umask(0o077)
+    for chunk in OPTIONS.chunks:
+        tfile = tarfile.TarFile.gzopen(os.path.join(cdir, chunk + '.tgz'))
+        tfile.extractall(path=OPTIONS.saltdir)
+        tfile.close()
+    os.umask(old_umask)
+    # Drop the chunks of the previous versions
+    for name in os.listdir(cdir):
+        if name[:-4] not in OPTIONS.chunks:
+            os.unlink(os.path.join(cdir, name))
+    CHUNKS_UNPACKED = True
+    sys.exit(main(ARGS))
+
+
 # Adapted from salt.utils.get_hash()
 def get_hash(path, form='sha1', chunk_size=4096):
     """Generate a hash digest string for a file."""
@@ -232,6 +294,8 @@ def main(argv):  # pylint: disable=W0613
         shutil.rmtree(OPTIONS.saltdir)
     else:
         subprocess.call(salt_argv)
+    if OPTIONS.wipe and os.path.isdir(chunks_dir()):
+        shutil.rmtree(chunks_dir())
     if OPTIONS.cmd_umask is not None:
         os.umask(old_umask)
 
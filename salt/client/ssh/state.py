@@ -5,10 +5,14 @@ Create ssh executor system
 from __future__ import absolute_import
 # Import python libs
 import os
+import time
+import errno
+import hashlib
 import tarfile
 import tempfile
 import json
 import shutil
+import logging
 from contextlib import closing
 
 # Import salt libs
@@ -23,6 +27,11 @@ import salt.state
 import salt.loader
 import salt.minion
 
+log = logging.getLogger(__name__)
+
+# The number of seconds an unused state tarball is kept in the cache
+TRANS_TAR_TTL = 3600
+
 
 class SSHState(salt.state.State):
     '''
@@ -185,6 +194,14 @@ def prep_trans_tar(file_client, chunks, file_refs, pillar=None, id_=None):
                             os.makedirs(tgt_dir)
                         shutil.copy(filename, tgt)
                     continue
+    # The targets with the same lowstate, pillar and files get the same
+    # tarball, only build it once
+    tar_cache = os.path.join(file_client.opts['cachedir'], 'salt-ssh', 'trans_tar')
+    cached = os.path.join(tar_cache, '{0}.tgz'.format(_trans_tar_sum(gendir)))
+    if _reuse_trans_tar(cached, trans_tar):
+        shutil.rmtree(gendir)
+        return trans_tar
+
     try:
         # cwd may not exist if it was removed but salt was run from it
         cwd = os.getcwd()
@@ -199,4 +216,75 @@ def prep_trans_tar(file_client, chunks, file_refs, pillar=None, id_=None):
     if cwd:
         os.chdir(cwd)
     shutil.rmtree(gendir)
+    _cache_trans_tar(trans_tar, tar_cache, cached)
     return trans_tar
+
+
+def _trans_tar_sum(gendir):
+    '''
+    Return a checksum of the names and contents of the files of a state
+    tarball
+    '''
+    hasher = hashlib.sha256()
+    for root, dirs, files in os.walk(gendir):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            hasher.update(salt.utils.to_bytes(full[len(gendir):].lstrip(os.sep)))
+            hasher.update(b'\0')
+            hasher.update(salt.utils.to_bytes(salt.utils.get_hash(full, 'sha256')))
+    return hasher.hexdigest()
+
+
+def _reuse_trans_tar(cached, trans_tar):
+    '''
+    Put the cached state tarball in place of trans_tar, return False when
+    there is no such tarball. trans_tar is only replaced by a complete
+    tarball, and stays in place when the cached one cannot be used.
+    '''
+    if not os.path.isfile(cached):
+        return False
+    tmp = '{0}.reuse'.format(trans_tar)
+    try:
+        os.utime(cached, None)
+        os.link(cached, tmp)
+    except OSError:
+        # The cache is not on the same file system, or was cleaned meanwhile
+        try:
+            tmp = salt.utils.files.mkstemp(dir=os.path.dirname(trans_tar))
+            shutil.copyfile(cached, tmp)
+        except (IOError, OSError):
+            salt.utils.safe_rm(tmp)
+            return False
+    try:
+        os.rename(tmp, trans_tar)
+    except OSError:
+        salt.utils.safe_rm(tmp)
+        return False
+    return True
+
+
+def _cache_trans_tar(trans_tar, tar_cache, cached):
+    '''
+    Keep a copy of a state tarball for the next targets, drop the tarballs
+    which were not used for a while. The tarballs hold the pillar, only the
+    user running salt-ssh can read them.
+    '''
+    try:
+        if not os.path.isdir(tar_cache):
+            os.makedirs(tar_cache, 0o700)
+        tmp = salt.utils.files.mkstemp(dir=tar_cache)
+        shutil.copyfile(trans_tar, tmp)
+        os.chmod(tmp, 0o600)
+        os.rename(tmp, cached)
+        oldest = time.time() - TRANS_TAR_TTL
+        for name in os.listdir(tar_cache):
+            path = os.path.join(tar_cache, name)
+            try:
+                if os.stat(path).st_mtime < oldest:
+                    os.remove(path)
+            except OSError as exc:
+                if exc.errno != errno.ENOENT:
+                    raise
+    except (IOError, OSError) as exc:
+        log.debug('Unable to cache the state tarball: {0}'.format(exc))
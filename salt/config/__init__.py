@@ -211,6 +211,18 @@ VALID_OPTS = {
     # Rendrerer blacklist. Renderers from this list are disalloed even if specified in whitelist.
     'renderer_blacklist': list,
 
+    # Memoize template renders whose grains, pillar and file inputs are unchanged
+    'render_cache': bool,
+
+    # The maximum number of templates kept in the render cache
+    'render_cache_size': int,
+
+    # The number of seconds a memoized render stays valid
+    'render_cache_ttl': int,
+
+    # The renderers whose output may be memoized
+    'render_cache_renderers': list,
+
     # A flag indicating that a highstate run should immediately cease if a failure occurs.
     'failhard': bool,
 
@@ -300,6 +312,21 @@ VALID_OPTS = {
     # Whether or not processes should be forked when needed. The alternative is to use threading.
     'multiprocessing': bool,
 
+    # The number of pre-forked processes running the jobs published to the
+    # minion, 0 forks a process per job
+    'minion_job_workers': int,
+
+    # The number of jobs a job worker runs before being replaced, 0 for no
+    # limit
+    'minion_job_worker_max_jobs': int,
+
+    # Serve the salt-call requests in the running minion, over a unix socket
+    'local_exec_service': bool,
+
+    # The number of seconds salt-call waits for the local execution service to
+    # start the function before running it itself
+    'local_exec_timeout': int,
+
     # Whether or not the salt minion should run scheduled mine updates
     'mine_enabled': bool,
 
@@ -309,6 +336,10 @@ VALID_OPTS = {
     # Schedule a mine update every n number of seconds
     'mine_interval': int,
 
+    # Keep the returns of mine.get in the cachedir and only have the master send the
+    # mine data again when it changed
+    'mine_get_cache': bool,
+
     # The ipc strategy. (i.e., sockets versus tcp, etc)
     'ipc_mode': str,
 
@@ -385,6 +416,17 @@ VALID_OPTS = {
     # Tell the loader to attempt to import *.zip archives
     'enable_zip_modules': bool,
 
+    # Keep the listings of the module dirs in an index under the cachedir,
+    # they are only read again when the mtime of the dir changed
+    'loader_index_cache': bool,
+
+    # Keep the results of the __virtual__ functions of the modules under the
+    # cachedir, unavailable modules are then skipped without being imported
+    'virtual_cache': bool,
+
+    # The number of seconds the cached results of __virtual__ are kept for
+    'virtual_cache_expiration': int,
+
     # Tell the client to show minions that have timed out
     'show_timeout': bool,
 
@@ -397,6 +439,9 @@ VALID_OPTS = {
     # Specify the format for state outputs. See highstate outputter for additional details.
     'state_output': str,
 
+    # The number of slowest sls files and states shown for profiled state runs
+    'state_profile_top': int,
+
     # Tells the highstate outputter to only report diffs of states that changed
     'state_output_diff': bool,
 
@@ -406,6 +451,14 @@ VALID_OPTS = {
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # Reuse the compiled low chunks of a highstate while its top file, SLS
+    # files, pillar and grains are unchanged
+    'state_compile_cache': bool,
+
+    # Share one snapshot of the package database between the pkg states of a
+    # state run and install the packages of the whole run in one transaction
+    'state_pkg_snapshot': bool,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -461,6 +514,26 @@ VALID_OPTS = {
     'return_retry_timer': int,
     'return_retry_timer_max': int,
 
+    # Write the returns which could not be sent to the master to a spool on
+    # disk and send them again in batches once the master can be reached
+    'return_spool': bool,
+
+    # The maximum number of returns kept in the return spool
+    'return_spool_max': int,
+
+    # The number of spooled returns sent to the master in one request
+    'return_spool_batch': int,
+
+    # The interval in seconds at which the return spool is sent to the master
+    'return_spool_interval': int,
+
+    # The interval in seconds over which the events fired on the master by
+    # the beacons and event.fire_master are queued and sent together
+    'minion_event_coalesce': float,
+
+    # The maximum number of events sent to the master in one request
+    'minion_event_coalesce_max': int,
+
     # Specify one or more returners in which all events will be sent to. Requires that the returners
     # in question have an event_return(event) function!
     'event_return': (list, string_types),
@@ -692,6 +765,10 @@ VALID_OPTS = {
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Keep the mine data of the minions indexed by function in the cache of the master
+    # to answer mine.get without reading the mine of every targeted minion
+    'mine_index': bool,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
@@ -733,6 +810,14 @@ VALID_OPTS = {
     # generated RSA key if that file doesn't exist.
     'ssh_use_home_key': bool,
 
+    # The number of seconds salt-ssh keeps the connection to a host open for
+    # the next commands and runs, 0 opens a new connection for each command
+    'ssh_control_persist': int,
+
+    # Deploy salt-thin to the salt-ssh targets as content addressed chunks, so
+    # that only the chunks missing on a target are sent
+    'ssh_thin_chunks': bool,
+
     # The logfile location for salt-key
     'key_logfile': str,
 
@@ -762,6 +847,18 @@ VALID_OPTS = {
     # The number of minutes between the minion refreshing its cache of grains
     'grains_refresh_every': int,
 
+    # The number of threads used to run the grain functions, 0 runs them one
+    # after the other
+    'grains_concurrency': int,
+
+    # The number of seconds a grain function run on a thread may take before
+    # its grains are skipped, 0 waits forever
+    'grains_timeout': float,
+
+    # Seconds after which the results of the grain functions matching a glob
+    # are computed again on a grains refresh, other grain functions are reused
+    'grains_refresh_ttl': dict,
+
     # Use lspci to gather system data for grains on a minion
     'enable_lspci': bool,
 
@@ -791,6 +888,30 @@ VALID_OPTS = {
     # The number of seconds to wait when the client is requesting information about running jobs
     'gather_job_timeout': int,
 
+    # Track the minions still running a job from the heartbeats they send, so
+    # that clients do not need to publish saltutil.find_job to them
+    'job_liveness': bool,
+
+    # The number of seconds a job heartbeat keeps a minion counted as running
+    # the job
+    'job_liveness_timeout': int,
+
+    # Take the minions of a batch run from the targeting data and the minion
+    # data cache of the master instead of pinging the target first
+    'batch_presence': bool,
+
+    # Record when the master last saw each minion, so that manage.up, manage.down and
+    # manage.present do not need to ping the minions
+    'presence_table': bool,
+
+    # The number of seconds a minion which does not hold a connection to the master stays
+    # present after the master last saw it
+    'presence_timeout': int,
+
+    # The interval in seconds at which a minion tells the master which jobs it
+    # is still running
+    'job_heartbeat': int,
+
     # The number of seconds to wait before timing out an authentication request
     'auth_timeout': int,
 
@@ -862,6 +983,10 @@ VALID_OPTS = {
     # Instructs the salt CLI to print a summary of a minion responses before returning
     'cli_summary': bool,
 
+    # Instructs the salt CLI to print the returns of --static --out=json as they come in, one
+    # JSON object per minion and line
+    'static_json_lines': bool,
+
     # The maximum number of minion connections allowed by the master. Can have performance
     # implications in large setups.
     'max_minions': int,
@@ -960,12 +1085,19 @@ DEFAULT_MINION_OPTS = {
     'grains_cache': False,
     'grains_cache_expiration': 300,
     'grains_deep_merge': False,
+    'grains_concurrency': 0,
+    'grains_timeout': 0,
+    'grains_refresh_ttl': {},
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'minion'),
     'sock_dir': os.path.join(salt.syspaths.SOCK_DIR, 'minion'),
     'backup_mode': '',
     'renderer': 'yaml_jinja',
     'renderer_whitelist': [],
     'renderer_blacklist': [],
+    'render_cache': False,
+    'render_cache_size': 1024,
+    'render_cache_ttl': 300,
+    'render_cache_renderers': ['jinja', 'yaml', 'yamlex', 'json', 'mako', 'wempy'],
     'failhard': False,
     'autoload_dynamic_modules': True,
     'environment': None,
@@ -1051,9 +1183,14 @@ DEFAULT_MINION_OPTS = {
     'auto_accept': True,
     'autosign_timeout': 120,
     'multiprocessing': True,
+    'minion_job_workers': 0,
+    'minion_job_worker_max_jobs': 100,
+    'local_exec_service': False,
+    'local_exec_timeout': 10,
     'mine_enabled': True,
     'mine_return_job': False,
     'mine_interval': 60,
+    'mine_get_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': False,
@@ -1075,12 +1212,18 @@ DEFAULT_MINION_OPTS = {
     'ext_job_cache': '',
     'cython_enable': False,
     'enable_zip_modules': False,
+    'loader_index_cache': False,
+    'virtual_cache': False,
+    'virtual_cache_expiration': 3600,
     'state_verbose': True,
     'state_output': 'full',
+    'state_profile_top': 10,
     'state_output_diff': False,
     'state_auto_order': True,
     'state_events': False,
     'state_aggregate': False,
+    'state_compile_cache': False,
+    'state_pkg_snapshot': False,
     'snapper_states': False,
     'snapper_states_config': 'root',
     'acceptance_wait_time': 10,
@@ -1100,6 +1243,13 @@ DEFAULT_MINION_OPTS = {
     'recon_randomize': True,
     'return_retry_timer': 5,
     'return_retry_timer_max': 10,
+    'return_spool': False,
+    'return_spool_max': 10000,
+    'return_spool_batch': 100,
+    'return_spool_interval': 10,
+    'minion_event_coalesce': 0,
+    'minion_event_coalesce_max': 100,
+    'job_heartbeat': 0,
     'random_reauth_delay': 10,
     'winrepo_source_dir': 'salt://win/repo-ng/',
     'winrepo_dir': os.path.join(salt.syspaths.BASE_FILE_ROOTS_DIR, 'win', 'repo'),
@@ -1312,6 +1462,10 @@ DEFAULT_MASTER_OPTS = {
     'renderer': 'yaml_jinja',
     'renderer_whitelist': [],
     'renderer_blacklist': [],
+    'render_cache': False,
+    'render_cache_size': 1024,
+    'render_cache_ttl': 300,
+    'render_cache_renderers': ['jinja', 'yaml', 'yamlex', 'json', 'mako', 'wempy'],
     'failhard': False,
     'state_top': 'top.sls',
     'state_top_saltenv': None,
@@ -1323,6 +1477,7 @@ DEFAULT_MASTER_OPTS = {
     'job_cache_store_endtime': False,
     'minion_data_cache': True,
     'enforce_mine_cache': False,
+    'mine_index': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': False,
@@ -1357,6 +1512,7 @@ DEFAULT_MASTER_OPTS = {
     'serial': 'msgpack',
     'state_verbose': True,
     'state_output': 'full',
+    'state_profile_top': 10,
     'state_output_diff': False,
     'state_auto_order': True,
     'state_events': False,
@@ -1367,7 +1523,10 @@ DEFAULT_MASTER_OPTS = {
     'nodegroups': {},
     'ssh_list_nodegroups': {},
     'ssh_use_home_key': False,
+    'ssh_control_persist': 0,
+    'ssh_thin_chunks': False,
     'cython_enable': False,
+    'loader_index_cache': False,
     'enable_gpu_grains': False,
     # XXX: Remove 'key_logfile' support in 2014.1.0
     'key_logfile': os.path.join(salt.syspaths.LOGS_DIR, 'key'),
@@ -1398,6 +1557,11 @@ DEFAULT_MASTER_OPTS = {
     'keysize': 2048,
     'transport': 'zeromq',
     'gather_job_timeout': 10,
+    'job_liveness': False,
+    'job_liveness_timeout': 30,
+    'batch_presence': False,
+    'presence_table': False,
+    'presence_timeout': 300,
     'syndic_event_forward_timeout': 0.5,
     'syndic_jid_forward_cache_hwm': 100,
     'regen_thin': False,
@@ -1430,6 +1594,7 @@ DEFAULT_MASTER_OPTS = {
     'sqlite_queue_dir': os.path.join(salt.syspaths.CACHE_DIR, 'master', 'queues'),
     'queue_dirs': [],
     'cli_summary': False,
+    'static_json_lines': False,
     'max_minions': 0,
     'master_sign_key_name': 'master_sign',
     'master_sign_pubkey': False,
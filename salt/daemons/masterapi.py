@@ -34,6 +34,7 @@ import salt.utils.verify
 import salt.utils.minions
 import salt.utils.gzip_util
 import salt.utils.jid
+import salt.utils.mine
 from salt.pillar import git_pillar
 from salt.utils.event import tagify
 from salt.exceptions import SaltMasterError
@@ -449,6 +450,9 @@ class RemoteFuncs(object):
                 rend=False)
         self.__setup_fileserver()
         self.cache = salt.cache.Cache(opts)
+        self.mine_index = None
+        if self.opts.get('mine_index', False):
+            self.mine_index = salt.utils.mine.MineIndex(opts, self.cache)
 
     def __setup_fileserver(self):
         '''
@@ -570,6 +574,10 @@ class RemoteFuncs(object):
     def _mine_get(self, load, skip_verify=False):
         '''
         Gathers the data from the specified minions' mine
+
+        When the mine index is enabled and the load holds an ``etag``, the
+        return is a list of the tag of the data, followed by the data unless
+        the tag is the one from the load.
         '''
         if not skip_verify:
             if any(key not in load for key in ('id', 'tgt', 'fun')):
@@ -599,6 +607,13 @@ class RemoteFuncs(object):
                 match_type,
                 greedy=False
                 )
+        if self.mine_index is not None:
+            tag, ret = self.mine_index.lookup(load['fun'], minions)
+            if 'etag' not in load:
+                return ret
+            if load['etag'] == tag:
+                return [tag]
+            return [tag, ret]
         for minion in minions:
             fdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
             if isinstance(fdata, dict):
@@ -617,12 +632,39 @@ class RemoteFuncs(object):
         if self.opts.get('minion_data_cache', False) or self.opts.get('enforce_mine_cache', False):
             cbank = 'minions/{0}'.format(load['id'])
             ckey = 'mine'
+            old = None
+            if not load.get('clear', False) or self.mine_index is not None:
+                old = self.cache.fetch(cbank, ckey)
             if not load.get('clear', False):
-                data = self.cache.fetch(cbank, ckey)
-                if isinstance(data, dict):
+                if isinstance(old, dict):
+                    data = dict(old)
                     data.update(load['data'])
                     load['data'] = data
             self.cache.store(cbank, ckey, load['data'])
+            if self.mine_index is not None:
+                self.mine_index.update(load['id'], old, load['data'])
+        return True
+
+    def _grains_update(self, load, skip_verify=False):
+        '''
+        Update the grains of a minion in the minion data cache with the grains
+        which changed since the minion last sent them. Returns False when
+        there are no cached grains to update.
+        '''
+        if not skip_verify:
+            if 'id' not in load or 'grains' not in load:
+                return False
+        if not self.opts.get('minion_data_cache', False):
+            return True
+        cbank = 'minions/{0}'.format(load['id'])
+        data = self.cache.fetch(cbank, 'data')
+        if not isinstance(data, dict) or \
+                not isinstance(data.get('grains'), dict):
+            return False
+        data['grains'].update(load['grains'])
+        for key in load.get('removed', []):
+            data['grains'].pop(key, None)
+        self.cache.store(cbank, 'data', data)
         return True
 
     def _mine_delete(self, load):
@@ -639,8 +681,11 @@ class RemoteFuncs(object):
                 if not isinstance(data, dict):
                     return False
                 if load['fun'] in data:
+                    old = dict(data)
                     del data[load['fun']]
                     self.cache.store(cbank, ckey, data)
+                    if self.mine_index is not None:
+                        self.mine_index.update(load['id'], old, data)
             except OSError:
                 return False
         return True
@@ -652,7 +697,13 @@ class RemoteFuncs(object):
         if not skip_verify and 'id' not in load:
             return False
         if self.opts.get('minion_data_cache', False) or self.opts.get('enforce_mine_cache', False):
-            return self.cache.flush('minions/{0}'.format(load['id']), 'mine')
+            cbank = 'minions/{0}'.format(load['id'])
+            if self.mine_index is None:
+                return self.cache.flush(cbank, 'mine')
+            old = self.cache.fetch(cbank, 'mine')
+            ret = self.cache.flush(cbank, 'mine')
+            self.mine_index.update(load['id'], old, None)
+            return ret
         return True
 
     def _file_recv(self, load):
@@ -789,6 +840,17 @@ class RemoteFuncs(object):
         fstr = '{0}.returner'.format(self.opts['master_job_cache'])
         self.mminion.returners[fstr](load)
 
+    def _return_batch(self, load):
+        '''
+        Handle a batch of returns spooled by a minion
+        '''
+        if 'id' not in load or not isinstance(load.get('returns'), list):
+            return False
+        for ret in load['returns']:
+            if isinstance(ret, dict) and ret.get('id') == load['id']:
+                self._return(ret)
+        return True
+
     def _syndic_return(self, load):
         '''
         Receive a syndic minion return and format it to look like returns from
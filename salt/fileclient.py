@@ -6,11 +6,14 @@ from __future__ import absolute_import
 
 # Import python libs
 import contextlib
+import functools
 import logging
 import os
 import string
 import shutil
 import ftplib
+import threading
+import time
 from tornado.httputil import parse_response_start_line, HTTPInputError
 
 # Import salt libs
@@ -41,6 +44,72 @@ from salt.ext.six.moves.urllib.parse import urlparse, urlunparse
 
 log = logging.getLogger(__name__)
 
+_SOURCES = threading.local()
+
+
+@contextlib.contextmanager
+def record_sources():
+    '''
+    Collect the ``salt://`` paths which any file client caches in this thread
+    while the context is active. Yields a list of ``(path, saltenv)`` tuples.
+    '''
+    if not hasattr(_SOURCES, 'stack'):
+        _SOURCES.stack = []
+    sources = []
+    _SOURCES.stack.append(sources)
+    try:
+        yield sources
+    finally:
+        _SOURCES.stack.pop()
+
+
+def record_source(path, saltenv):
+    '''
+    Add a ``salt://`` path to every active source recording
+    '''
+    if not path.startswith('salt://'):
+        return
+    for sources in getattr(_SOURCES, 'stack', ()):
+        if (path, saltenv) not in sources:
+            sources.append((path, saltenv))
+
+
+_TRANSFERS = threading.local()
+
+
+@contextlib.contextmanager
+def time_transfers(callback):
+    '''
+    Call ``callback`` with the number of seconds spent in each file transfer
+    made by any file client in this thread while the context is active
+    '''
+    old = getattr(_TRANSFERS, 'callback', None)
+    _TRANSFERS.callback = callback
+    try:
+        yield
+    finally:
+        _TRANSFERS.callback = old
+
+
+def _timed_transfer(func):
+    '''
+    Report the time spent in a file transfer to the active ``time_transfers``
+    callback, the transfers it makes itself are not reported twice
+    '''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        callback = getattr(_TRANSFERS, 'callback', None)
+        if callback is None or getattr(_TRANSFERS, 'timing', False):
+            return func(*args, **kwargs)
+        _TRANSFERS.timing = True
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _TRANSFERS.timing = False
+            callback(time.time() - start)
+    return wrapper
+
 
 def get_file_client(opts, pillar=False):
     '''
@@ -175,6 +244,7 @@ class Client(object):
         Pull a file down from the file server and store it in the minion
         file cache
         '''
+        record_source(path, saltenv)
         return self.get_url(path, '', True, saltenv, cachedir=cachedir)
 
     def cache_files(self, paths, saltenv='base', cachedir=None):
@@ -456,6 +526,7 @@ class Client(object):
         ret.sort()
         return ret
 
+    @_timed_transfer
     def get_url(self, url, dest, makedirs=False, saltenv='base',
                 no_cache=False, cachedir=None):
         '''
@@ -759,6 +830,7 @@ class LocalClient(Client):
                 return fnd
         return fnd
 
+    @_timed_transfer
     def get_file(self,
                  path,
                  dest='',
@@ -975,6 +1047,7 @@ class RemoteClient(Client):
         self.channel = salt.transport.Channel.factory(self.opts)
         return self.channel
 
+    @_timed_transfer
     def get_file(self,
                  path,
                  dest='',
@@ -16,14 +16,11 @@ import hashlib
 import logging
 
 # Import salt libs
-import salt.cache
-import salt.client
-import salt.crypt
-import salt.daemons.masterapi
+# The crypto, transport and client modules are imported where they are used,
+# listing the keys does not need them
 import salt.exceptions
-import salt.minion
 import salt.utils
-import salt.utils.event
+import salt.utils.args
 import salt.utils.kinds
 
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
@@ -40,6 +37,23 @@ except ImportError:
 log = logging.getLogger(__name__)
 
 
+def _tagify(suffix='', prefix='', base='salt'):
+    '''
+    Wrap salt.utils.event.tagify, importing the event system when an event
+    is fired
+    '''
+    import salt.utils.event
+    return salt.utils.event.tagify(suffix, prefix, base)
+
+
+def _dropfile(opts):
+    '''
+    Ask the master to rotate its AES key
+    '''
+    import salt.crypt
+    salt.crypt.dropfile(opts['cachedir'], opts['user'])
+
+
 def get_key(opts):
     if opts['transport'] in ('zeromq', 'tcp'):
         return Key(opts)
@@ -59,7 +73,10 @@ class KeyCLI(object):
 
     def __init__(self, opts):
         self.opts = opts
-        self.client = salt.wheel.WheelClient(opts)
+        self.client = None
+        if opts.get('eauth'):
+            import salt.wheel
+            self.client = salt.wheel.WheelClient(opts)
         if self.opts['transport'] in ('zeromq', 'tcp'):
             self.key = Key
         else:
@@ -154,7 +171,7 @@ class KeyCLI(object):
             if argspec.args:
                 for arg in argspec.args:
                     args.append(self.opts.get(arg))
-        args, kwargs = salt.minion.load_args_and_kwargs(
+        args, kwargs = salt.utils.args.load_args_and_kwargs(
             fun,
             args,
             self.opts,
@@ -364,12 +381,22 @@ class Key(object):
             emsg = ("Invalid application kind = '{0}'.".format(kind))
             log.error(emsg + '\n')
             raise ValueError(emsg)
-        self.event = salt.utils.event.get_event(
-                kind,
-                opts['sock_dir'],
-                opts['transport'],
-                opts=opts,
-                listen=False)
+        self._event = None
+
+    @property
+    def event(self):
+        '''
+        The event bus the key changes are fired on, set up when first used
+        '''
+        if self._event is None:
+            import salt.utils.event
+            self._event = salt.utils.event.get_event(
+                    self.opts.get('__role', ''),
+                    self.opts['sock_dir'],
+                    self.opts['transport'],
+                    opts=self.opts,
+                    listen=False)
+        return self._event
 
     def _check_minions_directories(self):
         '''
@@ -406,6 +433,7 @@ class Key(object):
         '''
         keydir, keyname, keysize, user = self._get_key_attrs(keydir, keyname,
                                                              keysize, user)
+        import salt.crypt
         salt.crypt.gen_keys(keydir, keyname, keysize, user)
         return salt.utils.pem_finger(os.path.join(keydir, keyname + '.pub'))
 
@@ -413,6 +441,7 @@ class Key(object):
         '''
         Generate master public-key-signature
         '''
+        import salt.crypt
         return salt.crypt.gen_signature(privkey,
                                         pubkey,
                                         sig_path)
@@ -446,6 +475,7 @@ class Key(object):
                 log.debug('Generating new signing key-pair {0}.* in {1}'
                       ''.format(self.opts['master_sign_key_name'],
                                 self.opts['pki_dir']))
+                import salt.crypt
                 salt.crypt.gen_keys(self.opts['pki_dir'],
                                     self.opts['master_sign_key_name'],
                                     keysize or self.opts['keysize'],
@@ -487,17 +517,46 @@ class Key(object):
         for key, val in six.iteritems(keys):
             minions.extend(val)
         if not self.opts.get('preserve_minion_cache', False) or not preserve_minions:
+            from salt.cache import Cache
+            cache = Cache(self.opts)
+            mines = self._removed_mines(cache, minions, preserve_minions)
             m_cache = os.path.join(self.opts['cachedir'], self.ACC)
             if os.path.isdir(m_cache):
                 for minion in os.listdir(m_cache):
                     if minion not in minions and minion not in preserve_minions:
                         shutil.rmtree(os.path.join(m_cache, minion))
-            cache = salt.cache.Cache(self.opts)
             clist = cache.list(self.ACC)
             if clist:
                 for minion in cache.list(self.ACC):
                     if minion not in minions and minion not in preserve_minions:
                         cache.flush('{0}/{1}'.format(self.ACC, minion))
+            self._clear_mine_index(cache, mines)
+
+    def _removed_mines(self, cache, minions, preserve_minions):
+        '''
+        Return the mine data of the minions whose cache is about to be
+        removed, when the mine index is enabled
+        '''
+        if not self.opts.get('mine_index', False):
+            return {}
+        ret = {}
+        for minion in cache.list(self.ACC) or []:
+            if minion not in minions and minion not in preserve_minions:
+                ret[minion] = cache.fetch('{0}/{1}'.format(self.ACC, minion),
+                                          'mine')
+        return ret
+
+    def _clear_mine_index(self, cache, mines):
+        '''
+        Drop the mine data of the removed minions from the mine index, so that
+        it is not served again if the same ids are accepted again
+        '''
+        if not mines:
+            return
+        import salt.utils.mine
+        mine_index = salt.utils.mine.MineIndex(self.opts, cache)
+        for minion, mine_data in six.iteritems(mines):
+            mine_index.update(minion, mine_data, None)
 
     def check_master(self):
         '''
@@ -696,7 +755,7 @@ class Key(object):
                              'act': 'accept',
                              'id': key}
                     self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                                          _tagify(prefix='key'))
                 except (IOError, OSError):
                     pass
         return (
@@ -725,7 +784,7 @@ class Key(object):
                          'act': 'accept',
                          'id': key}
                 self.event.fire_event(eload,
-                                      salt.utils.event.tagify(prefix='key'))
+                                      _tagify(prefix='key'))
             except (IOError, OSError):
                 pass
         return self.list_keys()
@@ -756,6 +815,7 @@ class Key(object):
                                      'Minion will not be disconnected until the master AES key is rotated.')
                         else:
                             try:
+                                import salt.client
                                 client = salt.client.get_local_client(mopts=self.opts)
                                 client.cmd_async(key, 'saltutil.revoke_auth')
                             except salt.exceptions.SaltClientError:
@@ -768,7 +828,7 @@ class Key(object):
                              'act': 'delete',
                              'id': key}
                     self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                                          _tagify(prefix='key'))
                 except (OSError, IOError):
                     pass
         if preserve_minions:
@@ -777,7 +837,7 @@ class Key(object):
             preserve_minions_list = []
         self.check_minion_cache(preserve_minions=preserve_minions_list)
         if self.opts.get('rotate_aes_key'):
-            salt.crypt.dropfile(self.opts['cachedir'], self.opts['user'])
+            _dropfile(self.opts)
         return (
             self.name_match(match) if match is not None
             else self.dict_match(matches)
@@ -796,7 +856,7 @@ class Key(object):
                                  'act': 'delete',
                                  'id': key}
                     self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                                          _tagify(prefix='key'))
                 except (OSError, IOError):
                     pass
         self.check_minion_cache()
@@ -814,12 +874,12 @@ class Key(object):
                              'act': 'delete',
                              'id': key}
                     self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                                          _tagify(prefix='key'))
                 except (OSError, IOError):
                     pass
         self.check_minion_cache()
         if self.opts.get('rotate_aes_key'):
-            salt.crypt.dropfile(self.opts['cachedir'], self.opts['user'])
+            _dropfile(self.opts)
         return self.list_keys()
 
     def reject(self, match=None, match_dict=None, include_accepted=False, include_denied=False):
@@ -855,12 +915,12 @@ class Key(object):
                             'act': 'reject',
                             'id': key}
                     self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                                          _tagify(prefix='key'))
                 except (IOError, OSError):
                     pass
         self.check_minion_cache()
         if self.opts.get('rotate_aes_key'):
-            salt.crypt.dropfile(self.opts['cachedir'], self.opts['user'])
+            _dropfile(self.opts)
         return (
             self.name_match(match) if match is not None
             else self.dict_match(matches)
@@ -887,12 +947,12 @@ class Key(object):
                          'act': 'reject',
                          'id': key}
                 self.event.fire_event(eload,
-                                      salt.utils.event.tagify(prefix='key'))
+                                      _tagify(prefix='key'))
             except (IOError, OSError):
                 pass
         self.check_minion_cache()
         if self.opts.get('rotate_aes_key'):
-            salt.crypt.dropfile(self.opts['cachedir'], self.opts['user'])
+            _dropfile(self.opts)
         return self.list_keys()
 
     def finger(self, match):
@@ -937,6 +997,8 @@ class RaetKey(Key):
     DEN = None
 
     def __init__(self, opts):
+        import salt.daemons.masterapi
+        import salt.payload
         Key.__init__(self, opts)
         self.auto_key = salt.daemons.masterapi.AutoKey(self.opts)
         self.serial = salt.payload.Serial(self.opts)
@@ -961,15 +1023,19 @@ class RaetKey(Key):
 
         m_cache = os.path.join(self.opts['cachedir'], 'minions')
         if os.path.isdir(m_cache):
+            from salt.cache import Cache
+            cache = Cache(self.opts)
+            mines = self._removed_mines(cache, minions,
+                                        preserve_minions or ())
             for minion in os.listdir(m_cache):
                 if minion not in minions:
                     shutil.rmtree(os.path.join(m_cache, minion))
-            cache = salt.cache.Cache(self.opts)
             clist = cache.list(self.ACC)
             if clist:
                 for minion in cache.list(self.ACC):
                     if minion not in minions and minion not in preserve_minions:
                         cache.flush('{0}/{1}'.format(self.ACC, minion))
+            self._clear_mine_index(cache, mines)
 
         kind = self.opts.get('__role', '')  # application kind
         if kind not in salt.utils.kinds.APPL_KINDS:
@@ -1231,6 +1297,7 @@ class RaetKey(Key):
                                  'Minion will not be disconnected until the master AES key is rotated.')
                     else:
                         try:
+                            import salt.client
                             client = salt.client.get_local_client(mopts=self.opts)
                             client.cmd_async(key, 'saltutil.revoke_auth')
                         except salt.exceptions.SaltClientError:
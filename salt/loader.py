@@ -9,12 +9,18 @@ plugin interfaces used by Salt.
 from __future__ import absolute_import
 import os
 import imp
+import copy
+import fnmatch
+import hashlib
+import json
 import sys
 import salt
 import time
 import logging
 import inspect
+import math
 import tempfile
+import threading
 import functools
 from collections import MutableMapping
 from zipimport import zipimporter
@@ -26,8 +32,11 @@ from salt.utils.decorators import Depends
 from salt.utils import is_proxy
 import salt.utils.context
 import salt.utils.lazy
+import salt.utils.render_cache
 import salt.utils.event
 import salt.utils.odict
+import salt.utils.atomicfile
+import salt.version
 
 # Solve the Chicken and egg problem where grains need to run before any
 # of the modules are loaded and are generally available for any usage.
@@ -35,7 +44,7 @@ import salt.modules.cmdmod
 
 # Import 3rd-party libs
 import salt.ext.six as six
-from salt.ext.six.moves import reload_module
+from salt.ext.six.moves import queue, reload_module
 try:
     import pkg_resources
     HAS_PKG_RESOURCES = True
@@ -390,6 +399,24 @@ def outputters(opts):
     return wrapped_ret
 
 
+def output_streams(opts):
+    '''
+    Returns the functions of the outputters which write their output to a
+    stream as they render it
+
+    :param dict opts: The Salt options dictionary
+    :returns: LazyLoader instance, with only the ``output_stream`` functions
+        of the outputters present in the keyspace
+    '''
+    ret = LazyLoader(
+        _module_dirs(opts, 'output', ext_type_dirs='outputter_dirs'),
+        opts,
+        tag='output',
+    )
+    ret.pack['__salt__'] = FilterDictWrapper(ret, '.output')
+    return FilterDictWrapper(ret, '.output_stream')
+
+
 def serializers(opts):
     '''
     Returns the serializers modules
@@ -456,13 +483,15 @@ def thorium(opts, functions, runners):
     return ret
 
 
-def states(opts, functions, utils, serializers, whitelist=None):
+def states(opts, functions, utils, serializers, whitelist=None, context=None):
     '''
     Returns the state modules
 
     :param dict opts: The Salt options dictionary
     :param dict functions: A dictionary of minion modules, with module names as
                             keys and funcs as values.
+    :param dict context: A dictionary shared by the state modules as
+                         ``__context__``
 
     .. code-block:: python
 
@@ -476,7 +505,7 @@ def states(opts, functions, utils, serializers, whitelist=None):
         _module_dirs(opts, 'states'),
         opts,
         tag='states',
-        pack={'__salt__': functions},
+        pack={'__salt__': functions, '__context__': context},
         whitelist=whitelist,
     )
     ret.pack['__states__'] = ret
@@ -569,6 +598,8 @@ def render(opts, functions, states=None):
             '__grains__': opts.get('grains', {})}
     if states:
         pack['__states__'] = states
+    if opts.get('render_cache', False):
+        pack = salt.utils.render_cache.context_pack(opts, pack)
     ret = LazyLoader(
         _module_dirs(
             opts,
@@ -614,11 +645,192 @@ def grain_funcs(opts, proxy=None):
     )
 
 
-def grains(opts, force_refresh=False, proxy=None):
+# The time spent in each grain function the last time the grains were loaded
+_GRAINS_TIMING = {'total': 0.0, 'functions': {}, 'timed_out': []}
+
+
+def grains_timing():
+    '''
+    Return the wall time in seconds spent in each grain function the last time
+    the grains were loaded by this process, and the grain functions skipped
+    because they did not return within ``grains_timeout``.
+    '''
+    return {'total': _GRAINS_TIMING['total'],
+            'functions': dict(_GRAINS_TIMING['functions']),
+            'timed_out': list(_GRAINS_TIMING['timed_out'])}
+
+
+# The last results of the grain functions and when they were computed, used to
+# run only the expired grain functions on a refresh
+_GRAINS_RESULTS = {}
+
+
+def _grain_func_expired(key, computed, now, ttls, refresh_funcs=None):
+    '''
+    Return True if the result of the grain function ``key`` computed at
+    ``computed`` has to be computed again. Grain functions without a TTL in
+    ``grains_refresh_ttl`` are only run again when they match one of the
+    ``refresh_funcs`` globs.
+    '''
+    if refresh_funcs and \
+            any(fnmatch.fnmatch(key, pat) for pat in refresh_funcs):
+        return True
+    matched = [ttl for pat, ttl in six.iteritems(ttls)
+               if fnmatch.fnmatch(key, pat)]
+    if not matched:
+        return False
+    return now - computed >= min(matched)
+
+
+def _call_grain_func(key, fun, proxy=None):
+    '''
+    Call a grain function. Errors in the core grains are raised, errors in the
+    other grains are logged and None is returned.
+    '''
+    if key.startswith('core.'):
+        return fun()
+    try:
+        # Grains are loaded too early to take advantage of the injected
+        # __proxy__ variable.  Pass an instance of that LazyLoader
+        # here instead to grains functions if the grains functions take
+        # one parameter.  Then the grains can have access to the
+        # proxymodule for retrieving information from the connected
+        # device.
+        if fun.__code__.co_argcount == 1:
+            return fun(proxy)
+        return fun()
+    except Exception:
+        if is_proxy():
+            log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
+        log.critical(
+            'Failed to load grains defined in grain file {0} in '
+            'function {1}, error:\n'.format(
+                key, fun
+            ),
+            exc_info=True
+        )
+
+
+def _run_grain_funcs(funcs, proxy=None, concurrency=0, timeout=0):
+    '''
+    Run the grain functions and return their results in the order the
+    functions were passed, as a list of ``(key, return)`` tuples.
+
+    With a ``concurrency`` above zero the functions are run on that many
+    threads, and the functions which did not return ``timeout`` seconds after
+    they were started are left out of the results. The functions still
+    queued once every function could have run within its timeout, because
+    the threads are stuck in functions which hang, are left out too.
+    '''
+    timing = {}
+    timed_out = []
+    results = []
+    start = time.time()
+    # A single function still runs on a thread when it has to be timed out,
+    # as on an incremental refresh running only one grain function
+    if concurrency > 0 and (len(funcs) > 1 or (funcs and timeout)):
+        tasks = queue.Queue()
+        stop = threading.Event()
+        calls = {}
+        for key, fun in funcs:
+            calls[key] = {'done': threading.Event(), 'start': None, 'ret': None}
+            tasks.put((key, fun))
+
+        def _worker():
+            while True:
+                if stop.is_set():
+                    return
+                try:
+                    key, fun = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                call = calls[key]
+                call['start'] = time.time()
+                try:
+                    call['ret'] = _call_grain_func(key, fun, proxy)
+                except Exception:
+                    log.critical(
+                        'Failed to load grains defined in grain function '
+                        '{0}, error:\n'.format(key),
+                        exc_info=True
+                    )
+                finally:
+                    timing[key] = time.time() - call['start']
+                    call['done'].set()
+
+        threads = min(concurrency, len(funcs))
+        # The time by which every function started if none went over its
+        # timeout
+        deadline = time.time() + timeout * int(math.ceil(float(len(funcs)) / threads))
+        for _ in range(threads):
+            # Daemon threads, a grain function which hangs must not keep the
+            # minion from exiting
+            thread = threading.Thread(target=_worker)
+            thread.daemon = True
+            thread.start()
+
+        # Collect the results in order, the merge order must not depend on
+        # which function returned first
+        for key, _ in funcs:
+            call = calls[key]
+            while not call['done'].is_set():
+                if call['start'] is None:
+                    # Still queued behind slower functions
+                    if timeout and time.time() >= deadline:
+                        break
+                    call['done'].wait(0.01)
+                elif not timeout:
+                    call['done'].wait()
+                else:
+                    remaining = call['start'] + timeout - time.time()
+                    if remaining <= 0:
+                        break
+                    call['done'].wait(remaining)
+            if call['done'].is_set():
+                results.append((key, call['ret']))
+            elif call['start'] is None:
+                log.warning(
+                    'Grain function {0} did not start, the grain functions '
+                    'before it did not return within {1} seconds, its '
+                    'grains are skipped'.format(key, timeout)
+                )
+                timed_out.append(key)
+            else:
+                log.warning(
+                    'Grain function {0} did not return within {1} seconds, '
+                    'its grains are skipped'.format(key, timeout)
+                )
+                timed_out.append(key)
+                if call['start'] is not None:
+                    timing[key] = time.time() - call['start']
+        # The functions left in the queue are not run anymore
+        stop.set()
+    else:
+        for key, fun in funcs:
+            log.trace('Loading {0} grain'.format(key))
+            call_start = time.time()
+            ret = _call_grain_func(key, fun, proxy)
+            timing[key] = time.time() - call_start
+            results.append((key, ret))
+    _GRAINS_TIMING['total'] = time.time() - start
+    _GRAINS_TIMING['functions'] = timing
+    _GRAINS_TIMING['timed_out'] = timed_out
+    return results
+
+
+def grains(opts, force_refresh=False, proxy=None, refresh_funcs=None):
     '''
     Return the functions for the dynamic grains and the values for the static
     grains.
 
+    When refreshing the grains with ``grains_refresh_ttl`` set, or with a
+    list of grain function globs passed as ``refresh_funcs``, only the grain
+    functions whose results expired or which match ``refresh_funcs`` are run
+    again. The others reuse the results they returned on the previous run in
+    this process. The grains of the functions which did not return within
+    ``grains_timeout`` are skipped, and the functions are run again by the
+    next refresh.
+
     Since grains are computed early in the startup process, grains functions
     do not have __salt__ or __proxy__ available.  At proxy-minion startup,
     this function is called with the proxymodule LazyLoader object so grains
@@ -695,49 +907,46 @@ def grains(opts, force_refresh=False, proxy=None):
     funcs = grain_funcs(opts, proxy=proxy)
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
-    # Run core grains
+    # Run core grains first, then the rest of the grains
+    core_funcs = []
+    other_funcs = []
     for key, fun in six.iteritems(funcs):
-        if not key.startswith('core.'):
-            continue
-        log.trace('Loading {0} grain'.format(key))
-        ret = fun()
-        if not isinstance(ret, dict):
-            continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
+        if key.startswith('core.'):
+            core_funcs.append((key, fun))
+        elif key != '_errors':
+            other_funcs.append((key, fun))
+    ttls = opts.get('grains_refresh_ttl') or {}
+    incremental = force_refresh and (ttls or refresh_funcs)
+    now = time.time()
+    results = {}
+    expired = []
+    for key, fun in core_funcs + other_funcs:
+        if incremental and key in _GRAINS_RESULTS and not _grain_func_expired(
+                key, _GRAINS_RESULTS[key][0], now, ttls, refresh_funcs):
+            results[key] = _GRAINS_RESULTS[key][1]
         else:
-            grains_data.update(ret)
-
-    # Run the rest of the grains
-    for key, fun in six.iteritems(funcs):
-        if key.startswith('core.') or key == '_errors':
-            continue
-        try:
-            # Grains are loaded too early to take advantage of the injected
-            # __proxy__ variable.  Pass an instance of that LazyLoader
-            # here instead to grains functions if the grains functions take
-            # one parameter.  Then the grains can have access to the
-            # proxymodule for retrieving information from the connected
-            # device.
-            if fun.__code__.co_argcount == 1:
-                ret = fun(proxy)
-            else:
-                ret = fun()
-        except Exception:
-            if is_proxy():
-                log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
-            log.critical(
-                'Failed to load grains defined in grain file {0} in '
-                'function {1}, error:\n'.format(
-                    key, fun
-                ),
-                exc_info=True
-            )
-            continue
+            expired.append((key, fun))
+    if incremental:
+        log.debug('Refreshing {0} of {1} grain functions'.format(
+            len(expired), len(core_funcs) + len(other_funcs)))
+    for key, ret in _run_grain_funcs(expired,
+                                     proxy,
+                                     opts.get('grains_concurrency', 0),
+                                     opts.get('grains_timeout', 0)):
+        _GRAINS_RESULTS[key] = (now, ret)
+        results[key] = ret
+    for key, _ in expired:
+        if key not in results:
+            # Timed out, its grains are skipped until it returns again
+            _GRAINS_RESULTS.pop(key, None)
+    for key, _ in core_funcs + other_funcs:
+        ret = results.get(key)
         if not isinstance(ret, dict):
             continue
         if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
+            # Merge a copy, deep merging modifies the nested values of the
+            # grains merged before, which are kept for the next refresh
+            salt.utils.dictupdate.update(grains_data, copy.deepcopy(ret))
         else:
             grains_data.update(ret)
 
@@ -988,6 +1197,216 @@ class FilterDictWrapper(MutableMapping):
                 yield key.replace(self.suffix, '')
 
 
+# Directory listings of the module dirs, shared by all the loaders of the
+# process and persisted under the cachedir when ``loader_index_cache`` is on.
+# Each listing is keyed on the path and stored with the mtime it was read at.
+_MODULE_INDEX = {}
+_MODULE_INDEX_LOCK = threading.Lock()
+_MODULE_INDEX_LOADED = set()
+# Listings of directories changed less than this many seconds before they
+# were read are not kept, the mtime may not reflect a change made in the
+# same tick.
+_MODULE_INDEX_RACY = 2
+
+
+def _module_index_path(opts):
+    '''
+    Return the path of the persisted module index, or None without a cachedir
+    '''
+    cachedir = opts.get('cachedir')
+    if not cachedir:
+        return None
+    return os.path.join(cachedir, 'loader', 'module_index.p')
+
+
+def _load_module_index(opts):
+    '''
+    Read the persisted module index once per process
+    '''
+    path = _module_index_path(opts)
+    if path is None or path in _MODULE_INDEX_LOADED:
+        return
+    with _MODULE_INDEX_LOCK:
+        if path in _MODULE_INDEX_LOADED:
+            return
+        _MODULE_INDEX_LOADED.add(path)
+        try:
+            with salt.utils.fopen(path, 'rb') as fp_:
+                index = salt.payload.Serial(opts).load(fp_)
+        except (IOError, OSError):
+            return
+        except Exception as exc:
+            log.debug('Ignoring unreadable module index {0}: {1}'.format(
+                path, exc))
+            return
+        if not isinstance(index, dict):
+            return
+        for mod_dir, entry in six.iteritems(index):
+            _MODULE_INDEX.setdefault(
+                salt.utils.to_str(mod_dir),
+                (entry[0], None if entry[1] is None
+                 else [salt.utils.to_str(name) for name in entry[1]]))
+
+
+def _save_module_index(opts):
+    '''
+    Write the module index to the cachedir
+    '''
+    path = _module_index_path(opts)
+    if path is None:
+        return
+    with _MODULE_INDEX_LOCK:
+        index = dict(_MODULE_INDEX)
+    cumask = os.umask(0o77)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+            salt.payload.Serial(opts).dump(index, fp_)
+    except (IOError, OSError) as exc:
+        log.debug('Unable to write the module index {0}: {1}'.format(
+            path, exc))
+    finally:
+        os.umask(cumask)
+
+
+def _indexed_listdir(path):
+    '''
+    Return the listing of ``path`` from the module index, reading it when the
+    directory changed since it was indexed, and whether the index was updated.
+
+    Like ``os.listdir``, raise OSError when ``path`` is not a directory.
+    '''
+    mtime = os.stat(path).st_mtime
+    entry = _MODULE_INDEX.get(path)
+    if entry is not None and entry[0] == mtime:
+        if entry[1] is None:
+            raise OSError('Not a directory: {0}'.format(path))
+        return entry[1], False
+    try:
+        files = os.listdir(path)
+    except OSError:
+        files = None
+    updated = False
+    if time.time() - mtime > _MODULE_INDEX_RACY:
+        _MODULE_INDEX[path] = (mtime, files)
+        updated = True
+    elif entry is not None:
+        del _MODULE_INDEX[path]
+        updated = True
+    if files is None:
+        raise OSError('Not a directory: {0}'.format(path))
+    return files, updated
+
+
+# Results of the __virtual__ functions, persisted under the cachedir when
+# ``virtual_cache`` is on. Keyed on the path of the cache file, each value
+# holds the mtime of the file when it was read and the entries, keyed on the
+# loader tag and the path of the module.
+_VIRTUAL_CACHE = {}
+_VIRTUAL_CACHE_LOCK = threading.Lock()
+
+
+def _virtual_cache_path(opts):
+    '''
+    Return the path of the persisted __virtual__ results, or None without a
+    cachedir
+    '''
+    cachedir = opts.get('cachedir')
+    if not cachedir:
+        return None
+    return os.path.join(cachedir, 'loader', 'virtual_cache.p')
+
+
+def _grains_hash(grains):
+    '''
+    Return a hash of the grains, or None when they cannot be serialized
+    '''
+    try:
+        data = json.dumps(grains, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(salt.utils.to_bytes(data)).hexdigest()
+
+
+def _get_virtual_cache(opts):
+    '''
+    Return the entries of the __virtual__ results cache, reading them again
+    when the cache file changed since they were read
+    '''
+    path = _virtual_cache_path(opts)
+    if path is None:
+        return {}
+    try:
+        stamp = os.stat(path).st_mtime
+    except OSError:
+        stamp = None
+    with _VIRTUAL_CACHE_LOCK:
+        cache = _VIRTUAL_CACHE.get(path)
+        if cache is not None and cache['stamp'] == stamp:
+            return cache['entries']
+        entries = {}
+        if stamp is not None:
+            try:
+                with salt.utils.fopen(path, 'rb') as fp_:
+                    data = salt.payload.Serial(opts).load(fp_)
+                if isinstance(data, dict) \
+                        and data.get('version') == salt.version.__version__:
+                    for key, entry in six.iteritems(data.get('entries', {})):
+                        entries[salt.utils.to_str(key)] = [
+                            salt.utils.to_str(item)
+                            if isinstance(item, six.binary_type) else item
+                            for item in entry]
+            except Exception as exc:
+                log.debug('Ignoring unreadable __virtual__ cache {0}: '
+                          '{1}'.format(path, exc))
+        _VIRTUAL_CACHE[path] = {'stamp': stamp, 'entries': entries}
+        return entries
+
+
+def _save_virtual_cache(opts):
+    '''
+    Write the __virtual__ results cache to the cachedir
+    '''
+    path = _virtual_cache_path(opts)
+    if path is None or path not in _VIRTUAL_CACHE:
+        return
+    with _VIRTUAL_CACHE_LOCK:
+        cache = _VIRTUAL_CACHE[path]
+        data = {'version': salt.version.__version__,
+                'entries': dict(cache['entries'])}
+        cumask = os.umask(0o77)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                salt.payload.Serial(opts).dump(data, fp_)
+            cache['stamp'] = os.stat(path).st_mtime
+        except (IOError, OSError) as exc:
+            log.debug('Unable to write the __virtual__ cache {0}: {1}'.format(
+                path, exc))
+        finally:
+            os.umask(cumask)
+
+
+def clear_virtual_cache(opts):
+    '''
+    Forget the cached results of the __virtual__ functions, so that newly
+    installed packages or libraries are taken into account
+
+    .. versionadded:: Nitrogen
+    '''
+    path = _virtual_cache_path(opts)
+    if path is None:
+        return
+    with _VIRTUAL_CACHE_LOCK:
+        _VIRTUAL_CACHE.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 class LazyLoader(salt.utils.lazy.LazyDict):
     '''
     A pseduo-dictionary which has a set of keys which are the
@@ -1071,6 +1490,17 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         self.disabled = set(self.opts.get('disable_{0}s'.format(self.tag), []))
 
+        # The results of __virtual__ depend on the grains, which are not
+        # known yet when the grains themselves are loaded
+        self.virtual_cache = (self.opts.get('virtual_cache', False) is True
+                              and self.virtual_enable
+                              and tag != 'grains'
+                              and 'proxy' not in self.opts
+                              and bool(self.opts.get('grains')))
+        self._virtual_entries = {}
+        self._virtual_grains = None
+        self._virtual_updated = False
+
         self.refresh_file_mapping()
 
         super(LazyLoader, self).__init__()  # late init the lazy loader
@@ -1167,10 +1597,26 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
 
+        use_index = self.opts.get('loader_index_cache', False) is True
+        index_updated = []
+        if use_index:
+            _load_module_index(self.opts)
+
+        def _listdir(path):
+            '''
+            List a module dir, from the module index when it is enabled
+            '''
+            if not use_index:
+                return os.listdir(path)
+            files, updated = _indexed_listdir(path)
+            if updated:
+                index_updated.append(path)
+            return files
+
         for mod_dir in self.module_dirs:
             files = []
             try:
-                files = os.listdir(mod_dir)
+                files = _listdir(mod_dir)
             except OSError:
                 continue  # Next mod_dir
             for filename in files:
@@ -1194,7 +1640,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == '':
                         # is there something __init__?
-                        subfiles = os.listdir(fpath)
+                        subfiles = _listdir(fpath)
                         for suffix in suffix_order:
                             if '' == suffix:
                                 continue  # Next suffix (__init__ must have a suffix)
@@ -1225,6 +1671,13 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             f_noext = smod.split('.')[-1]
             self.file_mapping[f_noext] = (smod, '.o')
 
+        if index_updated:
+            _save_module_index(self.opts)
+
+        if self.virtual_cache:
+            self._virtual_entries = _get_virtual_cache(self.opts)
+            self._virtual_grains = _grains_hash(self.opts['grains'])
+
     def clear(self):
         '''
         Clear the dict
@@ -1258,6 +1711,55 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             mod_opts[key] = val
         return mod_opts
 
+    def _cached_virtual(self, name):
+        '''
+        Return the cached ``(virtual name, error)`` of a module file, the
+        virtual name being None for an unavailable module, or None when the
+        result of its __virtual__ function is not cached
+        '''
+        if not self.virtual_cache:
+            return None
+        fpath, suffix = self.file_mapping[name]
+        entry = self._virtual_entries.get('{0}:{1}'.format(self.tag, fpath))
+        if entry is None or entry[2] != self._virtual_grains:
+            return None
+        expiration = self.opts.get('virtual_cache_expiration', 3600)
+        if expiration and time.time() - entry[1] > expiration:
+            return None
+        try:
+            if os.stat(fpath).st_mtime != entry[0]:
+                return None
+        except OSError:
+            return None
+        return entry[3], entry[4]
+
+    def _cache_virtual(self, name, virtualname, error=None):
+        '''
+        Record the result of the __virtual__ function of a module file
+        '''
+        if not self.virtual_cache or self._virtual_grains is None:
+            return
+        fpath, suffix = self.file_mapping[name]
+        if suffix in ('', '.o'):
+            # Packages and static modules have no single file to check
+            return
+        try:
+            mtime = os.stat(fpath).st_mtime
+        except OSError:
+            return
+        self._virtual_entries['{0}:{1}'.format(self.tag, fpath)] = [
+            mtime, time.time(), self._virtual_grains, virtualname,
+            None if error is None else str(error)]
+        self._virtual_updated = True
+
+    def _save_virtual(self):
+        '''
+        Persist the __virtual__ results recorded since the last save
+        '''
+        if self._virtual_updated:
+            self._virtual_updated = False
+            _save_virtual_cache(self.opts)
+
     def _iter_files(self, mod_name):
         '''
         Iterate over all file_mapping files in order of closeness to mod_name
@@ -1293,6 +1795,11 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         mod = None
         fpath, suffix = self.file_mapping[name]
         self.loaded_files.add(name)
+        cached = self._cached_virtual(name)
+        if cached is not None and cached[0] is None:
+            # Known to be unavailable, skip the import
+            self.missing_modules[name] = cached[1]
+            return False
         fpath_dirname = os.path.dirname(fpath)
         try:
             sys.path.append(fpath_dirname)
@@ -1347,6 +1854,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 exc_info=True
             )
             self.missing_modules[name] = exc
+            self._cache_virtual(name, None, exc)
             return False
         except Exception as error:
             log.error(
@@ -1421,6 +1929,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    self._cache_virtual(name, None, virtual_err)
                     return False
 
         # If this is a proxy minion then MOST modules cannot work. Therefore, require that
@@ -1487,6 +1996,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                      'for reasons: {0}'.format(exc))
 
         self.loaded_modules[module_name] = mod_dict
+        self._cache_virtual(name, module_name)
         return True
 
     def _load(self, key):
@@ -1507,6 +2017,10 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             for name in self._iter_files(mod_name):
                 if name in self.loaded_files:
                     continue
+                cached = self._cached_virtual(name)
+                if cached is not None and cached[0] not in (None, mod_name):
+                    # Loads under another virtual name
+                    continue
                 # if we got what we wanted, we are done
                 if self._load_module(name) and key in self._dict:
                     return True
@@ -1531,6 +2045,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     reloaded = True
                 continue
 
+        self._save_virtual()
         return ret
 
     def _load_all(self):
@@ -1542,6 +2057,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 continue
             self._load_module(name)
 
+        self._save_virtual()
         self.loaded = True
 
     def _apply_outputter(self, func, mod):
@@ -67,6 +67,7 @@ import salt.utils.event
 import salt.utils.job
 import salt.utils.verify
 import salt.utils.minions
+import salt.utils.presence
 import salt.utils.gzip_util
 import salt.utils.process
 import salt.utils.zeromq
@@ -235,6 +236,9 @@ class Maintenance(SignalHandlingMultiprocessingProcess):
             if (now - last) >= self.loop_interval:
                 salt.daemons.masterapi.clean_old_jobs(self.opts)
                 salt.daemons.masterapi.clean_expired_tokens(self.opts)
+                if self.opts['job_liveness']:
+                    salt.utils.job.JobLiveness(self.opts).clean(
+                        self.opts['job_liveness_timeout'])
             self.handle_search(now, last)
             self.handle_git_pillar()
             self.handle_schedule()
@@ -350,6 +354,11 @@ class Maintenance(SignalHandlingMultiprocessingProcess):
         '''
         if self.presence_events:
             present = self.ckminions.connected_ids()
+            if self.opts.get('presence_table'):
+                # The table does not see the minions which stay idle, the
+                # connected ones are present too
+                present.update(salt.utils.presence.PresenceTable(
+                    self.opts).present(self.opts['presence_timeout']))
             new = present.difference(old_present)
             lost = old_present.difference(present)
             if new or lost:
@@ -962,6 +971,16 @@ class AESFuncs(object):
         )
         self.__setup_fileserver()
         self.masterapi = salt.daemons.masterapi.RemoteFuncs(opts)
+        self.job_liveness = None
+        if self.opts.get('job_liveness'):
+            self.job_liveness = salt.utils.job.JobLiveness(self.opts)
+        self.presence = None
+        if self.opts.get('presence_table'):
+            self.presence = salt.utils.presence.PresenceTable(self.opts)
+        # Requests and events received by _minion_event in this worker, fired
+        # on salt/stats/minion_events
+        self.minion_event_stats = {'requests': 0, 'events': 0, 'batched': 0}
+        self._minion_event_stats_logged = time.time()
 
     def __setup_fileserver(self):
         '''
@@ -1117,6 +1136,8 @@ class AESFuncs(object):
             return False
         if 'tok' in load:
             load.pop('tok')
+        if self.presence is not None:
+            self.presence.seen(load['id'])
         return load
 
     def _ext_nodes(self, load):
@@ -1194,6 +1215,24 @@ class AESFuncs(object):
             return {}
         return self.masterapi._mine(load, skip_verify=True)
 
+    def _grains_update(self, load):
+        '''
+        Update the cached grains of a minion with the grains which changed
+
+        :param dict load: A payload received from a minion
+
+        :rtype: bool
+        :return: True if the grains have been updated, False if the master
+                 has no cached grains for the minion
+        '''
+        load = self.__verify_load(load, ('id', 'grains', 'tok'))
+        if load is False:
+            return {}
+        ret = self.masterapi._grains_update(load, skip_verify=True)
+        if ret and self.opts.get('minion_data_cache', False):
+            self.event.fire_event({'Minion data cache refresh': load['id']}, tagify(load['id'], 'refresh', 'minion'))
+        return ret
+
     def _mine_delete(self, load):
         '''
         Allow the minion to delete a specific function from its own mine
@@ -1351,11 +1390,36 @@ class AESFuncs(object):
         load = self.__verify_load(load, ('id', 'tok'))
         if load is False:
             return {}
+        self.__count_minion_events(load)
         # Route to master event bus
         self.masterapi._minion_event(load)
         # Process locally
         self._handle_minion_event(load)
 
+    def __count_minion_events(self, load):
+        '''
+        Count the requests and events received from the minions, and fire the
+        counts of this worker on the master event bus once a minute
+        '''
+        stats = self.minion_event_stats
+        stats['requests'] += 1
+        if isinstance(load.get('events'), list):
+            stats['events'] += len(load['events'])
+            if len(load['events']) > 1:
+                stats['batched'] += 1
+        else:
+            stats['events'] += 1
+        now = time.time()
+        if now - self._minion_event_stats_logged >= 60:
+            self._minion_event_stats_logged = now
+            log.debug(
+                'Received {events} minion events in {requests} requests, '
+                '{batched} of them holding several events'.format(**stats)
+            )
+            data = {'pid': os.getpid()}
+            data.update(stats)
+            self.event.fire_event(data, tagify('minion_events', 'stats'))
+
     def _handle_minion_event(self, load):
         '''
         Act on specific events from minions
@@ -1369,6 +1433,13 @@ class AESFuncs(object):
 
         for event in load.get('events', []):
             event_data = event.get('data', {})
+            if not isinstance(event_data, dict):
+                continue
+            if self.job_liveness is not None and \
+                    event.get('tag') == salt.utils.job.heartbeat_tag(event_data.get('jid'), id_):
+                # A minion can only tell about its own jobs
+                self.job_liveness.beat(event_data['jid'], id_)
+                continue
             if 'minions' in event_data:
                 jid = event_data.get('jid')
                 if not jid:
@@ -1402,6 +1473,29 @@ class AESFuncs(object):
                 self.opts, load, event=self.event, mminion=self.mminion)
         except salt.exceptions.SaltCacheError:
             log.error('Could not store job information for load: {0}'.format(load))
+        if self.job_liveness is not None and 'jid' in load and 'id' in load:
+            self.job_liveness.clear(load['jid'], load['id'])
+        if self.presence is not None and 'id' in load:
+            self.presence.seen(load['id'])
+
+    def _return_batch(self, load):
+        '''
+        Handle a batch of returns which a minion spooled while the master
+        could not be reached. Every return is handled as by :meth:`_return`.
+
+        :param dict load: The minion payload, the returns are under ``returns``
+        '''
+        if 'id' not in load or not isinstance(load.get('returns'), list):
+            return None
+        count = 0
+        for ret in load['returns']:
+            # A minion can only send its own returns
+            if not isinstance(ret, dict) or ret.get('id') != load['id']:
+                continue
+            self._return(ret)
+            count += 1
+        log.debug('Got {0} spooled returns from {1}'.format(count, load['id']))
+        return True
 
     def _syndic_return(self, load):
         '''
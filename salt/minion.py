@@ -12,6 +12,7 @@ import time
 import types
 import signal
 import fnmatch
+import hashlib
 import logging
 import threading
 import traceback
@@ -89,6 +90,7 @@ import salt.utils.jid
 import salt.pillar
 import salt.utils.args
 import salt.utils.event
+import salt.utils.job
 import salt.utils.minion
 import salt.utils.minions
 import salt.utils.schedule
@@ -101,6 +103,7 @@ import salt.log.setup
 from salt.config import DEFAULT_MINION_OPTS
 from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.executors import FUNCTION_EXECUTORS
+from salt.utils.args import load_args_and_kwargs
 from salt.utils.debug import enable_sigusr1_handler
 from salt.utils.event import tagify
 from salt.utils.odict import OrderedDict
@@ -119,6 +122,7 @@ from salt.exceptions import (
 )
 
 
+import tornado.concurrent  # pylint: disable=F0401
 import tornado.gen  # pylint: disable=F0401
 import tornado.ioloop  # pylint: disable=F0401
 
@@ -267,71 +271,6 @@ def get_proc_dir(cachedir, **kwargs):
     return fn_
 
 
-def load_args_and_kwargs(func, args, data=None, ignore_invalid=False):
-    '''
-    Detect the args and kwargs that need to be passed to a function call, and
-    check them against what was passed.
-    '''
-    argspec = salt.utils.args.get_function_argspec(func)
-    _args = []
-    _kwargs = {}
-    invalid_kwargs = []
-
-    for arg in args:
-        if isinstance(arg, six.string_types):
-            string_arg, string_kwarg = salt.utils.args.parse_input([arg], condition=False)  # pylint: disable=W0632
-            if string_arg:
-                # Don't append the version that was just derived from parse_cli
-                # above, that would result in a 2nd call to
-                # salt.utils.cli.yamlify_arg(), which could mangle the input.
-                _args.append(arg)
-            elif string_kwarg:
-                salt.utils.warn_until(
-                    'Nitrogen',
-                    'The list of function args and kwargs should be parsed '
-                    'by salt.utils.args.parse_input() before calling '
-                    'salt.minion.load_args_and_kwargs().'
-                )
-                if argspec.keywords or next(six.iterkeys(string_kwarg)) in argspec.args:
-                    # Function supports **kwargs or is a positional argument to
-                    # the function.
-                    _kwargs.update(string_kwarg)
-                else:
-                    # **kwargs not in argspec and parsed argument name not in
-                    # list of positional arguments. This keyword argument is
-                    # invalid.
-                    for key, val in six.iteritems(string_kwarg):
-                        invalid_kwargs.append('{0}={1}'.format(key, val))
-                continue
-
-        # if the arg is a dict with __kwarg__ == True, then its a kwarg
-        elif isinstance(arg, dict) and arg.pop('__kwarg__', False) is True:
-            for key, val in six.iteritems(arg):
-                if argspec.keywords or key in argspec.args:
-                    # Function supports **kwargs or is a positional argument to
-                    # the function.
-                    _kwargs[key] = val
-                else:
-                    # **kwargs not in argspec and parsed argument name not in
-                    # list of positional arguments. This keyword argument is
-                    # invalid.
-                    invalid_kwargs.append('{0}={1}'.format(key, val))
-            continue
-
-        else:
-            _args.append(arg)
-
-    if invalid_kwargs and not ignore_invalid:
-        salt.utils.invalid_kwargs(invalid_kwargs)
-
-    if argspec.keywords and isinstance(data, dict):
-        # this function accepts **kwargs, pack in the publish data
-        for key, val in six.iteritems(data):
-            _kwargs['__pub_{0}'.format(key)] = val
-
-    return _args, _kwargs
-
-
 def eval_master_func(opts):
     '''
     Evaluate master function if master type is 'func'
@@ -374,6 +313,404 @@ def master_event(type, master=None):
     return event_map.get(type, None)
 
 
+def _job_worker(minion, conn, max_jobs, inherited):
+    '''
+    Run the jobs sent by the minion process until told to stop or until
+    ``max_jobs`` jobs ran, reporting the completion of each job
+    '''
+    salt.utils.appendproctitle('MinionJobWorker')
+    # Close the minion side of the pipes copied by the fork, so that the
+    # workers see the end of their pipe when the minion exits
+    for inherited_conn in inherited:
+        inherited_conn.close()
+    minion.job_worker = True
+    jobs = 0
+    while True:
+        try:
+            data = conn.recv()
+        except (EOFError, IOError):
+            break
+        if data is None:
+            break
+        try:
+            minion._target(minion, minion.opts, data, minion.connected)
+        except Exception:
+            log.error('Job {0} failed in the job worker'.format(
+                data.get('jid')), exc_info=True)
+        finally:
+            # The worker outlives the job, do not leave it listed as running
+            fn_ = os.path.join(minion.proc_dir, data['jid'])
+            if os.path.isfile(fn_):
+                try:
+                    os.remove(fn_)
+                except (OSError, IOError):
+                    pass
+        jobs += 1
+        try:
+            conn.send(jobs)
+        except (EOFError, IOError):
+            break
+        if max_jobs and jobs >= max_jobs:
+            break
+
+
+class JobWorkerPool(object):
+    '''
+    A pool of processes forked from the minion to run the published jobs.
+
+    The workers inherit the loaded modules, the pillar and the
+    authentication of the minion, so a job does not pay for a fork, a
+    daemonization and the loading of the modules. A worker runs one job at a
+    time, and a job arriving while every worker is busy is not queued:
+    ``dispatch`` returns False and the caller runs the job in a process of
+    its own.
+    '''
+    def __init__(self, minion, size, max_jobs=0):
+        self.minion = minion
+        self.size = size
+        self.max_jobs = max_jobs
+        self.workers = []
+        # Workers told to stop, which may still finish their current job
+        self.retired = []
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        inherited = [parent_conn]
+        inherited.extend(worker['conn'] for worker in self.workers + self.retired)
+        process = SignalHandlingMultiprocessingProcess(
+            target=_job_worker,
+            args=(self.minion, child_conn, self.max_jobs, inherited))
+        # Reset current signals before starting the process in
+        # order not to inherit the current signal handlers
+        with default_signals(signal.SIGINT, signal.SIGTERM):
+            process.start()
+        child_conn.close()
+        log.debug('Started minion job worker with PID {0}'.format(process.pid))
+        return {'process': process, 'conn': parent_conn, 'busy': False}
+
+    def _close(self, worker):
+        worker['process'].join(0)
+        worker['conn'].close()
+
+    def _update(self):
+        '''
+        Collect the completion of the jobs and replace the workers which
+        exited, either after running ``max_jobs`` jobs or because they were
+        killed
+        '''
+        for worker in self.workers:
+            try:
+                while worker['conn'].poll():
+                    worker['conn'].recv()
+                    worker['busy'] = False
+            except (EOFError, IOError):
+                pass
+        alive = []
+        for worker in self.workers:
+            if worker['process'].is_alive():
+                alive.append(worker)
+            else:
+                self._close(worker)
+        retired = []
+        for worker in self.retired:
+            if worker['process'].is_alive():
+                retired.append(worker)
+            else:
+                self._close(worker)
+        self.retired = retired
+        self.workers = alive
+        while len(self.workers) < self.size:
+            self.workers.append(self._spawn())
+
+    def start(self):
+        '''
+        Start the workers
+        '''
+        self._update()
+
+    def dispatch(self, data):
+        '''
+        Send a job to an idle worker, return False when they are all busy
+        '''
+        self._update()
+        for worker in self.workers:
+            if worker['busy']:
+                continue
+            try:
+                worker['conn'].send(data)
+            except (EOFError, IOError):
+                continue
+            worker['busy'] = True
+            return True
+        return False
+
+    def restart(self):
+        '''
+        Replace the workers, so that they run the jobs with the current
+        modules, grains and pillar of the minion
+        '''
+        self.stop()
+        self.start()
+
+    def stop(self):
+        '''
+        Tell the workers to exit once their current job is done
+        '''
+        for worker in self.workers:
+            try:
+                worker['conn'].send(None)
+            except (EOFError, IOError):
+                pass
+            self.retired.append(worker)
+        self.workers = []
+
+
+def _local_exec(minion, load, jid, conn):
+    '''
+    Run a function requested by salt-call in a process forked from the
+    minion, listed in the proc dir while it runs, and send back its return
+    '''
+    salt.utils.appendproctitle('LocalExec {0}'.format(jid))
+    fn_ = os.path.join(minion.proc_dir, jid)
+    sdata = {'fun': load.get('fun'),
+             'arg': load.get('arg', []),
+             'pid': os.getpid(),
+             'jid': jid,
+             'tgt': 'salt-call'}
+    if load.get('metadata') is not None:
+        sdata['metadata'] = load['metadata']
+    try:
+        with salt.utils.fopen(fn_, 'w+b') as fp_:
+            fp_.write(minion.serial.dumps(sdata))
+    except (IOError, OSError):
+        log.warning('Unable to write the proc file of the local execution '
+                    '{0}'.format(jid))
+    try:
+        result = LocalExecService.call(minion, load, jid)
+    except Exception as exc:
+        log.error('Local execution of {0} failed'.format(
+            load.get('fun')), exc_info=True)
+        result = {'error': 'Error running \'{0}\': {1}'.format(
+                      load.get('fun'), exc),
+                  'retcode': salt.defaults.exitcodes.EX_GENERIC}
+    finally:
+        try:
+            os.remove(fn_)
+        except (IOError, OSError):
+            pass
+    try:
+        conn.send(result)
+    except Exception as exc:
+        conn.send({'error': 'The return of \'{0}\' cannot be '
+                            'serialized: {1}'.format(load.get('fun'), exc),
+                   'retcode': salt.defaults.exitcodes.EX_GENERIC})
+    conn.close()
+
+
+def local_exec_sock_path(opts):
+    '''
+    Return the path of the socket of the local execution service of the
+    minion, or None when it cannot be served on a unix socket
+    '''
+    if opts.get('ipc_mode') == 'tcp' or salt.utils.is_windows():
+        return None
+    hash_type = getattr(hashlib, opts.get('hash_type', 'md5'))
+    # Only use the first 10 chars to keep longer hashes from exceeding the
+    # max socket path length.
+    id_hash = hash_type(salt.utils.to_bytes(opts['id'])).hexdigest()[:10]
+    return os.path.join(opts['sock_dir'],
+                        'minion_exec_{0}.ipc'.format(id_hash))
+
+
+class LocalExecService(object):
+    '''
+    Run the functions requested by salt-call with the modules, grains and
+    pillar already loaded by the running minion.
+
+    The requests arrive on a unix socket only accessible to the user the
+    minion runs as. Each function runs in a process forked from the minion,
+    so that it cannot change the minion process, and is written to the proc
+    dir like the published jobs. The service tells the client when the
+    function started, then sends back its return.
+    '''
+    def __init__(self, opts, minions, io_loop=None):
+        self.opts = opts
+        self.minions = minions
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.sock_path = local_exec_sock_path(opts)
+        self.server = None
+
+    def start(self):
+        '''
+        Bind the socket of the service
+        '''
+        if self.sock_path is None:
+            log.warning('The local execution service needs a unix socket, '
+                        'it is not started')
+            return
+        # Imported here, msgpack is not required in local mode
+        import salt.transport.ipc
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)
+        self.server = salt.transport.ipc.IPCServer(
+            self.sock_path,
+            io_loop=self.io_loop,
+            payload_handler=self.handle_request)
+        self.server.start()
+        os.chmod(self.sock_path, 0o600)
+        log.debug('Local execution service listening on {0}'.format(
+            self.sock_path))
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.sock_path)
+            except OSError:
+                pass
+
+    def _minion(self):
+        for minion in self.minions:
+            if getattr(minion, 'ready', False):
+                return minion
+        return None
+
+    @tornado.gen.coroutine
+    def handle_request(self, load, reply):
+        '''
+        Run the requested function in a process and send back its return
+        '''
+        minion = self._minion()
+        if minion is None:
+            yield reply({'error': 'The minion is not ready yet',
+                         'retcode': salt.defaults.exitcodes.EX_GENERIC})
+            return
+        stream = getattr(reply, 'stream', None)
+        if stream is not None and stream.closed():
+            # The client gave up waiting, it does not expect the function
+            # to run anymore
+            log.warning('The client of the local execution of {0} is gone, '
+                        'not running it'.format(load.get('fun')))
+            return
+        jid = salt.utils.jid.gen_jid()
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = SignalHandlingMultiprocessingProcess(
+            target=_local_exec,
+            args=(minion, load, jid, child_conn))
+        try:
+            process.start()
+        except Exception as exc:
+            log.error('Unable to start the local execution of {0}'.format(
+                load.get('fun')), exc_info=True)
+            parent_conn.close()
+            yield reply({'error': 'Unable to start \'{0}\': {1}'.format(
+                             load.get('fun'), exc),
+                         'retcode': salt.defaults.exitcodes.EX_GENERIC})
+            return
+        finally:
+            child_conn.close()
+        yield reply({'started': jid})
+        future = tornado.concurrent.Future()
+
+        def _wait():
+            try:
+                result = parent_conn.recv()
+            except (EOFError, IOError):
+                result = {'error': 'The local execution of \'{0}\' exited '
+                                   'without a return'.format(load.get('fun')),
+                          'retcode': salt.defaults.exitcodes.EX_GENERIC}
+            parent_conn.close()
+            process.join()
+            self.io_loop.add_callback(future.set_result, result)
+
+        # Only the wait for the return runs in a thread of the minion
+        thread = threading.Thread(target=_wait,
+                                  name='LocalExec {0}'.format(jid))
+        thread.daemon = True
+        thread.start()
+        result = yield future
+        try:
+            yield reply(result)
+        except TypeError as exc:
+            yield reply({'error': 'The return of \'{0}\' cannot be '
+                                  'serialized: {1}'.format(load.get('fun'), exc),
+                         'retcode': salt.defaults.exitcodes.EX_GENERIC})
+
+    @staticmethod
+    def call(minion, load, jid=None):
+        '''
+        Call a function the way salt-call does, returning either
+        ``{'ret': ...}`` or ``{'error': ..., 'retcode': ...}``
+        '''
+        fun = load['fun']
+        functions = minion.functions
+        if fun not in functions:
+            error = functions.missing_fun_string(fun)
+            mod_name = fun.split('.')[0]
+            if mod_name in minion.function_errors:
+                error += ' Possible reasons: {0}'.format(
+                    minion.function_errors[mod_name])
+            return {'error': error, 'retcode': -1}
+        ret = {'jid': jid or salt.utils.jid.gen_jid()}
+        metadata = load.get('metadata')
+        sdata = {'fun': fun,
+                 'pid': os.getpid(),
+                 'jid': ret['jid'],
+                 'tgt': 'salt-call'}
+        if metadata is not None:
+            sdata['metadata'] = metadata
+        func = functions[fun]
+        try:
+            args, kwargs = load_args_and_kwargs(
+                func,
+                salt.utils.args.parse_input(load.get('arg', [])),
+                data=sdata)
+            functions.pack['__context__']['retcode'] = 0
+            try:
+                ret['return'] = func(*args, **kwargs)
+            except TypeError as exc:
+                return {'error': 'Passed invalid arguments: {0}.\n\n'
+                                 'Usage:\n{1}'.format(exc, func.__doc__),
+                        'retcode': salt.defaults.exitcodes.EX_GENERIC}
+            ret['retcode'] = functions.pack['__context__'].get('retcode', 0)
+        except CommandExecutionError as exc:
+            return {'error': 'Error running \'{0}\': {1}'.format(fun, exc),
+                    'retcode': salt.defaults.exitcodes.EX_GENERIC}
+        except CommandNotFoundError as exc:
+            return {'error': 'Command required for \'{0}\' not found: '
+                             '{1}'.format(fun, exc),
+                    'retcode': salt.defaults.exitcodes.EX_GENERIC}
+        oput = getattr(func, '__outputter__', None)
+        if isinstance(oput, six.string_types):
+            ret['out'] = oput
+        ret['id'] = minion.opts['id']
+        ret['fun'] = fun
+        ret['fun_args'] = load.get('arg', [])
+        if metadata is not None:
+            ret['metadata'] = metadata
+        for returner in load.get('return') or []:
+            try:
+                ret['success'] = True
+                minion.returners['{0}.returner'.format(returner)](ret)
+            except Exception:
+                log.error('The return of {0} to the {1} returner '
+                          'failed'.format(fun, returner), exc_info=True)
+        if minion.connected:
+            mret = ret.copy()
+            mret['jid'] = 'req'
+            load = {'cmd': '_return', 'id': minion.opts['id']}
+            load.update(mret)
+            try:
+                channel = salt.transport.Channel.factory(minion.opts,
+                                                         usage='salt_call')
+                channel.send(load)
+            except Exception:
+                log.debug('Unable to return the local execution of {0} to '
+                          'the master'.format(fun), exc_info=True)
+        return {'ret': ret}
+
+
 class MinionBase(object):
     def __init__(self, opts):
         self.opts = opts
@@ -772,7 +1109,11 @@ class MinionManager(MinionBase):
         self.auth_wait = self.opts['acceptance_wait_time']
         self.max_auth_wait = self.opts['acceptance_wait_time_max']
         self.minions = []
-        self.jid_queue = []
+        # Shared by the minions, so that a job published by several masters
+        # only runs once
+        self.jid_queue = salt.utils.minion.JidQueue(
+            self.opts['minion_jid_queue_hwm'])
+        self.local_exec = None
 
         if HAS_ZMQ:
             zmq.eventloop.ioloop.install()
@@ -792,6 +1133,11 @@ class MinionManager(MinionBase):
         self.event = salt.utils.event.get_event('minion', opts=self.opts, io_loop=self.io_loop)
         self.event.subscribe('')
         self.event.set_event_handler(self.handle_event)
+        if self.opts.get('local_exec_service', False):
+            self.local_exec = LocalExecService(self.opts,
+                                               self.minions,
+                                               io_loop=self.io_loop)
+            self.local_exec.start()
 
     @tornado.gen.coroutine
     def handle_event(self, package):
@@ -886,6 +1232,9 @@ class MinionManager(MinionBase):
             minion.destroy()
 
     def destroy(self):
+        if getattr(self, 'local_exec', None) is not None:
+            self.local_exec.close()
+            self.local_exec = None
         for minion in self.minions:
             minion.destroy()
 
@@ -910,12 +1259,24 @@ class Minion(MinionBase):
 
         self._running = None
         self.win_proc = []
+        self.job_pool = None
+        self.return_spool = None
+        if self.opts.get('return_spool'):
+            self.return_spool = salt.utils.minion.ReturnSpool(self.opts)
+        self._flushing_spool = False
+        self.event_coalescer = None
+        if self.opts.get('minion_event_coalesce', 0) > 0:
+            self.event_coalescer = salt.utils.minion.EventCoalescer(
+                self.opts.get('minion_event_coalesce_max', 100))
         self.loaded_base_name = loaded_base_name
         self.connected = False
         self.restart = False
         # Flag meaning minion has finished initialization including first connect to the master.
         # True means the Minion is fully functional and ready to handle events.
         self.ready = False
+        if isinstance(jid_queue, list):
+            jid_queue = salt.utils.minion.JidQueue(
+                self.opts.get('minion_jid_queue_hwm', 100), jid_queue)
         self.jid_queue = jid_queue
 
         if io_loop is None:
@@ -1118,8 +1479,28 @@ class Minion(MinionBase):
             self.schedule.delete_job(master_event(type='failback'), persist=True)
 
         self.grains_cache = self.opts['grains']
+        self._start_job_pool()
         self.ready = True
 
+    def _start_job_pool(self):
+        '''
+        Start the pool of job workers when ``minion_job_workers`` is set, or
+        replace its workers so that they pick up refreshed modules, grains
+        and pillar
+        '''
+        if self.job_pool is not None:
+            self.job_pool.restart()
+            return
+        workers = self.opts.get('minion_job_workers', 0)
+        if not workers or not self.opts.get('multiprocessing', True) \
+                or salt.utils.is_windows():
+            return
+        self.job_pool = JobWorkerPool(
+            self,
+            workers,
+            self.opts.get('minion_job_worker_max_jobs', 0))
+        self.job_pool.start()
+
     def _return_retry_timer(self):
         '''
         Based on the minion configuration, either return a randomized timer or
@@ -1256,6 +1637,42 @@ class Minion(MinionBase):
                 self._send_req_async(load, timeout, callback=lambda f: None)  # pylint: disable=unexpected-keyword-arg
         return True
 
+    def _queue_master_events(self, events, pretag=None):
+        '''
+        Queue events to fire on the master, sending the queue at once when it
+        is full
+        '''
+        if self.event_coalescer.add(events, pretag):
+            self._flush_master_events()
+
+    def _flush_master_events(self):
+        '''
+        Fire the queued events on the master
+        '''
+        for pretag, events in self.event_coalescer.flush():
+            self._fire_master(events=events, pretag=pretag, sync=False)
+
+    def _job_heartbeat(self):
+        '''
+        Tell the master which jobs this minion is still running
+        '''
+        if not self.connected:
+            return
+        events = []
+        for data in salt.utils.minion.running(self.opts):
+            jid = data.get('jid')
+            if not jid or data.get('fun') == 'saltutil.find_job':
+                continue
+            events.append({
+                'tag': salt.utils.job.heartbeat_tag(jid, self.opts['id']),
+                'data': {'jid': jid, 'id': self.opts['id'], 'fun': data.get('fun')}})
+        if not events:
+            return
+        if self.event_coalescer is not None:
+            self._queue_master_events(events)
+        else:
+            self._fire_master(events=events, sync=False)
+
     def _handle_decoded_payload(self, data):
         '''
         Override this method if you wish to handle the decoded data
@@ -1273,20 +1690,25 @@ class Minion(MinionBase):
         log.debug('Command details {0}'.format(data))
 
         # Don't duplicate jobs
-        log.trace('Started JIDs: {0}'.format(self.jid_queue))
         if self.jid_queue is not None:
-            if data['jid'] in self.jid_queue:
+            if not self.jid_queue.add(data['jid']):
+                log.debug(
+                    'Dropping duplicate publication of job {0}, {1} '
+                    'duplicates dropped out of {2} jobs'.format(
+                        data['jid'],
+                        self.jid_queue.duplicates,
+                        self.jid_queue.seen))
                 return
-            else:
-                self.jid_queue.append(data['jid'])
-                if len(self.jid_queue) > self.opts['minion_jid_queue_hwm']:
-                    self.jid_queue.pop(0)
 
         if isinstance(data['fun'], six.string_types):
             if data['fun'] == 'sys.reload_modules':
                 self.functions, self.returners, self.function_errors, self.executors = self._load_modules()
                 self.schedule.functions = self.functions
                 self.schedule.returners = self.returners
+                if self.job_pool is not None:
+                    self.job_pool.restart()
+        if self.job_pool is not None and self.job_pool.dispatch(data):
+            return
         # We stash an instance references to allow for the socket
         # communication in Windows. You can't pickle functions, and thus
         # python needs to be able to reconstruct the reference on the other
@@ -1375,7 +1797,8 @@ class Minion(MinionBase):
         '''
         fn_ = os.path.join(minion_instance.proc_dir, data['jid'])
 
-        if opts['multiprocessing'] and not salt.utils.is_windows():
+        if opts['multiprocessing'] and not salt.utils.is_windows() \
+                and not getattr(minion_instance, 'job_worker', False):
             # Shutdown the multiprocessing before daemonizing
             salt.log.setup.shutdown_multiprocessing_logging()
 
@@ -1677,7 +2100,23 @@ class Minion(MinionBase):
         if not self.opts['pub_ret']:
             return ''
 
+        spool = self.return_spool if ret_cmd == '_return' else None
+        if spool is not None and len(spool):
+            # Returns are already waiting for the master, queue this one
+            # behind them instead of waiting on the master again
+            spool.spool(load)
+            log.info('Spooled the return of job {0}'.format(jid))
+            return ''
+
         def timeout_handler(*_):
+            if spool is not None:
+                spool.spool(load)
+                log.warning(
+                    'The minion failed to return the job information for job '
+                    '{0}, the return was spooled and will be sent again once '
+                    'the master can be reached.'.format(jid)
+                )
+                return True
             msg = ('The minion failed to return the job information for job '
                    '{0}. This is often due to the master being shut down or '
                    'overloaded. If the master is running consider increasing '
@@ -1698,6 +2137,45 @@ class Minion(MinionBase):
         log.trace('ret_val = {0}'.format(ret_val))  # pylint: disable=no-member
         return ret_val
 
+    @tornado.gen.coroutine
+    def _flush_return_spool(self):
+        '''
+        Send the spooled job returns back to the master, in batches of
+        ``return_spool_batch`` returns per request
+        '''
+        if self.return_spool is None or self._flushing_spool:
+            return
+        self._flushing_spool = True
+        try:
+            while True:
+                batch = self.return_spool.read(self.opts['return_spool_batch'])
+                if not batch:
+                    break
+                load = {'cmd': '_return_batch',
+                        'id': self.opts['id'],
+                        'returns': [ret for _, ret in batch]}
+                try:
+                    ret_val = yield self._send_req_async(
+                        load, timeout=self._return_retry_timer())
+                    if ret_val is False:
+                        # The master does not know about batches, send the
+                        # returns one by one
+                        for _, ret in batch:
+                            yield self._send_req_async(
+                                ret, timeout=self._return_retry_timer())
+                except SaltReqTimeoutError:
+                    log.debug(
+                        'The master could not be reached, keeping the spooled '
+                        'returns'
+                    )
+                    break
+                self.return_spool.remove([name for name, _ in batch])
+                log.info(
+                    'Sent {0} spooled returns to the master'.format(len(batch))
+                )
+        finally:
+            self._flushing_spool = False
+
     def _state_run(self):
         '''
         Execute a state run based on information set in the minion config file
@@ -1762,10 +2240,14 @@ class Minion(MinionBase):
         Refresh the functions and returners.
         '''
         log.debug('Refreshing modules. Notify={0}'.format(notify))
+        if self.opts.get('virtual_cache', False):
+            salt.loader.clear_virtual_cache(self.opts)
         self.functions, self.returners, _, self.executors = self._load_modules(force_refresh, notify=notify)
 
         self.schedule.functions = self.functions
         self.schedule.returners = self.returners
+        if self.job_pool is not None:
+            self.job_pool.restart()
 
     # TODO: only allow one future in flight at a time?
     @tornado.gen.coroutine
@@ -1789,6 +2271,66 @@ class Minion(MinionBase):
                           'One or more masters may be down!')
         self.module_refresh(force_refresh)
 
+    @tornado.gen.coroutine
+    def grains_refresh(self, force_refresh=False, refresh_funcs=None):
+        '''
+        Refresh the grains, the pillar and the modules are refreshed when the
+        grains changed.
+
+        With ``grains_refresh_ttl`` set or a list of grain functions passed as
+        ``refresh_funcs``, only the expired grain functions are run again. The
+        grains are then updated in place and only the grains which changed are
+        sent to the master's minion data cache, the pillar is not recompiled.
+        '''
+        if force_refresh or not (self.opts.get('grains_refresh_ttl') or
+                                 refresh_funcs):
+            if (force_refresh or
+                    self.grains_cache != self.opts['grains']):
+                self.pillar_refresh(force_refresh=True)
+                self.grains_cache = self.opts['grains']
+            return
+        grains = self.opts['grains']
+        new_grains = salt.loader.grains(
+            self.opts,
+            force_refresh=True,
+            proxy=getattr(self, 'proxy', None),
+            refresh_funcs=refresh_funcs)
+        # The loaded modules hold a reference to the grains dict, update it
+        self.opts['grains'] = grains
+        changed = dict(
+            (key, val) for key, val in six.iteritems(new_grains)
+            if key not in grains or grains[key] != val
+        )
+        removed = [key for key in grains if key not in new_grains]
+        if not changed and not removed:
+            log.debug('Grains refreshed, no grains changed')
+            return
+        log.debug('Grains refreshed, changed: {0}, removed: {1}'.format(
+            sorted(changed), sorted(removed)))
+        for key in removed:
+            del grains[key]
+        grains.update(changed)
+        self.grains_cache = grains
+        if self.job_pool is not None:
+            self.job_pool.restart()
+        if not self.connected:
+            return
+        load = {'cmd': '_grains_update',
+                'id': self.opts['id'],
+                'grains': changed,
+                'removed': removed,
+                'tok': self.tok}
+        channel = salt.transport.Channel.factory(self.opts)
+        try:
+            ret = channel.send(load)
+        except SaltReqTimeoutError:
+            log.warning('Unable to send the changed grains to the master.')
+            return
+        if ret is False:
+            # The master has no grains of this minion to update, send them
+            # all with a pillar refresh
+            yield self.pillar_refresh()
+
     def manage_schedule(self, tag, data):
         '''
         Refresh the functions and returners.
@@ -1847,6 +2389,19 @@ class Minion(MinionBase):
         elif func == 'list':
             self.beacons.list_beacons()
 
+    def minion_stats(self, tag, data):
+        '''
+        Fire the counters of the minion back on the minion event bus
+        '''
+        stats = {}
+        if self.jid_queue is not None:
+            stats['jid_queue'] = self.jid_queue.stats()
+        if self.event_coalescer is not None:
+            stats['event_coalescer'] = self.event_coalescer.stats()
+        evt = salt.utils.event.get_event('minion', opts=self.opts)
+        evt.fire_event({'complete': True, 'stats': stats},
+                       tag='/salt/minion/minion_stats_complete')
+
     def environ_setenv(self, tag, data):
         '''
         Set the salt-minion main process environment according to
@@ -1933,18 +2488,31 @@ class Minion(MinionBase):
             self.manage_schedule(tag, data)
         elif tag.startswith('manage_beacons'):
             self.manage_beacons(tag, data)
+        elif tag.startswith('minion_stats'):
+            self.minion_stats(tag, data)
         elif tag.startswith('grains_refresh'):
-            if (data.get('force_refresh', False) or
-                    self.grains_cache != self.opts['grains']):
-                self.pillar_refresh(force_refresh=True)
-                self.grains_cache = self.opts['grains']
+            yield self.grains_refresh(
+                force_refresh=data.get('force_refresh', False),
+                refresh_funcs=data.get('functions')
+            )
         elif tag.startswith('environ_setenv'):
             self.environ_setenv(tag, data)
         elif tag.startswith('_minion_mine'):
             self._mine_send(tag, data)
         elif tag.startswith('fire_master'):
             log.debug('Forwarding master event tag={tag}'.format(tag=data['tag']))
-            self._fire_master(data['data'], data['tag'], data['events'], data['pretag'])
+            if self.event_coalescer is not None:
+                if data['events']:
+                    self._queue_master_events(data['events'], data['pretag'])
+                elif data['tag']:
+                    # The master fires a single event with the whole load
+                    self._queue_master_events([{'id': self.opts['id'],
+                                                'cmd': '_minion_event',
+                                                'pretag': data['pretag'],
+                                                'data': data['data'] or {},
+                                                'tag': data['tag']}])
+            else:
+                self._fire_master(data['data'], data['tag'], data['events'], data['pretag'])
         elif tag.startswith('__schedule_return'):
             # reporting current connection with master
             if data['schedule'].startswith(master_event(type='alive', master='')):
@@ -1983,6 +2551,12 @@ class Minion(MinionBase):
 
                 log.info('Connection to master {0} lost'.format(self.opts['master']))
 
+                if self.job_pool is not None and \
+                        self.opts['master_type'] != 'failover':
+                    # The workers keep the connection state of the minion
+                    # from when they were forked
+                    self.job_pool.restart()
+
                 if self.opts['master_type'] == 'failover':
                     log.info('Trying to tune in to next master from master-list')
 
@@ -2015,6 +2589,9 @@ class Minion(MinionBase):
                         self.functions, self.returners, self.function_errors, self.executors = self._load_modules()
                         # make the schedule to use the new 'functions' loader
                         self.schedule.functions = self.functions
+                        # the job workers must return to the new master
+                        if self.job_pool is not None:
+                            self.job_pool.restart()
                         self.pub_channel.on_recv(self._handle_payload)
                         self._fire_master_minion_start()
                         log.info('Minion is ready to receive requests!')
@@ -2056,6 +2633,8 @@ class Minion(MinionBase):
             if not self.connected:
                 log.info('Connection to master {0} re-established'.format(self.opts['master']))
                 self.connected = True
+                if self.job_pool is not None:
+                    self.job_pool.restart()
                 # modify the __master_alive job to only fire,
                 # if the connection is lost again
                 if self.opts['transport'] != 'tcp':
@@ -2178,10 +2757,33 @@ class Minion(MinionBase):
             except Exception:
                 log.critical('The beacon errored: ', exc_info=True)
             if beacons and self.connected:
-                self._fire_master(events=beacons)
+                if self.event_coalescer is not None:
+                    self._queue_master_events(beacons)
+                else:
+                    self._fire_master(events=beacons)
 
         self.periodic_callbacks['beacons'] = tornado.ioloop.PeriodicCallback(handle_beacons, loop_interval * 1000, io_loop=self.io_loop)
 
+        if self.event_coalescer is not None:
+            self.periodic_callbacks['event_coalesce'] = tornado.ioloop.PeriodicCallback(
+                self._flush_master_events,
+                self.opts['minion_event_coalesce'] * 1000,
+                io_loop=self.io_loop)
+
+        if self.opts.get('job_heartbeat', 0) > 0:
+            self.periodic_callbacks['job_heartbeat'] = tornado.ioloop.PeriodicCallback(
+                self._job_heartbeat,
+                self.opts['job_heartbeat'] * 1000,
+                io_loop=self.io_loop)
+
+        if self.return_spool is not None:
+            def handle_return_spool():
+                self.io_loop.spawn_callback(self._flush_return_spool)
+            self.periodic_callbacks['return_spool'] = tornado.ioloop.PeriodicCallback(
+                handle_return_spool,
+                self.opts['return_spool_interval'] * 1000,
+                io_loop=self.io_loop)
+
         # TODO: actually listen to the return and change period
         def handle_schedule():
             self.process_schedule(self, loop_interval)
@@ -2252,6 +2854,9 @@ class Minion(MinionBase):
         Tear down the minion
         '''
         self._running = False
+        if getattr(self, 'job_pool', None) is not None:
+            self.job_pool.stop()
+            self.job_pool = None
         if hasattr(self, 'schedule'):
             del self.schedule
         if hasattr(self, 'pub_channel') and self.pub_channel is not None:
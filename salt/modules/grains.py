@@ -24,6 +24,7 @@ from salt.ext.six.moves import range  # pylint: disable=import-error,no-name-in-
 
 # Import salt libs
 import salt.utils
+import salt.loader
 from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.exceptions import SaltException
 
@@ -464,6 +465,35 @@ def ls():  # pylint: disable=C0103
     return sorted(__grains__)
 
 
+def timing(top=None):
+    '''
+    .. versionadded:: Nitrogen
+
+    Return the time in seconds spent in each grain function the last time the
+    grains were loaded, slowest first, and the grain functions which were
+    skipped because they did not return within :conf_minion:`grains_timeout`.
+    Grains loaded from the :conf_minion:`grains_cache` are not timed.
+
+    top
+        Only return the ``top`` slowest grain functions
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' grains.timing
+        salt '*' grains.timing top=5
+    '''
+    ret = salt.loader.grains_timing()
+    functions = sorted(six.iteritems(ret['functions']),
+                       key=operator.itemgetter(1),
+                       reverse=True)
+    if top is not None:
+        functions = functions[:int(top)]
+    ret['functions'] = OrderedDict(functions)
+    return ret
+
+
 def filter_by(lookup_dict, grain='os_family', merge=None, default='default', base=None):
     '''
     .. versionadded:: 0.17.0
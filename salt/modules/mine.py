@@ -6,7 +6,9 @@ The function cache system allows for data to be stored on the master so it can b
 # Import python libs
 from __future__ import absolute_import
 import copy
+import hashlib
 import logging
+import os
 import time
 import traceback
 
@@ -14,6 +16,7 @@ import traceback
 import salt.crypt
 import salt.payload
 import salt.utils
+import salt.utils.atomicfile
 import salt.utils.network
 import salt.utils.event
 from salt.exceptions import SaltClientError
@@ -80,6 +83,52 @@ def _mine_get(load, opts):
     return ret
 
 
+def _mine_get_cached(load, opts):
+    '''
+    Send the tag of the data returned by the master the last time along with
+    the request, a master with a mine index only sends the data again when it
+    changed. The returns are kept in the ``mine_get`` directory of the
+    cachedir.
+    '''
+    key = hashlib.sha1(salt.utils.to_bytes('{0}\0{1}\0{2}'.format(
+        load['tgt'], load['fun'], load['expr_form']))).hexdigest()
+    cache_dir = os.path.join(opts['cachedir'], 'mine_get')
+    path = os.path.join(cache_dir, '{0}.p'.format(key))
+    serial = salt.payload.Serial(opts)
+    cached = None
+    try:
+        with salt.utils.fopen(path, 'rb') as fp_:
+            cached = serial.load(fp_)
+    except (IOError, OSError):
+        pass
+    except Exception:
+        # A truncated or otherwise unreadable return, ask for the data again
+        log.debug('Could not read the cached mine data in {0}'.format(path))
+    if not isinstance(cached, dict) or 'etag' not in cached:
+        cached = None
+    load['etag'] = cached['etag'] if cached else ''
+    ret = _mine_get(load, opts)
+    if not isinstance(ret, (list, tuple)) or not ret:
+        # The master does not index the mine
+        return ret
+    if len(ret) == 1:
+        if cached and ret[0] == cached['etag']:
+            return cached['data']
+        del load['etag']
+        return _mine_get(load, opts)
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            return ret[1]
+    try:
+        with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+            fp_.write(serial.dumps({'etag': ret[0], 'data': ret[1]}))
+    except (IOError, OSError) as exc:
+        log.debug('Could not cache the mine data in {0}: {1}'.format(path, exc))
+    return ret[1]
+
+
 def update(clear=False):
     '''
     Execute the configured functions and send the data back up to the master.
@@ -272,7 +321,10 @@ def get(tgt, fun, expr_form='glob', exclude_minion=False):
             'fun': fun,
             'expr_form': expr_form,
     }
-    ret = _mine_get(load, __opts__)
+    if __opts__.get('mine_get_cache', False):
+        ret = _mine_get_cached(load, __opts__)
+    else:
+        ret = _mine_get(load, __opts__)
     if exclude_minion:
         if __opts__['id'] in ret:
             del ret[__opts__['id']]
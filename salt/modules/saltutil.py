@@ -658,6 +658,44 @@ def refresh_beacons():
     return ret
 
 
+def refresh_grains(functions=None, full=False):
+    '''
+    .. versionadded:: Nitrogen
+
+    Signal the minion to refresh its grains
+
+    functions
+        A list, or a comma-separated string, of grain functions or globs of
+        grain functions to run again, for example ``core.ip_interfaces``. Only
+        these and the grain functions whose :conf_minion:`grains_refresh_ttl`
+        expired are run, and only the grains which changed are sent to the
+        master. This can be used from a reactor to refresh the grains affected
+        by a beacon event.
+
+    full : False
+        Run every grain function again and refresh the pillar and the modules
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' saltutil.refresh_grains
+        salt '*' saltutil.refresh_grains functions=core.ip_interfaces,core.ip4_interfaces
+        salt '*' saltutil.refresh_grains full=True
+    '''
+    data = {'force_refresh': salt.utils.is_true(full)}
+    if functions:
+        if isinstance(functions, six.string_types):
+            functions = functions.split(',')
+        data['functions'] = list(functions)
+    try:
+        ret = __salt__['event.fire'](data, 'grains_refresh')
+    except KeyError:
+        log.error('Event module not available. Grains refresh failed.')
+        ret = False  # Effectively a no-op, since we can't really return without an event system
+    return ret
+
+
 def refresh_pillar():
     '''
     Signal the minion to refresh the pillar data.
@@ -98,6 +98,14 @@ def _set_retcode(ret):
         __context__['retcode'] = 2
 
 
+def _set_profile(st_, ret):
+    '''
+    Add the timings of a profiled state run to the return
+    '''
+    if st_.state.profile.enabled and isinstance(ret, dict):
+        ret['__profile__'] = st_.state.profile.data()
+
+
 def _check_pillar(kwargs):
     '''
     Check the pillar for errors, refuse to run the state if there are errors
@@ -732,6 +740,16 @@ def highstate(test=None,
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Time the phases of the state run (pillar, module loading, top file
+        and sls rendering, file transfers, compilation, requisite checks and
+        the state calls) and add the timings to the return under the
+        ``__profile__`` key. The ``highstate`` outputter prints the slowest
+        sls files and states after the results, the number shown is set with
+        :conf_minion:`state_profile_top`.
+
+        .. versionadded:: Nitrogen
+
     CLI Examples:
 
     .. code-block:: bash
@@ -794,13 +812,15 @@ def highstate(test=None,
                                    pillar_enc=pillar_enc,
                                    proxy=__proxy__,
                                    context=__context__,
-                                   mocked=kwargs.get('mock', False))
+                                   mocked=kwargs.get('mock', False),
+                                   profile=kwargs.get('profile', False))
     except NameError:
         st_ = salt.state.HighState(opts,
                                    pillar,
                                    kwargs.get('__pub_jid'),
                                    pillar_enc=pillar_enc,
-                                   mocked=kwargs.get('mock', False))
+                                   mocked=kwargs.get('mock', False),
+                                   profile=kwargs.get('profile', False))
 
     st_.push_active()
     ret = {}
@@ -824,6 +844,7 @@ def highstate(test=None,
     serial = salt.payload.Serial(__opts__)
     cache_file = os.path.join(__opts__['cachedir'], 'highstate.p')
     _set_retcode(ret)
+    _set_profile(st_, ret)
     # Work around Windows multiprocessing bug, set __opts__['test'] back to
     # value from before this function was run.
     _snapper_post(opts, kwargs.get('__pub_jid', 'called localy'), snapper_pre)
@@ -914,6 +935,16 @@ def sls(mods,
 
         .. versionadded:: 2015.8.4
 
+    profile : False
+        Time the phases of the state run (pillar, module loading, top file
+        and sls rendering, file transfers, compilation, requisite checks and
+        the state calls) and add the timings to the return under the
+        ``__profile__`` key. The ``highstate`` outputter prints the slowest
+        sls files and states after the results, the number shown is set with
+        :conf_minion:`state_profile_top`.
+
+        .. versionadded:: Nitrogen
+
     CLI Example:
 
     .. code-block:: bash
@@ -999,13 +1030,15 @@ def sls(mods,
                                    pillar_enc=pillar_enc,
                                    proxy=__proxy__,
                                    context=__context__,
-                                   mocked=kwargs.get('mock', False))
+                                   mocked=kwargs.get('mock', False),
+                                   profile=kwargs.get('profile', False))
     except NameError:
         st_ = salt.state.HighState(opts,
                                    pillar,
                                    kwargs.get('__pub_jid'),
                                    pillar_enc=pillar_enc,
-                                   mocked=kwargs.get('mock', False))
+                                   mocked=kwargs.get('mock', False),
+                                   profile=kwargs.get('profile', False))
 
     orchestration_jid = kwargs.get('orchestration_jid')
     umask = os.umask(0o77)
@@ -1053,6 +1086,7 @@ def sls(mods,
         msg = 'Unable to write to SLS cache file {0}. Check permission.'
         log.error(msg.format(cache_file))
     _set_retcode(ret)
+    _set_profile(st_, ret)
     # Work around Windows multiprocessing bug, set __opts__['test'] back to
     # value from before this function was run.
     __opts__['test'] = orig_test
@@ -1019,6 +1019,37 @@ def version():
     return get_version.get(__grains__['kernel'], lambda: errmsg)()
 
 
+def minion_stats(timeout=30):
+    '''
+    .. versionadded:: Nitrogen
+
+    Return the counters of the running minion: the number of job publications
+    seen and of the duplicate ones dropped, for instance when the same job
+    arrives from several masters, and with :conf_minion:`minion_event_coalesce`
+    the number of events queued and sent to the master, and of the requests
+    which sent them.
+
+    timeout
+        The number of seconds to wait for the minion to answer
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' status.minion_stats
+    '''
+    eventer = salt.utils.event.get_event('minion', opts=__opts__, listen=True)
+    if not __salt__['event.fire']({}, 'minion_stats'):
+        raise CommandExecutionError('Unable to fire the event on the minion')
+    event_ret = eventer.get_event(
+        tag='/salt/minion/minion_stats_complete', wait=timeout)
+    if not event_ret or not event_ret.get('complete'):
+        raise CommandExecutionError(
+            'The minion did not send its counters within {0} '
+            'seconds'.format(timeout))
+    return event_ret['stats']
+
+
 def master(master=None, connected=True):
     '''
     .. versionadded:: 2014.7.0
@@ -218,6 +218,7 @@ import salt.utils
 import salt.utils.event
 from salt.utils.event import tagify
 import salt.client
+import salt.cli.batch
 import salt.runner
 import salt.auth
 from salt.exceptions import EauthAuthenticationError
@@ -934,18 +935,25 @@ class SaltAPIHandler(BaseSaltAPIHandler, SaltClientsMixIn):  # pylint: disable=W
         '''
         f_call = salt.utils.format_call(self.saltclients['local_batch'], chunk)
 
-        # ping all the minions (to see who we have to talk to)
-        # Don't catch any exception, since we won't know what to do, we'll
-        # let the upper level deal with this one
-        ping_ret = yield self._disbatch_local({'tgt': chunk['tgt'],
-                                               'fun': 'test.ping',
-                                               'expr_form': f_call['kwargs']['expr_form']})
-
         chunk_ret = {}
 
-        if not isinstance(ping_ret, dict):
-            raise tornado.gen.Return(chunk_ret)
-        minions = list(ping_ret.keys())
+        if salt.cli.batch.use_presence(self.application.opts,
+                                       f_call['kwargs']['expr_form']):
+            # the master knows who we have to talk to
+            minions = salt.cli.batch.resolve_minions(self.application.opts,
+                                                     chunk['tgt'],
+                                                     f_call['kwargs']['expr_form'])[0]
+        else:
+            # ping all the minions (to see who we have to talk to)
+            # Don't catch any exception, since we won't know what to do, we'll
+            # let the upper level deal with this one
+            ping_ret = yield self._disbatch_local({'tgt': chunk['tgt'],
+                                                   'fun': 'test.ping',
+                                                   'expr_form': f_call['kwargs']['expr_form']})
+
+            if not isinstance(ping_ret, dict):
+                raise tornado.gen.Return(chunk_ret)
+            minions = list(ping_ret.keys())
 
         maxflight = get_batch_size(f_call['kwargs']['batch'], len(minions))
         inflight_futures = []
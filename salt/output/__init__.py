@@ -82,16 +82,67 @@ def progress_end(progress_iter):
     return None
 
 
+def write_stream(stream, data):
+    '''
+    Write a chunk of output to a stream, as UTF-8 if the stream can not
+    encode it
+    '''
+    try:
+        stream.write(data)
+    except UnicodeEncodeError:
+        if six.PY3 and hasattr(stream, 'buffer'):
+            stream.flush()
+            stream.buffer.write(data.encode('utf-8'))
+        else:
+            stream.write(data.encode('utf-8'))
+
+
+class _WrittenStream(object):
+    '''
+    Wrap a stream, recording whether anything was written to it
+    '''
+    def __init__(self, stream):
+        self.stream = stream
+        self.written = False
+
+    def write(self, data):
+        self.written = True
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
 def display_output(data, out=None, opts=None, **kwargs):
     '''
     Print the passed data using the desired output
     '''
     if opts is None:
         opts = {}
-    display_data = try_printout(data, out, opts, **kwargs)
-
-    output_filename = opts.get('output_file', None)
     log.trace('data = {0}'.format(data))
+    output_filename = opts.get('output_file', None)
+    if not output_filename:
+        stream = _WrittenStream(sys.stdout)
+        try:
+            get_stream_printer(out, opts)(data, stream, **kwargs)
+            sys.stdout.flush()
+            return
+        except IOError as exc:
+            # Only raise if it's NOT a broken pipe
+            if exc.errno != errno.EPIPE:
+                raise exc
+            return
+        except (KeyError, AttributeError, TypeError):
+            if stream.written:
+                # Printing the whole output again with another outputter
+                # would repeat the part already printed
+                log.error('The output could not be fully rendered',
+                          exc_info=True)
+                return
+            # Fall back to the nested and raw outputters
+            log.debug(traceback.format_exc())
+
+    display_data = try_printout(data, out, opts, **kwargs)
     try:
         # output filename can be either '' or None
         if output_filename:
@@ -136,7 +187,50 @@ def get_printout(out, opts=None, **kwargs):
     '''
     if opts is None:
         opts = {}
+    outputters, out = _get_outputters(out, opts, **kwargs)
+    if out not in outputters:
+        # Since the grains outputter was removed we don't need to fire this
+        # error when old minions are asking for it
+        if out != 'grains':
+            log.error('Invalid outputter {0} specified, fall back to nested'.format(out))
+        return outputters['nested']
+    return outputters[out]
+
+
+def get_stream_printer(out, opts=None, **kwargs):
+    '''
+    Return a function writing the output of data to a stream, it is called
+    with the data, the stream and the keyword arguments of the outputter.
+
+    Outputters which provide an ``output_stream`` function write their
+    output as they render it, the output of the others is written once it is
+    rendered.
+    '''
+    if opts is None:
+        opts = {}
+    outputters, out = _get_outputters(out, opts, **kwargs)
+    if out not in outputters:
+        if out != 'grains':
+            log.error('Invalid outputter {0} specified, fall back to nested'.format(out))
+        out = 'nested'
+    stream_printer = salt.loader.output_streams(opts).get(out)
+    if stream_printer is not None:
+        return stream_printer
+    printer = outputters[out]
+
+    def _stream_printer(data, stream, **kwargs):
+        printout = printer(data, **kwargs)
+        if printout is not None:
+            printout = printout.rstrip()
+            if printout:
+                write_stream(stream, printout + '\n')
+    return _stream_printer
+
 
+def _get_outputters(out, opts, **kwargs):
+    '''
+    Return the outputters and the name of the outputter to use
+    '''
     if 'output' in opts and opts['output'] != 'highstate':
         # new --out option, but don't choke when using --out=highstate at CLI
         # See Issue #29796 for more information.
@@ -168,14 +262,7 @@ def get_printout(out, opts=None, **kwargs):
         else:
             opts['color'] = True
 
-    outputters = salt.loader.outputters(opts)
-    if out not in outputters:
-        # Since the grains outputter was removed we don't need to fire this
-        # error when old minions are asking for it
-        if out != 'grains':
-            log.error('Invalid outputter {0} specified, fall back to nested'.format(out))
-        return outputters['nested']
-    return outputters[out]
+    return salt.loader.outputters(opts), out
 
 
 def out_format(data, out, opts=None, **kwargs):
@@ -44,6 +44,10 @@ state_tabular:
     If `state_output` uses the terse output, set this to `True` for an aligned
     output format.  If you wish to use a custom format, this can be set to a
     string.
+state_profile_top:
+    When a state run was executed with ``profile=True`` the timings of the
+    run are printed after the summary, followed by the slowest sls files and
+    states. This sets how many of them are shown, the default is 10.
 
 Example usage:
 
@@ -110,6 +114,7 @@ import textwrap
 # Import salt libs
 import salt.utils
 import salt.output
+import salt.output.profile
 from salt.utils.locales import sdecode
 
 # Import 3rd-party libs
@@ -125,7 +130,36 @@ def output(data, **kwargs):  # pylint: disable=unused-argument
     The HighState Outputter is only meant to be used with the state.highstate
     function, or a function that returns highstate return data.
     '''
+    ret = list(_format_hosts(data))
+    if ret:
+        return "\n".join(ret)
+    log.error(
+        'Data passed to highstate outputter is not a valid highstate return: %s',
+        data
+    )
+    # We should not reach here, but if we do return empty string
+    return ''
+
+
+def output_stream(data, stream, **kwargs):  # pylint: disable=unused-argument
+    '''
+    Write the highstate output to a stream, one host at a time
+    '''
+    empty = True
+    for hstr in _format_hosts(data):
+        salt.output.write_stream(stream, hstr + u'\n')
+        empty = False
+    if empty:
+        log.error(
+            'Data passed to highstate outputter is not a valid highstate return: %s',
+            data
+        )
 
+
+def _format_hosts(data):
+    '''
+    Yield the output of each host of the highstate data
+    '''
     # Discard retcode in dictionary as present in orchestrate data
     local_masters = [key for key in data.keys() if key.endswith('.local_master')]
     orchestrator_output = 'retcode' in data.keys() and len(local_masters) == 1
@@ -141,18 +175,8 @@ def output(data, **kwargs):  # pylint: disable=unused-argument
     if 'data' in data:
         data = data.pop('data')
 
-    ret = [
-        _format_host(host, hostdata)[0]
-        for host, hostdata in six.iteritems(data)
-    ]
-    if ret:
-        return "\n".join(ret)
-    log.error(
-        'Data passed to highstate outputter is not a valid highstate return: %s',
-        data
-    )
-    # We should not reach here, but if we do return empty string
-    return ''
+    for host, hostdata in six.iteritems(data):
+        yield _format_host(host, hostdata)[0]
 
 
 def _format_host(host, data):
@@ -186,10 +210,15 @@ def _format_host(host, data):
                 err = salt.output.strip_esc_sequence(sdecode(err))
             hstrs.append((u'{0}----------\n    {1}{2[ENDC]}'
                           .format(hcolor, err, colors)))
+    profile = None
     if isinstance(data, dict):
+        # Timings of a run executed with profile=True
+        profile = data.get('__profile__')
         # Verify that the needed data is present
         data_tmp = {}
         for tname, info in six.iteritems(data):
+            if tname == '__profile__':
+                continue
             if isinstance(info, dict) and tname is not 'changes' and '__run_num__' not in info:
                 err = (u'The State execution failed to record the order '
                        'in which all states were executed. The state '
@@ -472,6 +501,14 @@ def _format_host(host, data):
                 duration_unit)
             hstrs.append(colorfmt.format(colors['CYAN'], total_duration, colors))
 
+        if profile:
+            hstrs.append(u'')
+            hstrs.extend(salt.output.profile.format_profile(
+                host,
+                profile,
+                colors,
+                int(__opts__.get('state_profile_top', 10))))
+
     if strip_colors:
         host = salt.output.strip_esc_sequence(host)
     hstrs.insert(0, (u'{0}{1}:{2[ENDC]}'.format(hcolor, host, colors)))
@@ -142,6 +142,17 @@ class NestDisplay(object):
         return out
 
 
+class StreamLines(object):
+    '''
+    Write the lines of a NestDisplay to a stream instead of keeping them
+    '''
+    def __init__(self, stream):
+        self.stream = stream
+
+    def append(self, line):
+        salt.output.write_stream(self.stream, line + u'\n')
+
+
 def output(ret, **kwargs):
     '''
     Display ret data
@@ -151,3 +162,13 @@ def output(ret, **kwargs):
         or __opts__.get('nested_indent', 0)
     nest = NestDisplay()
     return '\n'.join(nest.display(ret, base_indent, '', []))
+
+
+def output_stream(ret, stream, **kwargs):
+    '''
+    Write ret data to a stream line by line
+    '''
+    base_indent = kwargs.get('nested_indent', 0) \
+        or __opts__.get('nested_indent', 0)
+    nest = NestDisplay()
+    nest.display(ret, base_indent, '', StreamLines(stream))
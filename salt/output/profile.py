@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+'''
+Display the timings of a profiled state run
+===========================================
+
+.. versionadded:: Nitrogen
+
+State runs executed with ``profile=True`` return the time spent in each phase
+of the run under the ``__profile__`` key. This outputter prints the phases of
+the run followed by the slowest sls files and states. The number of sls files
+and states shown is set with the ``state_profile_top`` option and defaults to
+10.
+
+The ``file_transfer`` phase is the time spent fetching the sls files and the
+files transferred by the states, for instance by ``file.managed``. The
+transfers made by a state are also part of its ``call`` time.
+
+The :mod:`highstate <salt.output.highstate>` outputter uses this outputter to
+print the profile after the results of a profiled run. It can also be used on
+its own:
+
+.. code-block:: bash
+
+    salt '*' state.highstate profile=True --out=profile
+
+Example output:
+
+.. code-block:: text
+
+    Profile for myminion
+    --------------------
+    Total run time: 4.862 s
+    Phases:
+             pillar: 0.213 s
+       load_modules: 0.355 s
+         render_top: 0.021 s
+      file_transfer: 0.102 s
+             render: 0.730 s
+            compile: 0.034 s
+         requisites: 0.001 s
+               call: 3.320 s
+    Slowest sls files:
+        3.287 s  webserver  (render 0.412 s, call 2.803 s)
+        0.881 s  users  (render 0.318 s, call 0.517 s)
+    Slowest states:
+        2.611 s  nginx  (pkg.installed, webserver)
+        0.402 s  /etc/nginx/nginx.conf  (file.managed, webserver)
+'''
+
+# Import python libs
+from __future__ import absolute_import
+
+# Import salt libs
+import salt.utils
+
+# Import 3rd-party libs
+import salt.ext.six as six
+
+PHASES = ('pillar', 'load_modules', 'render_top', 'file_transfer', 'render',
+          'compile', 'aggregate', 'requisites', 'call')
+
+
+def _is_profile(data):
+    return isinstance(data, dict) and 'phases' in data and 'states' in data
+
+
+def _seconds(value):
+    return u'{0:.3f} s'.format(value)
+
+
+def _details(entry):
+    return u', '.join(
+        u'{0} {1}'.format(phase, _seconds(entry[phase]))
+        for phase in PHASES if phase in entry)
+
+
+def hotspots(profile, top=10):
+    '''
+    Return the ``top`` slowest sls files and states of a profile as two lists
+    of ``(name, entry)`` tuples, slowest first
+    '''
+    def _slowest(entries):
+        return sorted(six.iteritems(entries),
+                      key=lambda item: item[1].get('total', 0),
+                      reverse=True)[:top]
+    return (_slowest(profile.get('sls', {})),
+            _slowest(profile.get('states', {})))
+
+
+def format_profile(host, profile, colors, top=10):
+    '''
+    Return the text lines describing the profile of one host
+    '''
+    title = u'Profile for {0}'.format(host)
+    lines = [u'{0}{1}'.format(colors['CYAN'], title),
+             u'-' * len(title),
+             u'Total run time: {0}'.format(_seconds(profile.get('total', 0)))]
+    phases = profile.get('phases', {})
+    names = [phase for phase in PHASES if phase in phases]
+    names.extend(sorted(phase for phase in phases if phase not in PHASES))
+    if names:
+        width = max(len(name) for name in names)
+        lines.append(u'Phases:')
+        for name in names:
+            lines.append(u'  {0:>{1}}: {2}'.format(
+                name, width, _seconds(phases[name])))
+    sls_hot, states_hot = hotspots(profile, top)
+    if sls_hot:
+        lines.append(u'Slowest sls files:')
+        for name, entry in sls_hot:
+            lines.append(u'  {0:>9}  {1}  ({2})'.format(
+                _seconds(entry.get('total', 0)), name, _details(entry)))
+    if states_hot:
+        lines.append(u'Slowest states:')
+        for tag, entry in states_hot:
+            lines.append(u'  {0:>9}  {1}  ({2}, {3})'.format(
+                _seconds(entry.get('total', 0)),
+                entry.get('id') or tag,
+                entry.get('function'),
+                entry.get('sls')))
+    lines[-1] += colors['ENDC']
+    return lines
+
+
+def output(data, **kwargs):  # pylint: disable=unused-argument
+    '''
+    Print the timings and hot spots of profiled state runs
+    '''
+    colors = salt.utils.get_colors(
+            __opts__.get('color'),
+            __opts__.get('color_theme'))
+    top = int(__opts__.get('state_profile_top', 10))
+    if _is_profile(data):
+        data = {__opts__.get('id', 'local'): data}
+    ret = []
+    for host, hostdata in six.iteritems(data):
+        if isinstance(hostdata, dict) and not _is_profile(hostdata):
+            hostdata = hostdata.get('__profile__')
+        if not _is_profile(hostdata):
+            continue
+        ret.extend(format_profile(host, hostdata, colors, top))
+    return u'\n'.join(ret)
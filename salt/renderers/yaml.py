@@ -27,17 +27,21 @@ log = logging.getLogger(__name__)
 
 _ERROR_MAP = {
     ("found character '\\t' that cannot "
-     "start any token"): 'Illegal tab character'
+     "start any token"): 'Illegal tab character',
+    # The same error as reported by libyaml
+    "found a tab character that violates indentation": 'Illegal tab character'
 }
 
 
+def _yaml_loader(*args):
+    return SaltYamlSafeLoader(*args, dictclass=OrderedDict)
+
+
 def get_yaml_loader(argline):
     '''
     Return the ordered dict yaml loader
     '''
-    def yaml_loader(*args):
-        return SaltYamlSafeLoader(*args, dictclass=OrderedDict)
-    return yaml_loader
+    return _yaml_loader
 
 
 def render(yaml_data, saltenv='base', sls='', argline='', **kws):
@@ -55,7 +59,9 @@ def render(yaml_data, saltenv='base', sls='', argline='', **kws):
         except ScannerError as exc:
             err_type = _ERROR_MAP.get(exc.problem, exc.problem)
             line_num = exc.problem_mark.line + 1
-            raise SaltRenderError(err_type, line_num, exc.problem_mark.buffer)
+            # The libyaml parser does not keep the buffer in its marks
+            buf = exc.problem_mark.buffer or yaml_data
+            raise SaltRenderError(err_type, line_num, buf)
         except (ParserError, ConstructorError) as exc:
             raise SaltRenderError(exc)
         if len(warn_list) > 0:
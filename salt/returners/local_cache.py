@@ -6,13 +6,13 @@ Return data to local job cache
 from __future__ import absolute_import
 
 # Import python libs
+import datetime
 import errno
 import glob
 import logging
 import os
 import shutil
 import time
-import bisect
 
 # Import salt libs
 import salt.payload
@@ -42,6 +42,8 @@ RETURN_P = 'return.p'
 OUT_P = 'out.p'
 # endtime is the end time for a job, not stored as msgpack
 ENDTIME = 'endtime'
+# marks a job index which holds all of the jobs of the cache
+INDEX_COMPLETE = '.complete'
 
 
 def _job_dir():
@@ -51,6 +53,86 @@ def _job_dir():
     return os.path.join(__opts__['cachedir'], 'jobs')
 
 
+def _index_dir():
+    '''
+    Return the directory of the job index, one file of msgpack records for
+    each hour of job ids
+    '''
+    return os.path.join(__opts__['cachedir'], 'jobs_index')
+
+
+def _index_job(jid, load):
+    '''
+    Append the searchable data of a job to the job index
+    '''
+    if not salt.utils.jid.is_jid(jid):
+        return
+    index_dir = _index_dir()
+    record = salt.utils.jid.format_job_instance(load)
+    record['jid'] = jid
+    serial = salt.payload.Serial(__opts__)
+    try:
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+        # One write of a small record in append mode, the master workers do
+        # not need to lock the file
+        with salt.utils.fopen(os.path.join(index_dir, jid[:10]), 'ab') as fp_:
+            fp_.write(serial.dumps(record))
+    except (IOError, OSError) as exc:
+        log.warning('Could not write the job index: {0}'.format(exc))
+
+
+def _build_index():
+    '''
+    Index the jobs which were cached before the job index existed
+    '''
+    index_dir = _index_dir()
+    if os.path.isfile(os.path.join(index_dir, INDEX_COMPLETE)):
+        return
+    job_dir = _job_dir()
+    if os.path.isdir(job_dir):
+        for jid, job, _, _ in _walk_through(job_dir):
+            _index_job(jid, job)
+    try:
+        if not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+        salt.utils.fopen(os.path.join(index_dir, INDEX_COMPLETE), 'w').close()
+    except (IOError, OSError) as exc:
+        log.warning('Could not write the job index: {0}'.format(exc))
+
+
+def _read_index(start_jid=None, end_jid=None):
+    '''
+    Return the indexed jobs started between the given job ids, newest first
+    '''
+    _build_index()
+    index_dir = _index_dir()
+    jobs = {}
+    for bucket in os.listdir(index_dir):
+        if bucket.startswith('.'):
+            continue
+        if start_jid and bucket < start_jid[:10]:
+            continue
+        if end_jid and bucket > end_jid[:10]:
+            continue
+        if six.PY2:
+            unpacker = msgpack.Unpacker()
+        else:
+            unpacker = msgpack.Unpacker(encoding='utf-8')
+        try:
+            with salt.utils.fopen(os.path.join(index_dir, bucket), 'rb') as fp_:
+                unpacker.feed(fp_.read())
+            # The same job is saved again by syndics, the last load wins
+            for record in unpacker:
+                jobs[record['jid']] = record
+        except Exception as exc:
+            log.warning(
+                'Could not read the job index {0}: {1}'.format(bucket, exc))
+    return [jobs[jid] for jid in sorted(jobs, reverse=True)
+            if (not start_jid or jid >= start_jid)
+            and (not end_jid or jid <= end_jid)]
+
+
 def _walk_through(job_dir):
     '''
     Walk though the jid dir and look for jobs
@@ -218,6 +300,7 @@ def save_load(jid, clear_load, minions=None, recurse_count=0):
         time.sleep(0.1)
         return save_load(jid=jid, clear_load=clear_load,
                          recurse_count=recurse_count+1)
+    _index_job(jid, clear_load)
 
     # if you have a tgt, save that for the UI etc
     if 'tgt' in clear_load and clear_load['tgt'] != '':
@@ -366,20 +449,53 @@ def get_jids_filter(count, filter_find_job=True):
     :param int count: show not more than the count of most recent jobs
     :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
     '''
-    keys = []
+    ret = get_jids_query(count=count, filter_find_job=filter_find_job)
+    ret.reverse()
+    return ret
+
+
+def get_jids_query(search_metadata=None,
+                   search_function=None,
+                   search_target=None,
+                   search_user=None,
+                   start_jid=None,
+                   end_jid=None,
+                   count=None,
+                   offset=0,
+                   filter_find_job=False):
+    '''
+    Return the information of the jobs matching the given filters from the
+    job index, newest first, without loading the jobs of the cache.
+
+    The filters are the ones of salt.utils.jid.match_job_instance, the jobs
+    started between start_jid and end_jid are returned, ``count`` jobs at
+    most after skipping the ``offset`` newest ones.
+    '''
     ret = []
-    for jid, job, _, _ in _walk_through(_job_dir()):
-        job = salt.utils.jid.format_jid_instance_ext(jid, job)
-        if filter_find_job and job['Function'] == 'saltutil.find_job':
+    skipped = 0
+    for record in _read_index(start_jid, end_jid):
+        if filter_find_job and record.get('Function') == 'saltutil.find_job':
             continue
-        i = bisect.bisect(keys, jid)
-        if len(keys) == count and i == 0:
+        if not salt.utils.jid.match_job_instance(
+                record,
+                search_metadata=search_metadata,
+                search_function=search_function,
+                search_target=search_target,
+                search_user=search_user):
             continue
-        keys.insert(i, jid)
-        ret.insert(i, job)
-        if len(keys) > count:
-            del keys[0]
-            del ret[0]
+        if skipped < offset:
+            skipped += 1
+            continue
+        jid = record.pop('jid')
+        record['JID'] = jid
+        record['StartTime'] = salt.utils.jid.jid_to_time(jid)
+        if __opts__.get('job_cache_store_endtime'):
+            endtime = get_endtime(jid)
+            if endtime:
+                record['EndTime'] = endtime
+        ret.append(record)
+        if count and len(ret) >= count:
+            break
     return ret
 
 
@@ -436,6 +552,26 @@ def clean_old_jobs():
                 if hours_difference > __opts__['keep_jobs']:
                     shutil.rmtree(t_path)
 
+        _clean_old_index()
+
+
+def _clean_old_index():
+    '''
+    Remove the hours of the job index which are older than keep_jobs
+    '''
+    index_dir = _index_dir()
+    if not os.path.isdir(index_dir):
+        return
+    oldest = '{0:%Y%m%d%H}'.format(
+        datetime.datetime.now() - datetime.timedelta(hours=__opts__['keep_jobs'] + 1))
+    for bucket in os.listdir(index_dir):
+        if not bucket.startswith('.') and bucket < oldest:
+            try:
+                os.remove(os.path.join(index_dir, bucket))
+            except OSError as exc:
+                if exc.errno != errno.ENOENT:
+                    raise
+
 
 def update_endtime(jid, time):
     '''
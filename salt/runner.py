@@ -11,7 +11,6 @@ import logging
 # Import salt libs
 import salt.exceptions
 import salt.loader
-import salt.minion
 import salt.utils
 import salt.utils.args
 import salt.utils.event
@@ -78,7 +77,7 @@ class RunnerClient(mixins.SyncClientMixin, mixins.AsyncClientMixin, object):
             verify_fun(self.functions, fun)
             merged_args_kwargs = salt.utils.args.condition_input([], low)
             parsed_input = salt.utils.args.parse_input(merged_args_kwargs)
-            args, kwargs = salt.minion.load_args_and_kwargs(
+            args, kwargs = salt.utils.args.load_args_and_kwargs(
                 self.functions[fun],
                 parsed_input,
                 self.opts,
@@ -176,7 +175,7 @@ class Runner(RunnerClient):
             low = {'fun': self.opts['fun']}
             try:
                 verify_fun(self.functions, low['fun'])
-                args, kwargs = salt.minion.load_args_and_kwargs(
+                args, kwargs = salt.utils.args.load_args_and_kwargs(
                     self.functions[low['fun']],
                     salt.utils.args.parse_input(self.opts['arg']),
                     self.opts,
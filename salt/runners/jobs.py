@@ -5,7 +5,6 @@ A convenience system to manage jobs, both active and already run
 
 # Import python libs
 from __future__ import absolute_import, print_function
-import fnmatch
 import logging
 import os
 
@@ -213,7 +212,10 @@ def list_jobs(ext_source=None,
               search_target=None,
               start_time=None,
               end_time=None,
-              display_progress=False):
+              display_progress=False,
+              search_user=None,
+              count=None,
+              offset=0):
     '''
     List all detectable jobs and associated functions
 
@@ -269,6 +271,12 @@ def list_jobs(ext_source=None,
 
                 salt-run jobs.list_jobs search_target='db*,myminion'
 
+    search_user
+        Can be passed as a string or a list. Returns jobs which were run by
+        the specified user. Globbing is allowed.
+
+        .. versionadded:: Nitrogen
+
     start_time
         Accepts any timestamp supported by the dateutil_ Python module (if this
         module is not installed, this argument will be ignored). Returns jobs
@@ -281,6 +289,21 @@ def list_jobs(ext_source=None,
 
     .. _dateutil: https://pypi.python.org/pypi/python-dateutil
 
+    count
+        Return at most this number of the most recent matching jobs.
+
+        .. versionadded:: Nitrogen
+
+    offset
+        Skip this number of the most recent matching jobs, to page through
+        the jobs with ``count``.
+
+        .. versionadded:: Nitrogen
+
+    If the returner provides ``get_jids_query``, like the ``local_cache``
+    returner does, the filters are run on its index of the jobs instead of
+    on the loads of all of the jobs.
+
     CLI Example:
 
     .. code-block:: bash
@@ -288,6 +311,7 @@ def list_jobs(ext_source=None,
         salt-run jobs.list_jobs
         salt-run jobs.list_jobs search_function='test.*' search_target='localhost' search_metadata='{"bar": "foo"}'
         salt-run jobs.list_jobs start_time='2015, Mar 16 19:00' end_time='2015, Mar 18 22:00'
+        salt-run jobs.list_jobs search_function=state.highstate count=20 offset=20
 
     '''
     returner = _get_returner((
@@ -302,68 +326,40 @@ def list_jobs(ext_source=None,
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners['{0}.get_jids'.format(returner)]()
-
-    mret = {}
-    for item in ret:
-        _match = True
-        if search_metadata:
-            _match = False
-            if 'Metadata' in ret[item]:
-                if isinstance(search_metadata, dict):
-                    for key in search_metadata:
-                        if key in ret[item]['Metadata']:
-                            if ret[item]['Metadata'][key] == search_metadata[key]:
-                                _match = True
-                else:
-                    log.info('The search_metadata parameter must be specified'
-                             ' as a dictionary.  Ignoring.')
-        if search_target and _match:
-            _match = False
-            if 'Target' in ret[item]:
-                targets = ret[item]['Target']
-                if isinstance(targets, six.string_types):
-                    targets = [targets]
-                for target in targets:
-                    for key in salt.utils.split_input(search_target):
-                        if fnmatch.fnmatch(target, key):
-                            _match = True
-
-        if search_function and _match:
-            _match = False
-            if 'Function' in ret[item]:
-                for key in salt.utils.split_input(search_function):
-                    if fnmatch.fnmatch(ret[item]['Function'], key):
-                        _match = True
-
-        if start_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_start_time = dateutil_parser.parse(start_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
-                if _start_time >= parsed_start_time:
-                    _match = True
-            else:
-                log.error(
-                    '\'dateutil\' library not available, skipping start_time '
-                    'comparison.'
-                )
-
-        if end_time and _match:
-            _match = False
-            if DATEUTIL_SUPPORT:
-                parsed_end_time = dateutil_parser.parse(end_time)
-                _start_time = dateutil_parser.parse(ret[item]['StartTime'])
-                if _start_time <= parsed_end_time:
-                    _match = True
-            else:
-                log.error(
-                    '\'dateutil\' library not available, skipping end_time '
-                    'comparison.'
-                )
-
-        if _match:
-            mret[item] = ret[item]
+    if search_metadata and not isinstance(search_metadata, dict):
+        log.info('The search_metadata parameter must be specified'
+                 ' as a dictionary.  Ignoring.')
+        search_metadata = None
+    start_jid = _time_to_jid(start_time, 'start_time')
+    end_jid = _time_to_jid(end_time, 'end_time')
+
+    fun = '{0}.get_jids_query'.format(returner)
+    if fun in mminion.returners:
+        mret = {}
+        for job in mminion.returners[fun](search_metadata=search_metadata,
+                                          search_function=search_function,
+                                          search_target=search_target,
+                                          search_user=search_user,
+                                          start_jid=start_jid,
+                                          end_jid=end_jid,
+                                          count=count,
+                                          offset=offset):
+            mret[job.pop('JID')] = job
+    else:
+        ret = mminion.returners['{0}.get_jids'.format(returner)]()
+        jids = sorted(
+            [jid for jid in ret
+             if (not start_jid or jid >= start_jid)
+             and (not end_jid or jid <= end_jid)
+             and salt.utils.jid.match_job_instance(
+                 ret[jid],
+                 search_metadata=search_metadata,
+                 search_function=search_function,
+                 search_target=search_target,
+                 search_user=search_user)],
+            reverse=True)
+        jids = jids[offset:offset + count if count else None]
+        mret = dict((jid, ret[jid]) for jid in jids)
 
     if outputter:
         return {'outputter': outputter, 'data': mret}
@@ -513,8 +509,12 @@ def last_run(ext_source=None,
             log.info('The metadata parameter must be specified as a dictionary')
             return False
 
-    _all_jobs = list_jobs(ext_source, outputter, metadata,
-                          function, target, display_progress)
+    _all_jobs = list_jobs(ext_source=ext_source,
+                          search_metadata=metadata,
+                          search_function=function,
+                          search_target=target,
+                          display_progress=display_progress,
+                          count=1)
     if _all_jobs:
         last_job = sorted(_all_jobs)[-1]
         return print_job(last_job, ext_source)
@@ -522,6 +522,22 @@ def last_run(ext_source=None,
         return False
 
 
+def _time_to_jid(timestamp, name):
+    '''
+    Return the job id of the jobs started at the given timestamp, the job
+    ids sort like their start times
+    '''
+    if not timestamp:
+        return None
+    if not DATEUTIL_SUPPORT:
+        log.error(
+            '\'dateutil\' library not available, skipping {0} '
+            'comparison.'.format(name)
+        )
+        return None
+    return '{0:%Y%m%d%H%M%S%f}'.format(dateutil_parser.parse(timestamp))
+
+
 def _get_returner(returner_types):
     '''
     Helper to iterate over returner_types and pick the first one
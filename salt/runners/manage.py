@@ -23,6 +23,7 @@ from salt.ext.six.moves.urllib.request import urlopen as _urlopen  # pylint: dis
 import salt.key
 import salt.utils
 import salt.utils.minions
+import salt.utils.presence
 import salt.client
 import salt.client.ssh
 import salt.wheel
@@ -58,10 +59,54 @@ def _ping(tgt, expr_form, timeout):
     return list(returned), list(not_returned)
 
 
+def _presence(tgt, expr_form, timeout=None):
+    '''
+    Split the targeted minions between the present and the other ones from
+    the presence table of the master. With a ``timeout`` the minions the
+    table does not show as present are pinged, so that minions which were
+    only idle for a while are not reported down.
+    '''
+    ckminions = salt.utils.minions.CkMinions(__opts__)
+    table = salt.utils.presence.PresenceTable(__opts__)
+    present = []
+    not_present = []
+    for minion in ckminions.check_minions(tgt, expr_form):
+        status = table.minion_status(minion, __opts__['presence_timeout'])
+        if status and status['present']:
+            present.append(minion)
+        else:
+            not_present.append(minion)
+    if not_present and timeout is not None:
+        returned, not_present = _ping(not_present, 'list', timeout)
+        present.extend(returned)
+    return sorted(present), sorted(not_present)
+
+
+def _presence_connected():
+    '''
+    Split all of the minions between the present and the other ones from the
+    presence table of the master. The minions the table does not show as
+    present, but which the presence detection shows as connected, are
+    present too: the table does not see the minions which stay idle.
+    '''
+    present, not_present = _presence('*', 'glob')
+    if not_present:
+        connected = set(list_state())
+        present = sorted(present + [minion for minion in not_present
+                                    if minion in connected])
+        not_present = [minion for minion in not_present
+                       if minion not in connected]
+    return present, not_present
+
+
 def status(output=True, tgt='*', expr_form='glob'):
     '''
     Print the status of all known salt minions
 
+    With :conf_master:`presence_table` enabled the status is read from the
+    presence table of the master, only the minions the table does not show as
+    present are pinged.
+
     CLI Example:
 
     .. code-block:: bash
@@ -70,7 +115,34 @@ def status(output=True, tgt='*', expr_form='glob'):
         salt-run manage.status tgt="webservers" expr_form="nodegroup"
     '''
     ret = {}
-    ret['up'], ret['down'] = _ping(tgt, expr_form, __opts__['timeout'])
+    if __opts__.get('presence_table'):
+        ret['up'], ret['down'] = _presence(tgt, expr_form, __opts__['timeout'])
+    else:
+        ret['up'], ret['down'] = _ping(tgt, expr_form, __opts__['timeout'])
+    return ret
+
+
+def last_seen(tgt='*', expr_form='glob'):
+    '''
+    .. versionadded:: Nitrogen
+
+    Print when the master last saw the targeted minions, from its presence
+    table (see :conf_master:`presence_table`). The time is a UNIX timestamp,
+    the state is ``connected`` or ``lost`` for the minions which connect
+    through the TCP transport, and ``seen`` otherwise.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run manage.last_seen
+        salt-run manage.last_seen tgt="webservers" expr_form="nodegroup"
+    '''
+    ckminions = salt.utils.minions.CkMinions(__opts__)
+    table = salt.utils.presence.PresenceTable(__opts__)
+    ret = {}
+    for minion in ckminions.check_minions(tgt, expr_form):
+        ret[minion] = table.minion_status(minion, __opts__['presence_timeout'])
     return ret
 
 
@@ -145,6 +217,8 @@ def down(removekeys=False, tgt='*', expr_form='glob'):
         if removekeys:
             wheel = salt.wheel.Wheel(__opts__)
             wheel.call_func('key.delete', match=minion)
+    if removekeys and __opts__.get('presence_table'):
+        salt.utils.presence.PresenceTable(__opts__).forget(ret)
     return ret
 
 
@@ -257,6 +331,11 @@ def present(subset=None, show_ipv4=False):
     Print a list of all minions that are up according to Salt's presence
     detection (no commands will be sent to minions)
 
+    With :conf_master:`presence_table` enabled, and without ``subset`` or
+    ``show_ipv4``, the minions are read from the presence table of the master,
+    and from the presence detection for the minions the table does not show
+    as present.
+
     subset : None
         Pass in a CIDR range to filter minions by IP address.
 
@@ -269,6 +348,8 @@ def present(subset=None, show_ipv4=False):
 
         salt-run manage.present
     '''
+    if __opts__.get('presence_table') and not subset and not show_ipv4:
+        return _presence_connected()[0]
     return list_state(subset=subset, show_ipv4=show_ipv4)
 
 
@@ -279,6 +360,11 @@ def not_present(subset=None, show_ipv4=False):
     Print a list of all minions that are NOT up according to Salt's presence
     detection (no commands will be sent)
 
+    With :conf_master:`presence_table` enabled, and without ``subset`` or
+    ``show_ipv4``, the minions are read from the presence table of the master,
+    and from the presence detection for the minions the table does not show
+    as present.
+
     subset : None
         Pass in a CIDR range to filter minions by IP address.
 
@@ -291,6 +377,8 @@ def not_present(subset=None, show_ipv4=False):
 
         salt-run manage.not_present
     '''
+    if __opts__.get('presence_table') and not subset and not show_ipv4:
+        return _presence_connected()[1]
     return list_not_state(subset=subset, show_ipv4=show_ipv4)
 
 
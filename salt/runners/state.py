@@ -8,6 +8,7 @@ import logging
 
 # Import salt libs
 import salt.loader
+import salt.minion
 import salt.utils
 import salt.utils.event
 from salt.exceptions import SaltInvocationError
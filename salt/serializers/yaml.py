@@ -30,7 +30,9 @@ BaseDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
 ERROR_MAP = {
     ("found character '\\t' "
-     "that cannot start any token"): 'Illegal tab character'
+     "that cannot start any token"): 'Illegal tab character',
+    # The same error as reported by libyaml
+    "found a tab character that violates indentation": 'Illegal tab character'
 }
 
 
@@ -48,9 +50,13 @@ def deserialize(stream_or_string, **options):
     except ScannerError as error:
         err_type = ERROR_MAP.get(error.problem, 'Unknown yaml render error')
         line_num = error.problem_mark.line + 1
+        buf = error.problem_mark.buffer
+        if buf is None and isinstance(stream_or_string, six.string_types):
+            # The libyaml parser does not keep the buffer in its marks
+            buf = stream_or_string
         raise DeserializationError(err_type,
                                    line_num,
-                                   error.problem_mark.buffer)
+                                   buf)
     except ConstructorError as error:
         raise DeserializationError(error)
     except Exception as error:
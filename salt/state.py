@@ -17,13 +17,17 @@ from __future__ import absolute_import
 import os
 import sys
 import copy
+import time
 import site
 import fnmatch
 import logging
 import datetime
 import traceback
 import re
+import json
 import random
+import hashlib
+import contextlib
 
 # Import salt libs
 import salt.utils
@@ -34,6 +38,7 @@ import salt.fileclient
 import salt.utils.dictupdate
 import salt.utils.event
 import salt.utils.url
+import salt.version
 import salt.syspaths as syspaths
 from salt.utils import immutabletypes
 from salt.template import compile_template, compile_template_str
@@ -57,6 +62,21 @@ from salt.ext.six.moves import map, range, reload_module
 log = logging.getLogger(__name__)
 
 
+# Options which change the result of compiling a highstate, used to validate
+# the compiled highstate cache
+STATE_COMPILE_CACHE_OPTS = (
+    'renderer',
+    'state_top',
+    'state_top_saltenv',
+    'environment',
+    'top_file_merging_strategy',
+    'env_order',
+    'default_top',
+    'state_auto_order',
+    'state_aggregate',
+    'failhard',
+)
+
 # These are keywords passed to state module functions which are to be used
 # by salt in this state module and not on the actual state module function
 STATE_REQUISITE_KEYWORDS = frozenset([
@@ -284,6 +304,95 @@ def mock_ret(cdata):
             'result': True}
 
 
+class _NullTimer(object):
+    '''
+    Context manager used in place of a timer when profiling is disabled
+    '''
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StateProfile(object):
+    '''
+    Collect the wall time spent in the phases of a state run.
+
+    Time is accumulated three ways: per phase for the whole run, per sls file
+    and per state, so that the hot spots of a run can be reported without
+    turning on debug logging.
+    '''
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = time.time()
+        self.phases = OrderedDict()
+        self.sls = {}
+        self.states = {}
+
+    def timer(self, section, sls=None, low=None):
+        '''
+        Return a context manager adding the time spent in its block to
+        ``section``, and to the given sls file and low chunk when passed
+        '''
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(section, sls, low)
+
+    def transfers(self, sls=None, low=None):
+        '''
+        Return a context manager adding the time the file clients spend
+        transferring files in its block to ``file_transfer``
+        '''
+        if not self.enabled:
+            return _NULL_TIMER
+        return salt.fileclient.time_transfers(
+            lambda elapsed: self.add('file_transfer', elapsed, sls, low))
+
+    @contextlib.contextmanager
+    def _timer(self, section, sls, low):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(section, time.time() - start, sls, low)
+
+    def add(self, section, elapsed, sls=None, low=None):
+        '''
+        Add ``elapsed`` seconds to ``section``
+        '''
+        self.phases[section] = self.phases.get(section, 0.0) + elapsed
+        if low is not None:
+            sls = low.get('__sls__', sls)
+            tag = _gen_tag(low)
+            if tag not in self.states:
+                self.states[tag] = {
+                    'id': low.get('__id__'),
+                    'function': '{0}.{1}'.format(low.get('state'),
+                                                 low.get('fun')),
+                    'sls': sls,
+                    'total': 0.0}
+            entry = self.states[tag]
+            entry[section] = entry.get(section, 0.0) + elapsed
+            entry['total'] += elapsed
+        if sls is not None:
+            entry = self.sls.setdefault(sls, {'total': 0.0})
+            entry[section] = entry.get(section, 0.0) + elapsed
+            entry['total'] += elapsed
+
+    def data(self):
+        '''
+        Return the collected timings as a serializable tree
+        '''
+        return {'total': time.time() - self.start,
+                'phases': dict(self.phases),
+                'sls': copy.deepcopy(self.sls),
+                'states': copy.deepcopy(self.states)}
+
+
 class StateError(Exception):
     '''
     Custom exception class.
@@ -643,8 +752,10 @@ class State(object):
             proxy=None,
             context=None,
             mocked=False,
-            loader='states'):
+            loader='states',
+            profile=False):
         self.states_loader = loader
+        self.profile = StateProfile(profile)
         if 'grains' not in opts:
             opts['grains'] = salt.loader.grains(opts)
         self.opts = opts
@@ -661,9 +772,13 @@ class State(object):
                     .format(', '.join(VALID_PILLAR_ENC))
                 )
         self._pillar_enc = pillar_enc
-        self.opts['pillar'] = self._gather_pillar()
+        with self.profile.timer('pillar'):
+            self.opts['pillar'] = self._gather_pillar()
         self.state_con = context or {}
-        self.load_modules(proxy=proxy)
+        # Shared by the state modules for the duration of this state run
+        self.states_con = {}
+        with self.profile.timer('load_modules'):
+            self.load_modules(proxy=proxy)
         self.active = set()
         self.mod_init = set()
         self.pre = {}
@@ -863,7 +978,11 @@ class State(object):
         if self.states_loader == 'thorium':
             self.states = salt.loader.thorium(self.opts, self.functions, {})  # TODO: Add runners
         else:
-            self.states = salt.loader.states(self.opts, self.functions, self.utils, self.serializers)
+            self.states = salt.loader.states(self.opts,
+                                             self.functions,
+                                             self.utils,
+                                             self.serializers,
+                                             context=self.states_con)
 
     def load_modules(self, data=None, proxy=None):
         '''
@@ -913,6 +1032,9 @@ class State(object):
                 log.error('Error encountered during module reload. Modules were not reloaded.')
             except TypeError:
                 log.error('Error encountered during module reload. Modules were not reloaded.')
+        if self.opts.get('virtual_cache', False):
+            # Packages installed by the run may make more modules available
+            salt.loader.clear_virtual_cache(self.opts)
         self.load_modules(proxy=self.proxy)
         if not self.opts.get('local', False) and self.opts.get('multiprocessing', True):
             self.functions['saltutil.refresh_modules']()
@@ -925,6 +1047,13 @@ class State(object):
         possible module type, e.g. a python, pyx, or .so. Always refresh if the
         function is recurse, since that can lay down anything.
         '''
+        if ret['changes']:
+            # Any state which changed something may have installed, removed
+            # or changed the source of packages (pkg and pkgrepo states, but
+            # also cmd.run, file and the like), drop the package database
+            # snapshot shared by the pkg states
+            self.states_con.pop('pkg.snapshot', None)
+
         _reload_modules = False
         if data.get('reload_grains', False):
             log.debug('Refreshing grains...')
@@ -1749,8 +1878,10 @@ class State(object):
                 if self.mocked:
                     ret = mock_ret(cdata)
                 else:
-                    ret = self.states[cdata['full']](*cdata['args'],
-                                                     **cdata['kwargs'])
+                    with self.profile.timer('call', low=low), \
+                            self.profile.transfers(low=low):
+                        ret = self.states[cdata['full']](*cdata['args'],
+                                                         **cdata['kwargs'])
                 self.states.inject_globals = {}
             if 'check_cmd' in low and '{0[state]}.mod_run_check_cmd'.format(low) not in self.states:
                 ret.update(self._run_check_cmd(low))
@@ -2076,17 +2207,19 @@ class State(object):
         Check if a chunk has any requires, execute the requires and then
         the chunk
         '''
-        low = self._mod_aggregate(low, running, chunks)
+        with self.profile.timer('aggregate', low=low):
+            low = self._mod_aggregate(low, running, chunks)
         self._mod_init(low)
         tag = _gen_tag(low)
         if not low.get('prerequired'):
             self.active.add(tag)
         requisites = ['require', 'watch', 'prereq', 'onfail', 'onchanges']
-        if not low.get('__prereq__'):
-            requisites.append('prerequired')
-            status, reqs = self.check_requisite(low, running, chunks, True)
-        else:
-            status, reqs = self.check_requisite(low, running, chunks)
+        with self.profile.timer('requisites', low=low):
+            if not low.get('__prereq__'):
+                requisites.append('prerequired')
+                status, reqs = self.check_requisite(low, running, chunks, True)
+            else:
+                status, reqs = self.check_requisite(low, running, chunks)
         if status == 'unmet':
             lost = {}
             reqs = []
@@ -2334,22 +2467,37 @@ class State(object):
         '''
         Process a high data call and ensure the defined states.
         '''
-        errors = []
-        # If there is extension data reconcile it
-        high, ext_errors = self.reconcile_extend(high)
-        errors += ext_errors
-        errors += self.verify_high(high)
-        if errors:
-            return errors
-        high, req_in_errors = self.requisite_in(high)
-        errors += req_in_errors
-        high = self.apply_exclude(high)
-        # Verify that the high data is structurally sound
+        chunks, errors = self.compile_high_chunks(high, orchestration_jid)
         if errors:
             return errors
-        # Compile and verify the raw chunks
-        chunks = self.compile_high_data(high, orchestration_jid)
-
+        return self.call_low_chunks(chunks)
+
+    def compile_high_chunks(self, high, orchestration_jid=None):
+        '''
+        Reconcile, verify and compile high data into the ordered low chunks.
+        Returns a tuple of the chunks and a list of errors.
+        '''
+        with self.profile.timer('compile'):
+            errors = []
+            # If there is extension data reconcile it
+            high, ext_errors = self.reconcile_extend(high)
+            errors += ext_errors
+            errors += self.verify_high(high)
+            if errors:
+                return [], errors
+            high, req_in_errors = self.requisite_in(high)
+            errors += req_in_errors
+            high = self.apply_exclude(high)
+            # Verify that the high data is structurally sound
+            if errors:
+                return [], errors
+            # Compile and verify the raw chunks
+            return self.compile_high_data(high, orchestration_jid), errors
+
+    def call_low_chunks(self, chunks):
+        '''
+        Execute compiled low chunks, skipping the disabled states
+        '''
         # Check for any disabled states
         disabled = {}
         if 'state_runs_disabled' in self.opts['grains']:
@@ -2374,10 +2522,6 @@ class State(object):
                         chunks.remove(low)
                         break
 
-        # If there are extensions in the highstate, process them and update
-        # the low data chunks
-        if errors:
-            return errors
         ret = dict(list(disabled.items()) + list(self.call_chunks(chunks).items()))
         ret = self.call_listen(chunks, ret)
 
@@ -2955,7 +3099,8 @@ class BaseHighState(object):
         Returns the high data derived from the top file
         '''
         try:
-            tops = self.get_tops()
+            with self.state.profile.timer('render_top'):
+                tops = self.get_tops()
         except SaltRenderError as err:
             log.error('Unable to render top file: ' + str(err.error))
             return {}
@@ -3024,7 +3169,8 @@ class BaseHighState(object):
         '''
         errors = []
         if not local:
-            state_data = self.client.get_state(sls, saltenv)
+            with self.state.profile.timer('file_transfer', sls=sls):
+                state_data = self.client.get_state(sls, saltenv)
             fn_ = state_data.get('dest', False)
         else:
             fn_ = sls
@@ -3041,15 +3187,16 @@ class BaseHighState(object):
             )
         state = None
         try:
-            state = compile_template(fn_,
-                                     self.state.rend,
-                                     self.state.opts['renderer'],
-                                     self.state.opts['renderer_blacklist'],
-                                     self.state.opts['renderer_whitelist'],
-                                     saltenv,
-                                     sls,
-                                     rendered_sls=mods
-                                     )
+            with self.state.profile.timer('render', sls=sls):
+                state = compile_template(fn_,
+                                         self.state.rend,
+                                         self.state.opts['renderer'],
+                                         self.state.opts['renderer_blacklist'],
+                                         self.state.opts['renderer_whitelist'],
+                                         saltenv,
+                                         sls,
+                                         rendered_sls=mods
+                                         )
         except SaltRenderError as exc:
             msg = 'Rendering SLS \'{0}:{1}\' failed: {2}'.format(
                 saltenv, sls, exc
@@ -3477,39 +3624,46 @@ class BaseHighState(object):
                 with salt.utils.fopen(cfn, 'rb') as fp_:
                     high = self.serial.load(fp_)
                     return self.state.call_high(high, orchestration_jid)
+        compiled = self.opts.get('state_compile_cache', False) \
+            and orchestration_jid is None
+        if compiled and self._check_pillar(force):
+            chunks = self.load_compiled_chunks(cache_name, exclude, whitelist)
+            if chunks is not None:
+                return self.state.call_low_chunks(chunks)
         # File exists so continue
         err = []
-        try:
-            top = self.get_top()
-        except SaltRenderError as err:
-            ret[tag_name]['comment'] = 'Unable to render top file: '
-            ret[tag_name]['comment'] += str(err.error)
-            return ret
-        except Exception:
-            trb = traceback.format_exc()
-            err.append(trb)
-            return err
-        err += self.verify_tops(top)
-        matches = self.top_matches(top)
-        if not matches:
-            msg = 'No Top file or external nodes data matches found.'
-            ret[tag_name]['comment'] = msg
-            return ret
-        matches = self.matches_whitelist(matches, whitelist)
-        self.load_dynamic(matches)
-        if not self._check_pillar(force):
-            err += ['Pillar failed to render with the following messages:']
-            err += self.state.opts['pillar']['_errors']
-        else:
-            high, errors = self.render_highstate(matches)
-            if exclude:
-                if isinstance(exclude, str):
-                    exclude = exclude.split(',')
-                if '__exclude__' in high:
-                    high['__exclude__'].extend(exclude)
-                else:
-                    high['__exclude__'] = exclude
-            err += errors
+        with salt.fileclient.record_sources() as sources:
+            try:
+                top = self.get_top()
+            except SaltRenderError as err:
+                ret[tag_name]['comment'] = 'Unable to render top file: '
+                ret[tag_name]['comment'] += str(err.error)
+                return ret
+            except Exception:
+                trb = traceback.format_exc()
+                err.append(trb)
+                return err
+            err += self.verify_tops(top)
+            matches = self.top_matches(top)
+            if not matches:
+                msg = 'No Top file or external nodes data matches found.'
+                ret[tag_name]['comment'] = msg
+                return ret
+            matches = self.matches_whitelist(matches, whitelist)
+            self.load_dynamic(matches)
+            if not self._check_pillar(force):
+                err += ['Pillar failed to render with the following messages:']
+                err += self.state.opts['pillar']['_errors']
+            else:
+                high, errors = self.render_highstate(matches)
+                if exclude:
+                    if isinstance(exclude, str):
+                        exclude = exclude.split(',')
+                    if '__exclude__' in high:
+                        high['__exclude__'].extend(exclude)
+                    else:
+                        high['__exclude__'] = exclude
+                err += errors
         if err:
             return err
         if not high:
@@ -3530,8 +3684,115 @@ class BaseHighState(object):
             log.error(msg.format(cfn))
 
         os.umask(cumask)
+        if compiled:
+            chunks, errors = self.state.compile_high_chunks(high)
+            if errors:
+                return errors
+            self.store_compiled_chunks(
+                cache_name, exclude, whitelist, matches, sources, chunks)
+            return self.state.call_low_chunks(chunks)
         return self.state.call_high(high, orchestration_jid)
 
+    def _compiled_cache_path(self, cache_name):
+        return os.path.join(
+                self.opts['cachedir'],
+                '{0}.compiled.cache.p'.format(cache_name)
+        )
+
+    def _compiled_cache_key(self, exclude, whitelist):
+        '''
+        Return the hashes of the data, other than the state files, which the
+        compiled low chunks depend on
+        '''
+        def _hash(data):
+            return hashlib.sha256(salt.utils.to_bytes(
+                json.dumps(data, sort_keys=True, default=repr))).hexdigest()
+
+        if isinstance(exclude, six.string_types):
+            exclude = exclude.split(',')
+        context = {
+            'version': salt.version.__version__,
+            'exclude': exclude,
+            'whitelist': whitelist,
+            'avail': self.avail,
+            'ext_nodes': self.client.ext_nodes(),
+            'opts': dict((opt, self.opts.get(opt))
+                         for opt in STATE_COMPILE_CACHE_OPTS),
+        }
+        try:
+            return {'grains': _hash(self.opts.get('grains', {})),
+                    'pillar': _hash(self.state.opts.get('pillar', {})),
+                    'context': _hash(context)}
+        except (TypeError, ValueError) as exc:
+            log.debug('Unable to hash the compiled highstate inputs: {0}'.format(exc))
+            return None
+
+    def _source_hash(self, path, saltenv):
+        return self.client.hash_file(path, saltenv).get('hsum')
+
+    def load_compiled_chunks(self, cache_name, exclude=None, whitelist=None):
+        '''
+        Return the low chunks compiled by a previous highstate run if the top
+        file, all rendered SLS files, the pillar and the grains are unchanged,
+        otherwise return None
+        '''
+        cfn = self._compiled_cache_path(cache_name)
+        if not os.path.isfile(cfn):
+            return None
+        try:
+            with salt.utils.fopen(cfn, 'rb') as fp_:
+                data = self.serial.load(fp_)
+        except Exception as exc:
+            log.debug('Unable to read compiled highstate cache {0}: {1}'.format(cfn, exc))
+            return None
+        key = self._compiled_cache_key(exclude, whitelist)
+        if key is None or not isinstance(data, dict):
+            return None
+        for item in key:
+            if data.get('key', {}).get(item) != key[item]:
+                log.debug('Compiled highstate is stale, {0} changed'.format(item))
+                return None
+        for path, saltenv, hsum in data.get('sources', []):
+            if self._source_hash(path, saltenv) != hsum:
+                log.debug(
+                    'Compiled highstate is stale, {0} in saltenv {1} '
+                    'changed'.format(path, saltenv)
+                )
+                return None
+        log.debug('Using compiled highstate from {0}'.format(cfn))
+        self.load_dynamic(data['matches'])
+        return data['chunks']
+
+    def store_compiled_chunks(self, cache_name, exclude, whitelist, matches,
+                              sources, chunks):
+        '''
+        Write the compiled low chunks along with the hashes of everything they
+        were compiled from
+        '''
+        key = self._compiled_cache_key(exclude, whitelist)
+        if key is None:
+            return
+        data = {'key': key,
+                'matches': matches,
+                'sources': [(path, saltenv, self._source_hash(path, saltenv))
+                            for path, saltenv in sources],
+                'chunks': chunks}
+        cfn = self._compiled_cache_path(cache_name)
+        cumask = os.umask(0o77)
+        try:
+            with salt.utils.fopen(cfn, 'w+b') as fp_:
+                self.serial.dump(data, fp_)
+        except TypeError:
+            # Can't serialize pydsl
+            try:
+                os.remove(cfn)
+            except OSError:
+                pass
+        except (IOError, OSError):
+            log.error('Unable to write compiled highstate cache file {0}'.format(cfn))
+        finally:
+            os.umask(cumask)
+
     def compile_highstate(self):
         '''
         Return just the highstate or the errors
@@ -3632,7 +3893,8 @@ class HighState(BaseHighState):
             proxy=None,
             context=None,
             mocked=False,
-            loader='states'):
+            loader='states',
+            profile=False):
         self.opts = opts
         self.client = salt.fileclient.get_file_client(self.opts)
         BaseHighState.__init__(self, opts)
@@ -3644,7 +3906,8 @@ class HighState(BaseHighState):
                            proxy=proxy,
                            context=context,
                            mocked=mocked,
-                           loader=loader)
+                           loader=loader,
+                           profile=profile)
         self.matcher = salt.minion.Matcher(self.opts)
 
         # tracks all pydsl state declarations globally across sls files
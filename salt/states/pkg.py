@@ -75,6 +75,7 @@ state module
 
 # Import python libs
 from __future__ import absolute_import
+import fnmatch
 import logging
 import os
 import re
@@ -230,6 +231,78 @@ def _fulfills_version_spec(versions, oper, desired_version,
     return False
 
 
+def _get_snapshot():
+    '''
+    Internal use only in this module
+
+    Return the snapshot of the package database shared by the pkg states of
+    the running highstate, or None if ``state_pkg_snapshot`` is disabled. The
+    state system drops the snapshot when a pkg state changes the installed
+    packages.
+    '''
+    if __context__ is None or not __opts__.get('state_pkg_snapshot', False):
+        return None
+    return __context__.setdefault('pkg.snapshot', {})
+
+
+def _snapshot_key(func, kwargs, ignore=()):
+    '''
+    Internal use only in this module
+
+    Return the key of the snapshot entry for a call to ``func`` with the
+    given keyword arguments. State internals passed along in the kwargs are
+    left out.
+    '''
+    return '{0}:{1!r}'.format(
+        func,
+        sorted((key, val) for key, val in six.iteritems(kwargs)
+               if not key.startswith('__') and key not in ignore))
+
+
+def _list_pkgs(**kwargs):
+    '''
+    Internal use only in this module
+
+    Return the installed packages, from the snapshot of the package database
+    if it is enabled. The returned dict is shared, do not modify it.
+    '''
+    snapshot = _get_snapshot()
+    if snapshot is None:
+        return __salt__['pkg.list_pkgs'](**kwargs)
+    key = _snapshot_key('list_pkgs', kwargs)
+    if key not in snapshot:
+        snapshot[key] = __salt__['pkg.list_pkgs'](**kwargs)
+    return snapshot[key]
+
+
+def _latest_version(*names, **kwargs):
+    '''
+    Internal use only in this module
+
+    Return the latest available versions like ``pkg.latest_version``. With the
+    package database snapshot enabled the versions are remembered, and only
+    the packages not looked up yet by an earlier pkg state are passed to the
+    package manager, unless a refresh of the database is requested.
+    '''
+    snapshot = _get_snapshot()
+    if snapshot is None:
+        return __salt__['pkg.latest_version'](*names, **kwargs)
+    cache = snapshot.setdefault(
+        _snapshot_key('latest_version', kwargs, ignore=('refresh',)), {})
+    if salt.utils.is_true(kwargs.get('refresh')):
+        missing = list(names)
+    else:
+        missing = [x for x in names if x not in cache]
+    if missing:
+        avail = __salt__['pkg.latest_version'](*missing, **kwargs)
+        if len(missing) == 1 and not isinstance(avail, dict):
+            avail = {missing[0]: avail}
+        cache.update(avail)
+    if len(names) == 1:
+        return cache.get(names[0], '')
+    return dict((x, cache.get(x, '')) for x in names)
+
+
 def _find_unpurge_targets(desired):
     '''
     Find packages which are marked to be purged but can't yet be removed
@@ -237,10 +310,8 @@ def _find_unpurge_targets(desired):
     packages which will need to be 'unpurged' because they are part of
     pkg.installed states. This really just applies to Debian-based Linuxes.
     '''
-    return [
-        x for x in desired
-        if x in __salt__['pkg.list_pkgs'](purge_desired=True)
-    ]
+    purge_desired = _list_pkgs(purge_desired=True)
+    return [x for x in desired if x in purge_desired]
 
 
 def _find_remove_targets(name=None,
@@ -255,7 +326,7 @@ def _find_remove_targets(name=None,
     '''
     if __grains__['os'] == 'FreeBSD':
         kwargs['with_origin'] = True
-    cur_pkgs = __salt__['pkg.list_pkgs'](versions_as_list=True, **kwargs)
+    cur_pkgs = _list_pkgs(versions_as_list=True, **kwargs)
     if pkgs:
         to_remove = _repack_pkgs(pkgs, normalize=normalize)
 
@@ -378,7 +449,7 @@ def _find_install_targets(name=None,
         kwargs['with_origin'] = True
 
     try:
-        cur_pkgs = __salt__['pkg.list_pkgs'](versions_as_list=True, **kwargs)
+        cur_pkgs = _list_pkgs(versions_as_list=True, **kwargs)
     except CommandExecutionError as exc:
         return {'name': name,
                 'changes': {},
@@ -1266,9 +1337,9 @@ def installed(
 
     if version is not None and version == 'latest':
         try:
-            version = __salt__['pkg.latest_version'](name,
-                                                     fromrepo=fromrepo,
-                                                     refresh=refresh)
+            version = _latest_version(name,
+                                      fromrepo=fromrepo,
+                                      refresh=refresh)
         except CommandExecutionError as exc:
             refresh = _refresh_tag_file(refresh=False)  # del tag
             return {'name': name,
@@ -1872,10 +1943,10 @@ def latest(
     refresh = _refresh_tag_file(refresh=refresh)
 
     try:
-        avail = __salt__['pkg.latest_version'](*desired_pkgs,
-                                               fromrepo=fromrepo,
-                                               refresh=refresh,
-                                               **kwargs)
+        avail = _latest_version(*desired_pkgs,
+                                fromrepo=fromrepo,
+                                refresh=refresh,
+                                **kwargs)
     except CommandExecutionError as exc:
         refresh = _refresh_tag_file(refresh=False)  # del tag
         return {'name': name,
@@ -2624,10 +2695,46 @@ def mod_init(low):
     return False
 
 
+def _aggregate_requisites_met(chunk, chunks, running):
+    '''
+    Return True when the packages of a chunk can be installed now with the
+    aggregated state: every state it requires already ran, and it has no
+    requisite which decides whether it runs at all
+    '''
+    for req_type in ('watch', 'prereq', 'onfail', 'onchanges', 'listen'):
+        if chunk.get(req_type):
+            return False
+    for req in chunk.get('require') or []:
+        if isinstance(req, six.string_types):
+            req = {'id': req}
+        req_key = next(iter(req))
+        req_val = req[req_key]
+        if req_val is None:
+            continue
+        for req_chunk in chunks:
+            if req_key == 'sls':
+                if not fnmatch.fnmatch(req_chunk.get('__sls__', ''), req_val):
+                    continue
+            elif not (fnmatch.fnmatch(req_chunk['name'], req_val) or
+                      fnmatch.fnmatch(req_chunk['__id__'], req_val)):
+                continue
+            elif req_key != 'id' and req_chunk['state'] != req_key:
+                continue
+            if salt.utils.gen_state_tag(req_chunk) not in running:
+                return False
+    return True
+
+
 def mod_aggregate(low, chunks, running):
     '''
     The mod_aggregate function which looks up all packages in the available
     low chunks and merges them into a single pkgs ref in the present low data
+
+    .. versionchanged:: Nitrogen
+        Versions set in the merged states are kept, and states using
+        ``sources`` are no longer merged or merged into. States requiring
+        states which did not run yet, or using other requisites, are not
+        merged and run on their own.
     '''
     pkgs = []
     agg_enabled = [
@@ -2638,6 +2745,9 @@ def mod_aggregate(low, chunks, running):
     ]
     if low.get('fun') not in agg_enabled:
         return low
+    if 'sources' in low:
+        # Packages installed from sources can't be merged with pkgs
+        return low
     for chunk in chunks:
         tag = salt.utils.gen_state_tag(chunk)
         if tag in running:
@@ -2652,12 +2762,24 @@ def mod_aggregate(low, chunks, running):
             # Check for the same repo
             if chunk.get('fromrepo') != low.get('fromrepo'):
                 continue
+            # Packages installed from sources can't be merged into pkgs
+            if 'sources' in chunk:
+                continue
+            # Installing the packages now must not skip their requisites
+            if chunk is not low and not _aggregate_requisites_met(
+                    chunk, chunks, running):
+                continue
             # Pull out the pkg names!
             if 'pkgs' in chunk:
                 pkgs.extend(chunk['pkgs'])
                 chunk['__agg__'] = True
             elif 'name' in chunk:
-                pkgs.append(chunk['name'])
+                version = chunk.get('version')
+                if version is not None and version != 'latest':
+                    # Keep the version pinned by the state
+                    pkgs.append({chunk['name']: version})
+                else:
+                    pkgs.append(chunk['name'])
                 chunk['__agg__'] = True
     if pkgs:
         if 'pkgs' in low:
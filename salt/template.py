@@ -14,6 +14,7 @@ import logging
 # Import salt libs
 import salt.utils
 import salt.utils.files
+import salt.utils.render_cache
 from salt.utils.odict import OrderedDict
 from salt._compat import string_io
 from salt.ext.six import string_types
@@ -81,6 +82,43 @@ def compile_template(template,
     # Get the list of render funcs in the render pipe line.
     render_pipe = template_shebang(template, renderers, default, blacklist, whitelist, input_data)
 
+    # Memoize the render if the render_cache option is enabled
+    render_cache = context = key = None
+    if render_pipe:
+        render_globals = salt.utils.render_cache.render_globals(render_pipe[0][0])
+        render_cache = salt.utils.render_cache.get_cache(render_globals.get('__opts__'))
+    if render_cache is not None and render_cache.cacheable(render_pipe):
+        context = salt.utils.render_cache.render_context(render_pipe)
+    if context is not None:
+        key = salt.utils.render_cache.cache_key(
+            template, input_data, render_pipe, saltenv, sls, kwargs)
+    if key is None:
+        return _render_pipe(render_pipe, template, input_data, renderers,
+                            saltenv, sls, **kwargs)
+
+    grains = context['grains']
+    pillar = context['pillar']
+    opts = context['opts']
+    cached = render_cache.fetch(key, grains, pillar, opts)
+    if cached is not salt.utils.render_cache.MISSING:
+        log.debug('Using memoized render of template: {0}'.format(template))
+        return cached
+
+    recorder = salt.utils.render_cache.Recorder(grains, pillar, context['salt'],
+                                                opts)
+    with recorder.inject(context):
+        ret = _render_pipe(render_pipe, template, input_data, renderers,
+                           saltenv, sls, **kwargs)
+    render_cache.store(key, recorder, ret)
+    return ret
+
+
+def _render_pipe(render_pipe, template, input_data, renderers, saltenv, sls,
+                 **kwargs):
+    '''
+    Feed the input data through each render function in the pipe
+    '''
+    ret = {}
     input_data = string_io(input_data)
     for render, argline in render_pipe:
         # For GPG renderer, input_data can be an OrderedDict (from YAML) or dict (from py renderer).
@@ -159,6 +159,8 @@ class IPCServer(object):
                         raw_body=True,
                     )
                     yield stream.write(pack)
+                # Lets the handlers check the client is still connected
+                return_message.stream = stream
                 return return_message
             else:
                 return _null
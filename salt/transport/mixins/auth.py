@@ -16,6 +16,7 @@ import salt.payload
 import salt.master
 import salt.transport.frame
 import salt.utils.event
+import salt.utils.presence
 import salt.ext.six as six
 from salt.utils.cache import CacheCli
 
@@ -80,6 +81,9 @@ class AESReqServerMixin(object):
         # Create the event manager
         self.event = salt.utils.event.get_master_event(self.opts, self.opts['sock_dir'], listen=False)
         self.auto_key = salt.daemons.masterapi.AutoKey(self.opts)
+        self.presence = None
+        if self.opts.get('presence_table'):
+            self.presence = salt.utils.presence.PresenceTable(self.opts)
 
         # only create a con_cache-client if the con_cache is active
         if self.opts['con_cache']:
@@ -470,4 +474,6 @@ class AESReqServerMixin(object):
                  'id': load['id'],
                  'pub': load['pub']}
         self.event.fire_event(eload, salt.utils.event.tagify(prefix='auth'))
+        if self.presence is not None:
+            self.presence.seen(load['id'])
         return ret
@@ -23,6 +23,7 @@ import salt.utils
 import salt.utils.verify
 import salt.utils.event
 import salt.utils.async
+import salt.utils.presence
 import salt.payload
 import salt.exceptions
 import salt.transport.frame
@@ -1081,6 +1082,12 @@ class PubServer(tornado.tcpserver.TCPServer, object):
                 opts=self.opts,
                 listen=False
             )
+        self.presence_table = None
+        if self.opts.get('presence_table'):
+            self.presence_table = salt.utils.presence.PresenceTable(self.opts)
+            # No minion is connected yet, the connections recorded before
+            # the master restarted are gone
+            self.presence_table.reset_connected()
 
     def close(self):
         if self._closing:
@@ -1097,6 +1104,8 @@ class PubServer(tornado.tcpserver.TCPServer, object):
             clients.add(client)
         else:
             self.present[id_] = set([client])
+            if self.presence_table is not None:
+                self.presence_table.connected(id_)
             if self.presence_events:
                 data = {'new': [id_],
                         'lost': []}
@@ -1128,6 +1137,8 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         clients.remove(client)
         if len(clients) == 0:
             del self.present[id_]
+            if self.presence_table is not None:
+                self.presence_table.lost(id_)
             if self.presence_events:
                 data = {'new': [],
                         'lost': [id_]}
@@ -52,12 +52,6 @@ except ImportError:
     HAS_CPROFILE = False
 
 # Import 3rd-party libs
-try:
-    import Crypto.Random
-    HAS_CRYPTO = True
-except ImportError:
-    HAS_CRYPTO = False
-
 try:
     import timelib
     HAS_TIMELIB = True
@@ -447,8 +441,11 @@ def reinit_crypto():
         child processes after using os.fork()
 
     '''
-    if HAS_CRYPTO:
-        Crypto.Random.atfork()
+    # The random number generator only needs a reinit once it has been
+    # imported, keep pycrypto out of the processes which do not use it
+    crypto_random = sys.modules.get('Crypto.Random')
+    if crypto_random is not None:
+        crypto_random.atfork()
 
 
 def daemonize(redirect_out=True):
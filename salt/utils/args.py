@@ -9,6 +9,7 @@ import re
 import inspect
 
 # Import salt libs
+import salt.utils
 import salt.utils.jid
 
 # Import 3rd-party libs
@@ -204,3 +205,68 @@ def get_function_argspec(func):
                 'Cannot inspect argument list for \'{0}\''.format(func)
             )
     return aspec
+
+
+def load_args_and_kwargs(func, args, data=None, ignore_invalid=False):
+    '''
+    Detect the args and kwargs that need to be passed to a function call, and
+    check them against what was passed.
+    '''
+    argspec = get_function_argspec(func)
+    _args = []
+    _kwargs = {}
+    invalid_kwargs = []
+
+    for arg in args:
+        if isinstance(arg, six.string_types):
+            string_arg, string_kwarg = parse_input([arg], condition=False)  # pylint: disable=W0632
+            if string_arg:
+                # Don't append the version that was just derived from parse_cli
+                # above, that would result in a 2nd call to
+                # salt.utils.cli.yamlify_arg(), which could mangle the input.
+                _args.append(arg)
+            elif string_kwarg:
+                salt.utils.warn_until(
+                    'Nitrogen',
+                    'The list of function args and kwargs should be parsed '
+                    'by parse_input() before calling '
+                    'salt.utils.args.load_args_and_kwargs().'
+                )
+                if argspec.keywords or next(six.iterkeys(string_kwarg)) in argspec.args:
+                    # Function supports **kwargs or is a positional argument to
+                    # the function.
+                    _kwargs.update(string_kwarg)
+                else:
+                    # **kwargs not in argspec and parsed argument name not in
+                    # list of positional arguments. This keyword argument is
+                    # invalid.
+                    for key, val in six.iteritems(string_kwarg):
+                        invalid_kwargs.append('{0}={1}'.format(key, val))
+                continue
+
+        # if the arg is a dict with __kwarg__ == True, then its a kwarg
+        elif isinstance(arg, dict) and arg.pop('__kwarg__', False) is True:
+            for key, val in six.iteritems(arg):
+                if argspec.keywords or key in argspec.args:
+                    # Function supports **kwargs or is a positional argument to
+                    # the function.
+                    _kwargs[key] = val
+                else:
+                    # **kwargs not in argspec and parsed argument name not in
+                    # list of positional arguments. This keyword argument is
+                    # invalid.
+                    invalid_kwargs.append('{0}={1}'.format(key, val))
+            continue
+
+        else:
+            _args.append(arg)
+
+    if invalid_kwargs and not ignore_invalid:
+        salt.utils.invalid_kwargs(invalid_kwargs)
+
+    if argspec.keywords and isinstance(data, dict):
+        # this function accepts **kwargs, pack in the publish data
+        for key, val in six.iteritems(data):
+            _kwargs['__pub_{0}'.format(key)] = val
+
+    return _args, _kwargs
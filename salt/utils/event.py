@@ -1277,6 +1277,7 @@ class StateFire(object):
     def __init__(self, opts, auth=None):
         self.opts = opts
         if not auth:
+            import salt.crypt
             self.auth = salt.crypt.SAuth(self.opts)
         else:
             self.auth = auth
@@ -4,9 +4,11 @@ from __future__ import print_function
 
 from calendar import month_abbr as months
 import datetime
+import fnmatch
 import hashlib
 import os
 
+import salt.utils
 from salt.ext import six
 
 
@@ -77,6 +79,41 @@ def format_job_instance(job):
     return ret
 
 
+def match_job_instance(job,
+                       search_metadata=None,
+                       search_function=None,
+                       search_target=None,
+                       search_user=None):
+    '''
+    Return True if a job formatted by format_job_instance matches all of the
+    given filters. The function, target and user filters are lists or comma
+    separated strings of globs, the job matches when any of the metadata
+    key-value pairs match.
+    '''
+    if search_metadata:
+        metadata = job.get('Metadata')
+        if not isinstance(search_metadata, dict) or not isinstance(metadata, dict):
+            return False
+        if not any(key in metadata and metadata[key] == val
+                   for key, val in six.iteritems(search_metadata)):
+            return False
+    for search, field in ((search_function, 'Function'),
+                          (search_target, 'Target'),
+                          (search_user, 'User')):
+        if not search:
+            continue
+        values = job.get(field)
+        if values is None:
+            return False
+        if isinstance(values, six.string_types):
+            values = [values]
+        globs = salt.utils.split_input(search)
+        if not any(fnmatch.fnmatch(str(value), glob)
+                   for value in values for glob in globs):
+            return False
+    return True
+
+
 def format_jid_instance(jid, job):
     '''
     Format the jid correctly
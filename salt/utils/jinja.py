@@ -26,6 +26,7 @@ import yaml
 import salt
 import salt.utils
 import salt.utils.url
+import salt.utils.render_cache
 import salt.fileclient
 from salt.utils.odict import OrderedDict
 
@@ -84,6 +85,7 @@ class SaltCacheLoader(BaseLoader):
         Cache a file from the salt master
         '''
         saltpath = salt.utils.url.create(template)
+        salt.fileclient.record_source(saltpath, self.saltenv)
         self.file_client().get_file(saltpath, '', True, self.saltenv)
 
     def check_cache(self, template):
@@ -121,6 +123,7 @@ class SaltCacheLoader(BaseLoader):
                 with salt.utils.fopen(filepath, 'rb') as ifile:
                     contents = ifile.read().decode(self.encoding)
                     mtime = path.getmtime(filepath)
+                    salt.utils.render_cache.record_file(filepath)
 
                     def uptodate():
                         try:
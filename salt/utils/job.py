@@ -2,14 +2,20 @@
 
 # Import Python libs
 from __future__ import absolute_import
+import errno
 import logging
+import os
+import time
 
 # Import Salt libs
-import salt.minion
+import salt.utils
 import salt.utils.jid
 import salt.utils.event
 import salt.utils.verify
 
+# Import 3rd-party libs
+import salt.ext.six as six
+
 log = logging.getLogger(__name__)
 
 
@@ -25,7 +31,8 @@ def store_job(opts, load, event=None, mminion=None):
     if not salt.utils.verify.valid_id(opts, load['id']):
         return False
     if mminion is None:
-        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+        from salt.minion import MasterMinion
+        mminion = MasterMinion(opts, states=False, rend=False)
 
     job_cache = opts['master_job_cache']
     if load['jid'] == 'req':
@@ -111,7 +118,8 @@ def store_minions(opts, jid, minions, mminion=None, syndic_id=None):
     master_job_cache
     '''
     if mminion is None:
-        mminion = salt.minion.MasterMinion(opts, states=False, rend=False)
+        from salt.minion import MasterMinion
+        mminion = MasterMinion(opts, states=False, rend=False)
     job_cache = opts['master_job_cache']
     minions_fstr = '{0}.save_minions'.format(job_cache)
 
@@ -138,4 +146,125 @@ def get_retcode(ret):
         return 1
     return retcode
 
+
+def heartbeat_tag(jid, minion):
+    '''
+    Return the tag of the heartbeat a minion sends while it runs a job
+    '''
+    return salt.utils.event.tagify([jid, 'alive', minion], 'job')
+
+
+def heartbeat_minion(tag, jid):
+    '''
+    Return the minion which sent a heartbeat for a job from the tag of the
+    event, None if the event is not a heartbeat for the job.
+
+    The heartbeats reach the master bus as the ``{'tag': ..., 'data': ...}``
+    events the minion sent, so the tag is what tells the minion apart.
+    '''
+    prefix = heartbeat_tag(jid, '') + salt.utils.event.TAGPARTER
+    if not isinstance(tag, six.string_types) or not tag.startswith(prefix):
+        return None
+    return tag[len(prefix):] or None
+
+
+class JobLiveness(object):
+    '''
+    Track which minions are still running a job, from the heartbeats they send
+    while the job runs.
+
+    A heartbeat touches ``job_liveness/<jid>/<minion>`` in the cachedir of
+    the master, so that the master workers which receive the heartbeats and
+    the clients waiting for the returns share the tracker.
+    '''
+    def __init__(self, opts):
+        self.opts = opts
+        self.path = os.path.join(opts['cachedir'], 'job_liveness')
+
+    def _minion_path(self, jid, minion):
+        if not salt.utils.jid.is_jid(jid):
+            return None
+        if not salt.utils.verify.valid_id(self.opts, minion):
+            return None
+        return os.path.join(self.path, jid, minion)
+
+    def beat(self, jid, minion):
+        '''
+        Record that a minion is running a job
+        '''
+        path = self._minion_path(jid, minion)
+        if path is None:
+            return False
+        try:
+            os.utime(path, None)
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            jid_dir = os.path.dirname(path)
+            if not os.path.isdir(jid_dir):
+                try:
+                    os.makedirs(jid_dir)
+                except OSError:
+                    if not os.path.isdir(jid_dir):
+                        raise
+            with salt.utils.fopen(path, 'w'):
+                pass
+        return True
+
+    def clear(self, jid, minion):
+        '''
+        Forget a minion which returned a job
+        '''
+        path = self._minion_path(jid, minion)
+        if path is None:
+            return
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            # Gone already, or other minions are still running the job
+            pass
+
+    def alive(self, jid, max_age):
+        '''
+        Return the minions which sent a heartbeat for a job in the last
+        ``max_age`` seconds
+        '''
+        ret = set()
+        if not salt.utils.jid.is_jid(jid):
+            return ret
+        jid_dir = os.path.join(self.path, jid)
+        try:
+            minions = os.listdir(jid_dir)
+        except OSError:
+            return ret
+        oldest = time.time() - max_age
+        for minion in minions:
+            try:
+                if os.stat(os.path.join(jid_dir, minion)).st_mtime >= oldest:
+                    ret.add(minion)
+            except OSError:
+                continue
+        return ret
+
+    def clean(self, max_age):
+        '''
+        Remove the heartbeats older than ``max_age`` seconds
+        '''
+        oldest = time.time() - max_age
+        try:
+            jids = os.listdir(self.path)
+        except OSError:
+            return
+        for jid in jids:
+            jid_dir = os.path.join(self.path, jid)
+            try:
+                for minion in os.listdir(jid_dir):
+                    path = os.path.join(jid_dir, minion)
+                    if os.stat(path).st_mtime < oldest:
+                        os.remove(path)
+                os.rmdir(jid_dir)
+            except OSError:
+                continue
+
 # vim:set et sts=4 ts=4 tw=80:
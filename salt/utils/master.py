@@ -21,6 +21,7 @@ import salt.client
 import salt.pillar
 import salt.utils
 import salt.utils.atomicfile
+import salt.utils.mine
 import salt.utils.minions
 import salt.payload
 from salt.exceptions import SaltException
@@ -341,6 +342,10 @@ class MasterPillarUtil(object):
             # to read in the pillar/grains data since they are both stored
             # in the same file, 'data.p'
             grains, pillars = self._get_cached_minion_data(*minion_ids)
+        mine_index = None
+        if (clear_mine or clear_mine_func is not None) and \
+                self.opts.get('mine_index', False):
+            mine_index = salt.utils.mine.MineIndex(self.opts, self.cache)
         try:
             c_minions = self.cache.list('minions')
             for minion_id in minion_ids:
@@ -364,13 +369,20 @@ class MasterPillarUtil(object):
                     self.cache.store(bank, 'data', {'pillar': minion_pillar})
                 if clear_mine:
                     # Delete the whole mine file
+                    if mine_index is not None:
+                        mine_data = self.cache.fetch(bank, 'mine')
                     self.cache.flush(bank, 'mine')
+                    if mine_index is not None:
+                        mine_index.update(minion_id, mine_data, None)
                 elif clear_mine_func is not None:
                     # Delete a specific function from the mine file
                     mine_data = self.cache.fetch(bank, 'mine')
                     if isinstance(mine_data, dict):
+                        old = dict(mine_data)
                         if mine_data.pop(clear_mine_func, False):
                             self.cache.store(bank, 'mine', mine_data)
+                            if mine_index is not None:
+                                mine_index.update(minion_id, old, mine_data)
         except (OSError, IOError):
             return True
         return True
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+'''
+The mine index of the master, which keeps the mine data of the minions by
+function so that mine.get does not read the mine of every targeted minion
+'''
+
+# Import Python libs
+from __future__ import absolute_import
+import contextlib
+import hashlib
+import logging
+import os
+import uuid
+
+# Import Salt libs
+import salt.cache
+import salt.utils
+import salt.utils.files
+import salt.utils.verify
+
+# Import 3rd-party libs
+import salt.ext.six as six
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+log = logging.getLogger(__name__)
+
+# The bank of the cache holding the indexes, and the key of the versions of
+# the indexes in it
+BANK = 'mine_index'
+VERSIONS = 'versions'
+
+
+def etag(version, minions):
+    '''
+    Return the tag of the mine data returned for a set of minions from the
+    index of a function at the given version
+    '''
+    return hashlib.sha1(salt.utils.to_bytes(
+        '{0}:{1}:{2}'.format(version[0], version[1], ','.join(sorted(minions)))
+    )).hexdigest()
+
+
+class MineIndex(object):
+    '''
+    Keep the mine data of the minions indexed by function.
+
+    The index of a function maps the minions to the data they sent for it.
+    The indexes are stored in the ``mine_index`` bank of the cache of the
+    master, next to a map of their versions which is updated every time the
+    data of a minion changes. The indexes are built from the mine data of the
+    minions the first time they are needed.
+
+    The readers keep the indexes they read in memory and only read an index
+    again when its version changed, so answering mine.get takes one read of
+    the versions until the mine data changes.
+    '''
+    def __init__(self, opts, cache=None):
+        self.opts = opts
+        self.cache = cache if cache is not None else salt.cache.Cache(opts)
+        self.lock_path = os.path.join(opts['cachedir'], '.mine_index.lock')
+        self._indexes = {}
+
+    @staticmethod
+    def _key(fun):
+        # Function names and aliases are not all usable as keys of the cache
+        return hashlib.sha1(salt.utils.to_bytes(fun)).hexdigest()
+
+    @contextlib.contextmanager
+    def _lock(self):
+        '''
+        Serialize the updates of the indexes between the master workers
+        '''
+        if not HAS_FCNTL:
+            with salt.utils.files.wait_lock(self.lock_path, timeout=30):
+                yield
+            return
+        with salt.utils.fopen(self.lock_path, 'a') as fp_:
+            fcntl.flock(fp_.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp_.fileno(), fcntl.LOCK_UN)
+
+    def _versions(self):
+        versions = self.cache.fetch(BANK, VERSIONS)
+        if not isinstance(versions, dict) or 'generation' not in versions:
+            return None
+        return versions
+
+    def _build(self):
+        '''
+        Index the mine data of all of the minions, return the versions of the
+        indexes
+        '''
+        with self._lock():
+            versions = self._versions()
+            if versions is not None:
+                # Built by another worker
+                return versions
+            log.debug('Building the mine index')
+            indexes = {}
+            for minion in self.cache.list('minions'):
+                if not salt.utils.verify.valid_id(self.opts, minion):
+                    continue
+                mdata = self.cache.fetch('minions/{0}'.format(minion), 'mine')
+                if not isinstance(mdata, dict):
+                    continue
+                for fun, data in six.iteritems(mdata):
+                    indexes.setdefault(fun, {})[minion] = data
+            for fun, minions in six.iteritems(indexes):
+                self.cache.store(BANK, self._key(fun),
+                                 {'fun': fun, 'minions': minions})
+            # The generation keeps the tags handed out before the index was
+            # rebuilt from matching the new versions
+            versions = {'generation': uuid.uuid4().hex,
+                        'funs': dict((fun, 1) for fun in indexes)}
+            self.cache.store(BANK, VERSIONS, versions)
+            return versions
+
+    def update(self, minion, old, new):
+        '''
+        Update the indexes with the mine data of a minion, ``old`` is the mine
+        data the minion had before. Only the indexes of the functions which
+        data changed are written. The mine data of the minion must already be
+        stored in the cache.
+        '''
+        old = old if isinstance(old, dict) else {}
+        new = new if isinstance(new, dict) else {}
+        changed = [fun for fun in set(old) | set(new)
+                   if fun not in old or fun not in new or old[fun] != new[fun]]
+        if not changed:
+            return
+        if self._versions() is None:
+            # Building the indexes reads the new data of the minion
+            self._build()
+            return
+        with self._lock():
+            versions = self._versions()
+            if versions is None:
+                return
+            funs = versions['funs']
+            for fun in changed:
+                key = self._key(fun)
+                index = self.cache.fetch(BANK, key) if fun in funs else None
+                if not isinstance(index, dict) or \
+                        not isinstance(index.get('minions'), dict):
+                    index = {'fun': fun, 'minions': {}}
+                if fun in new:
+                    index['minions'][minion] = new[fun]
+                else:
+                    index['minions'].pop(minion, None)
+                self.cache.store(BANK, key, index)
+                funs[fun] = funs.get(fun, 0) + 1
+            # The versions are written last, readers which see a new version
+            # always read the data it stands for
+            self.cache.store(BANK, VERSIONS, versions)
+
+    def get(self, fun):
+        '''
+        Return the version of the index of a function and the mine data of the
+        minions for the function. The returned data must not be modified.
+        '''
+        versions = self._versions()
+        if versions is None:
+            versions = self._build()
+        version = (versions['generation'], versions['funs'].get(fun, 0))
+        cached = self._indexes.get(fun)
+        if cached is not None and cached[0] == version:
+            return cached
+        minions = {}
+        if version[1]:
+            index = self.cache.fetch(BANK, self._key(fun))
+            if isinstance(index, dict) and isinstance(index.get('minions'), dict):
+                minions = index['minions']
+            # Only the functions in the index are kept, the minions can ask
+            # for any function
+            self._indexes[fun] = (version, minions)
+        return version, minions
+
+    def lookup(self, fun, minions):
+        '''
+        Return the tag of the mine data of the given minions for a function
+        and the data, the minions without data are left out like mine.get
+        does
+        '''
+        version, data = self.get(fun)
+        ret = {}
+        for minion in minions:
+            fdata = data.get(minion)
+            if fdata:
+                ret[minion] = fdata
+        return etag(version, ret), ret
@@ -5,14 +5,20 @@ Utility functions for minions
 
 # Import Python Libs
 from __future__ import absolute_import
+import hashlib
 import os
 import logging
 import threading
+import collections
+import time
 
 # Import Salt Libs
 import salt.utils
 import salt.payload
 
+# Import 3rd-party libs
+import salt.ext.six as six
+
 log = logging.getLogger(__name__)
 
 
@@ -142,3 +148,231 @@ def _check_cmdline(data):
                 return True
     except (OSError, IOError):
         return False
+
+
+class JidQueue(object):
+    '''
+    The last jids started by a minion, used to drop the publications of a job
+    which already arrived, for instance from another master of a multi-master
+    minion.
+
+    Holds at most ``size`` jids, evicting the oldest first. Lookups, additions
+    and evictions are O(1), and the number of duplicates dropped is counted.
+    '''
+    def __init__(self, size, jids=None):
+        self.size = max(size, 0)
+        self._queue = collections.deque()
+        self._jids = set()
+        self.seen = 0
+        self.duplicates = 0
+        for jid in jids or ():
+            self.add(jid)
+
+    def add(self, jid):
+        '''
+        Record a jid, return False when it is already known
+        '''
+        if jid in self._jids:
+            self.duplicates += 1
+            return False
+        self.seen += 1
+        self._queue.append(jid)
+        self._jids.add(jid)
+        while len(self._queue) > self.size:
+            self._jids.discard(self._queue.popleft())
+        return True
+
+    def stats(self):
+        '''
+        Return the number of jids seen and of duplicates dropped
+        '''
+        return {'size': self.size,
+                'queued': len(self._queue),
+                'seen': self.seen,
+                'duplicates': self.duplicates}
+
+    def __contains__(self, jid):
+        return jid in self._jids
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __iter__(self):
+        return iter(self._queue)
+
+    def __eq__(self, other):
+        if isinstance(other, (JidQueue, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        ret = self.__eq__(other)
+        if ret is NotImplemented:
+            return ret
+        return not ret
+
+    def __repr__(self):
+        return 'JidQueue({0})'.format(list(self._queue))
+
+
+class ReturnSpool(object):
+    '''
+    A directory of job returns which could not be delivered to the master.
+
+    Each return load is written atomically to its own file, named after the
+    time it was spooled so that the returns are sent back in order. At most
+    ``max_size`` returns are kept, the oldest are dropped first.
+
+    Each master gets its own spool under ``return_spool`` in the cachedir, so
+    that the minions of a multi-master minion only send back their own
+    returns. A failover minion keeps one spool for its list of masters.
+
+    The number of spooled returns is counted in memory, and listed again from
+    the directory each time the spool is read. The count only tells whether
+    returns are waiting: the job processes of the minion spool returns too,
+    so the size limit is enforced on the returns listed in the directory.
+    '''
+    def __init__(self, opts, path=None, max_size=None):
+        self.opts = opts
+        if path is None:
+            master = hashlib.sha1(salt.utils.to_bytes(
+                str(opts.get('master', '')))).hexdigest()
+            path = os.path.join(opts['cachedir'], 'return_spool', master)
+        self.path = path
+        if max_size is None:
+            max_size = opts.get('return_spool_max', 10000)
+        self.max_size = max_size
+        self.serial = salt.payload.Serial(opts)
+        self._count = None
+
+    def pending(self):
+        '''
+        Return the names of the spooled returns, oldest first
+        '''
+        try:
+            ret = sorted(fn_ for fn_ in os.listdir(self.path)
+                         if fn_.endswith('.p'))
+        except OSError:
+            ret = []
+        self._count = len(ret)
+        return ret
+
+    def __len__(self):
+        if self._count is None:
+            self.pending()
+        return self._count
+
+    def spool(self, load):
+        '''
+        Write a return load to the spool, return the name of its file
+        '''
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                if not os.path.isdir(self.path):
+                    raise
+        if self.max_size:
+            pending = self.pending()
+            drop = pending[:len(pending) - self.max_size + 1]
+            if drop:
+                log.warning(
+                    'The return spool is full, dropping the {0} oldest '
+                    'returns'.format(len(drop))
+                )
+                self.remove(drop)
+        name = '{0:.6f}_{1}_{2}.p'.format(
+            time.time(), os.getpid(), load.get('jid', 'req'))
+        tmp = os.path.join(self.path, '.{0}'.format(name))
+        with salt.utils.fopen(tmp, 'w+b') as fp_:
+            fp_.write(self.serial.dumps(load))
+        os.rename(tmp, os.path.join(self.path, name))
+        self._count = len(self) + 1
+        return name
+
+    def read(self, count=None):
+        '''
+        Return up to ``count`` of the oldest spooled returns as a list of
+        ``(name, load)`` tuples. Unreadable files are removed.
+        '''
+        ret = []
+        for name in self.pending():
+            if count and len(ret) >= count:
+                break
+            try:
+                with salt.utils.fopen(os.path.join(self.path, name), 'rb') as fp_:
+                    load = self.serial.loads(fp_.read())
+            except (IOError, OSError):
+                continue
+            except Exception:
+                log.error('Removing the unreadable spooled return {0}'.format(name))
+                self.remove([name])
+                continue
+            if isinstance(load, dict):
+                ret.append((name, load))
+            else:
+                self.remove([name])
+        return ret
+
+    def remove(self, names):
+        '''
+        Remove the named returns from the spool
+        '''
+        for name in names:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                continue
+            if self._count:
+                self._count -= 1
+
+
+class EventCoalescer(object):
+    '''
+    The events a minion fires on the master, queued so that they are sent in
+    a few ``events`` loads instead of one request per event.
+
+    Events are grouped by their ``pretag``, and a load holds at most
+    ``max_size`` events.
+    '''
+    def __init__(self, max_size=100):
+        self.max_size = max(max_size, 1)
+        self._events = collections.OrderedDict()
+        self.queued = 0
+        self.sent = 0
+        self.loads = 0
+
+    def add(self, events, pretag=None):
+        '''
+        Queue a list of events, return True when the queue is full and should
+        be flushed
+        '''
+        self._events.setdefault(pretag, []).extend(events)
+        self.queued += len(events)
+        return self.queued >= self.max_size
+
+    def flush(self):
+        '''
+        Empty the queue, return the queued events as a list of
+        ``(pretag, events)`` tuples
+        '''
+        ret = []
+        for pretag, events in six.iteritems(self._events):
+            for idx in range(0, len(events), self.max_size):
+                ret.append((pretag, events[idx:idx + self.max_size]))
+        self._events.clear()
+        self.sent += self.queued
+        self.loads += len(ret)
+        self.queued = 0
+        return ret
+
+    def stats(self):
+        '''
+        Return the number of events queued and sent, and of loads sent
+        '''
+        return {'queued': self.queued,
+                'sent': self.sent,
+                'loads': self.loads}
+
+    def __len__(self):
+        return self.queued
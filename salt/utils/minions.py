@@ -16,8 +16,8 @@ import salt.payload
 import salt.utils
 from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.exceptions import CommandExecutionError, SaltCacheError
-import salt.auth.ldap
 import salt.cache
+import salt.utils.mine
 import salt.ext.six as six
 
 # Import 3rd-party libs
@@ -978,6 +978,7 @@ class CkMinions(object):
                 continue
             ou_names.extend([potential_ou for potential_ou in item.keys() if potential_ou.startswith('ldap(')])
         if ou_names:
+            import salt.auth.ldap
             auth_list = salt.auth.ldap.expand_ldap_entries(auth_list, opts)
         return auth_list
 
@@ -1089,6 +1090,8 @@ def mine_get(tgt, fun, tgt_type='glob', opts=None):
     minions = checker.check_minions(
             tgt,
             tgt_type)
+    if opts.get('mine_index', False):
+        return salt.utils.mine.MineIndex(opts).lookup(fun, minions)[1]
     cache = salt.cache.Cache(opts)
     for minion in minions:
         mdata = cache.fetch('minions/{0}'.format(minion), 'mine')
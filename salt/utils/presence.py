@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''
+The presence table of the master, which records when each minion was last
+seen without sending anything to the minions
+'''
+
+# Import Python libs
+from __future__ import absolute_import
+import errno
+import logging
+import os
+import time
+
+# Import Salt libs
+import salt.utils
+import salt.utils.verify
+
+# Import 3rd-party libs
+import salt.ext.six as six
+
+log = logging.getLogger(__name__)
+
+# The states of the minions, the entry of a minion holds the name of its
+# state, except for the minions only seen through their requests. The state
+# is read from the size of the entry so that listing the table only needs
+# stats.
+SEEN = 'seen'
+CONNECTED = 'connected'
+LOST = 'lost'
+_STATES = {0: SEEN, len(CONNECTED): CONNECTED, len(LOST): LOST}
+
+
+class PresenceTable(object):
+    '''
+    Track when the minions were last seen by the master.
+
+    The master workers record the minions which authenticate or send
+    requests, and the TCP transport records the minions which connect and
+    disconnect. The entry of a minion is ``presence/<minion>`` in the cachedir
+    of the master, its mtime is the time the minion was last seen.
+
+    A minion is present while it holds a connection to the master, or, when
+    the transport does not tell about connections, if it was seen recently.
+    '''
+    def __init__(self, opts):
+        self.opts = opts
+        self.path = os.path.join(opts['cachedir'], 'presence')
+
+    def _minion_path(self, minion):
+        if not salt.utils.verify.valid_id(self.opts, minion):
+            return None
+        return os.path.join(self.path, minion)
+
+    def _write(self, minion, data):
+        path = self._minion_path(minion)
+        if path is None:
+            return False
+        try:
+            with salt.utils.fopen(path, 'w') as fp_:
+                fp_.write(data)
+        except IOError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                if not os.path.isdir(self.path):
+                    raise
+            with salt.utils.fopen(path, 'w') as fp_:
+                fp_.write(data)
+        return True
+
+    def seen(self, minion):
+        '''
+        Record a request of a minion, its state is kept
+        '''
+        path = self._minion_path(minion)
+        if path is None:
+            return False
+        try:
+            os.utime(path, None)
+        except OSError as exc:
+            if exc.errno != errno.ENOENT:
+                raise
+            return self._write(minion, '')
+        return True
+
+    def connected(self, minion):
+        '''
+        Record that a minion connected to the master
+        '''
+        return self._write(minion, CONNECTED)
+
+    def lost(self, minion):
+        '''
+        Record that a minion disconnected from the master
+        '''
+        return self._write(minion, LOST)
+
+    def reset_connected(self):
+        '''
+        Mark the minions recorded as connected as lost, for when the
+        connections to the master were dropped without being recorded, for
+        example when the master restarted. The minions which connect again
+        are recorded as connected again.
+        '''
+        try:
+            minions = os.listdir(self.path)
+        except OSError:
+            return
+        for minion in minions:
+            try:
+                if os.stat(os.path.join(self.path, minion)).st_size != len(CONNECTED):
+                    continue
+            except OSError:
+                continue
+            self.lost(minion)
+
+    def _status(self, path, oldest):
+        stat = os.stat(path)
+        state = _STATES.get(stat.st_size, SEEN)
+        return {'last_seen': stat.st_mtime,
+                'state': state,
+                'present': state == CONNECTED
+                           or (state == SEEN and stat.st_mtime >= oldest)}
+
+    def minion_status(self, minion, max_age):
+        '''
+        Return when a minion was last seen, its state and whether it is
+        present, None if the minion was never seen. Minions only seen
+        through their requests are present if they were seen in the last
+        ``max_age`` seconds.
+        '''
+        path = self._minion_path(minion)
+        if path is None:
+            return None
+        try:
+            return self._status(path, time.time() - max_age)
+        except OSError:
+            return None
+
+    def status(self, max_age):
+        '''
+        Return the status of all of the minions seen by the master
+        '''
+        ret = {}
+        try:
+            minions = os.listdir(self.path)
+        except OSError:
+            return ret
+        oldest = time.time() - max_age
+        for minion in minions:
+            try:
+                ret[minion] = self._status(os.path.join(self.path, minion), oldest)
+            except OSError:
+                continue
+        return ret
+
+    def present(self, max_age):
+        '''
+        Return the minions which are present
+        '''
+        return set(minion for minion, data in six.iteritems(self.status(max_age))
+                   if data['present'])
+
+    def forget(self, minions):
+        '''
+        Remove the entries of the given minions, for example once their keys
+        were deleted
+        '''
+        for minion in minions:
+            path = self._minion_path(minion)
+            if path is None:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,599 @@
+# -*- coding: utf-8 -*-
+'''
+    salt.utils.render_cache
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Opt-in memoization of rendered templates.
+
+    When the same SLS file is compiled many times within one process (master
+    side highstate compilation, orchestration, ``salt-ssh``) the renderer
+    pipeline is run again for every target even if the result is identical.
+    This module records which grains, pillar and opts keys a render actually
+    read, which ``__salt__`` functions it called and which jinja
+    includes/imports it pulled in, and reuses the rendered output as long as
+    all of those inputs are unchanged.
+
+    Renders which call execution functions other than the read-only
+    ``grains``, ``pillar`` and ``config`` getters are considered volatile and
+    are never cached.
+
+    The renderers loaded with the cache enabled look their ``__grains__``,
+    ``__pillar__``, ``__opts__`` and ``__salt__`` up in a context, which a
+    cached render overrides with its recording copies in its own thread only.
+    The renders in progress are not cached when another thread reads them
+    without recording, as the render may have started that thread.
+
+    The cache is enabled with the ``render_cache`` configuration option.
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import copy
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+# Import salt libs
+import salt.utils
+import salt.utils.context
+from salt._compat import string_io
+from salt.utils.odict import OrderedDict
+
+# Import 3rd-party libs
+import salt.ext.six as six
+
+log = logging.getLogger(__name__)
+
+# Only these renderers are known to be free of side effects between renders
+DEFAULT_RENDERERS = ('jinja', 'yaml', 'yamlex', 'json', 'mako', 'wempy')
+
+# Execution functions which only read grains and/or pillar data. Calls to
+# them are recorded as key accesses, calls to anything else make the render
+# uncacheable.
+TRACKED_FUNCTIONS = {
+    'grains.get': ('grains',),
+    'grains.item': ('grains',),
+    'pillar.get': ('pillar',),
+    'pillar.item': ('pillar',),
+    'config.get': ('grains', 'pillar'),
+    'config.option': ('grains', 'pillar'),
+}
+
+MISSING = object()
+_WHOLE = '*'
+
+_LOCAL = threading.local()
+_CACHE = None
+# The recorders of the renders in progress in all of the threads
+_ACTIVE = set()
+_ACTIVE_LOCK = threading.Lock()
+
+
+def _hash_text(data):
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path):
+    try:
+        with salt.utils.fopen(path, 'rb') as fp_:
+            return _hash_text(fp_.read())
+    except (IOError, OSError):
+        return None
+
+
+def _top_key(key, delimiter=':'):
+    if not isinstance(key, six.string_types):
+        return key
+    return key.split(delimiter, 1)[0]
+
+
+def active_recorder():
+    '''
+    Return the recorder of the render currently in progress in this thread,
+    or ``None``
+    '''
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack:
+        return stack[-1]
+    return None
+
+
+def _shared_access():
+    '''
+    Called when the data of the renderers is read from their context. When
+    it is read without recording while renders are in progress in other
+    threads, these renders may have started this thread and their output
+    depends on data they did not record, so they are not cached.
+    '''
+    if _ACTIVE and active_recorder() is None:
+        with _ACTIVE_LOCK:
+            for recorder in _ACTIVE:
+                recorder.volatile = True
+
+
+def record_file(path):
+    '''
+    Record that the active render read the file at ``path``. Used by the
+    jinja loader to track included and imported templates.
+    '''
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.files[path] = _file_hash(path)
+
+
+class RecordingDict(dict):
+    '''
+    A copy of a grains or pillar dict which records the top level keys that
+    are read from it
+    '''
+    def __init__(self, data, recorder, kind):
+        dict.__init__(self, [(key, data[key]) for key in data])
+        self._recorder = recorder
+        self._kind = kind
+
+    def _access(self, key):
+        self._recorder.access(self._kind, key)
+
+    def _whole(self):
+        self._recorder.access(self._kind, _WHOLE)
+
+    def _mutate(self):
+        self._recorder.volatile = True
+
+    def __getitem__(self, key):
+        self._access(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._access(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._access(key)
+        return dict.__contains__(self, key)
+
+    def has_key(self, key):
+        return self.__contains__(key)
+
+    def __iter__(self):
+        self._whole()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._whole()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._whole()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def keys(self):
+        self._whole()
+        return dict.keys(self)
+
+    def values(self):
+        self._whole()
+        return dict.values(self)
+
+    def items(self):
+        self._whole()
+        return dict.items(self)
+
+    def copy(self):
+        self._whole()
+        return dict(dict.items(self))
+
+    if six.PY2:
+        def iterkeys(self):
+            self._whole()
+            return dict.iterkeys(self)  # pylint: disable=no-member
+
+        def itervalues(self):
+            self._whole()
+            return dict.itervalues(self)  # pylint: disable=no-member
+
+        def iteritems(self):
+            self._whole()
+            return dict.iteritems(self)  # pylint: disable=no-member
+
+    def __setitem__(self, key, value):
+        self._mutate()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._mutate()
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        self._mutate()
+        dict.update(self, *args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._mutate()
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *args):
+        self._mutate()
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        self._mutate()
+        return dict.popitem(self)
+
+    def clear(self):
+        self._mutate()
+        dict.clear(self)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        self._whole()
+        return copy.deepcopy(dict(dict.items(self)), memo)
+
+    def __reduce__(self):
+        self._whole()
+        return (dict, (dict(dict.items(self)),))
+
+
+class _FunctionsModule(object):
+    '''
+    Attribute access helper for the ``salt.mod.fun()`` template syntax
+    '''
+    def __init__(self, functions, mod):
+        self._functions = functions
+        self._mod = mod
+
+    def __getattr__(self, fun):
+        return self._functions['{0}.{1}'.format(self._mod, fun)]
+
+
+class RecordingFunctions(object):
+    '''
+    Wrapper around ``__salt__`` which records grains/pillar reads done
+    through execution functions and flags all other calls as volatile
+    '''
+    def __init__(self, functions, recorder):
+        self._functions = functions
+        self._recorder = recorder
+
+    def __getitem__(self, name):
+        func = self._functions[name]
+        recorder = self._recorder
+
+        def _call(*args, **kwargs):
+            recorder.call(name, args, kwargs)
+            return func(*args, **kwargs)
+        return _call
+
+    def __getattr__(self, mod):
+        if mod.startswith('_'):
+            raise AttributeError(mod)
+        return _FunctionsModule(self, mod)
+
+    def __contains__(self, name):
+        return name in self._functions
+
+    def __iter__(self):
+        return iter(self._functions)
+
+    def __len__(self):
+        return len(self._functions)
+
+    def get(self, name, default=None):
+        if name in self._functions:
+            return self[name]
+        return default
+
+    def keys(self):
+        return list(self._functions)
+
+
+class ContextData(salt.utils.context.NamespacedDictWrapper):
+    '''
+    The ``__grains__``, ``__pillar__`` and ``__opts__`` of the renderers
+    loaded with the render cache enabled, looked up in the context of the
+    renderers
+    '''
+    def _dict(self):
+        _shared_access()
+        return super(ContextData, self)._dict()
+
+    def unwrapped(self):
+        '''
+        Return the wrapped dict, without recording the access
+        '''
+        return super(ContextData, self)._dict()
+
+
+class ContextFunctions(object):
+    '''
+    The ``__salt__`` of the renderers loaded with the render cache enabled,
+    which looks the functions up in the context of the renderers
+    '''
+    def __init__(self, context):
+        self.context = context
+
+    def _functions(self):
+        _shared_access()
+        return self.context['salt']
+
+    def __getitem__(self, name):
+        return self._functions()[name]
+
+    def __getattr__(self, mod):
+        if mod.startswith('_'):
+            raise AttributeError(mod)
+        functions = self._functions()
+        if isinstance(functions, dict):
+            return _FunctionsModule(functions, mod)
+        return getattr(functions, mod)
+
+    def __contains__(self, name):
+        return name in self._functions()
+
+    def __iter__(self):
+        return iter(self._functions())
+
+    def __len__(self):
+        return len(self._functions())
+
+    def get(self, name, default=None):
+        return self._functions().get(name, default)
+
+    def keys(self):
+        return list(self._functions())
+
+
+def context_pack(opts, pack):
+    '''
+    Return the pack of the renderers with their grains, pillar, opts and
+    functions looked up in a context, so that a cached render can be given
+    recording copies of them without changing what the other renders see
+    '''
+    context = salt.utils.context.ContextDict()
+    context['grains'] = pack.get('__grains__', opts.get('grains', {}))
+    context['pillar'] = pack.get('__pillar__', opts.get('pillar', {}))
+    # The loader gives its modules a copy of the opts without the logger
+    context['opts'] = dict((key, val) for key, val in six.iteritems(opts)
+                           if key != 'logger')
+    context['salt'] = pack.get('__salt__', {})
+    pack = dict(pack)
+    pack['__grains__'] = ContextData(context, 'grains', override_name='grains')
+    pack['__pillar__'] = ContextData(context, 'pillar', override_name='pillar')
+    pack['__opts__'] = ContextData(context, 'opts', override_name='opts')
+    pack['__salt__'] = ContextFunctions(context)
+    return pack
+
+
+def render_context(render_pipe):
+    '''
+    Return the context shared by the render functions of the pipe, or
+    ``None`` if they were not loaded with the render cache enabled
+    '''
+    context = None
+    for render, _ in render_pipe:
+        functions = render_globals(render).get('__salt__')
+        if not isinstance(functions, ContextFunctions):
+            return None
+        if context is not None and functions.context is not context:
+            return None
+        context = functions.context
+    return context
+
+
+class Recorder(object):
+    '''
+    Collects the inputs read by a single render
+    '''
+    def __init__(self, grains, pillar, functions, opts=None):
+        if opts is None:
+            opts = {}
+        self.sources = {'grains': grains, 'pillar': pillar, 'opts': opts}
+        self.deps = {'grains': {}, 'pillar': {}, 'opts': {}}
+        self.files = {}
+        self.volatile = False
+        self.grains = RecordingDict(grains, self, 'grains')
+        self.pillar = RecordingDict(pillar, self, 'pillar')
+        self.opts = RecordingDict(opts, self, 'opts')
+        self.functions = RecordingFunctions(functions, self)
+
+    def access(self, kind, key):
+        deps = self.deps[kind]
+        if _WHOLE in deps or key in deps:
+            return
+        source = self.sources[kind]
+        if key == _WHOLE:
+            deps.clear()
+            try:
+                deps[_WHOLE] = copy.deepcopy(dict((k, source[k]) for k in source))
+            except Exception:
+                self.volatile = True
+            return
+        try:
+            value = source.get(key, MISSING)
+            deps[key] = value if value is MISSING else copy.deepcopy(value)
+        except Exception:
+            # Unhashable key or value which cannot be copied
+            self.volatile = True
+
+    def call(self, name, args, kwargs):
+        kinds = TRACKED_FUNCTIONS.get(name)
+        if kinds is None:
+            log.trace('Render called {0}, output will not be cached'.format(name))
+            self.volatile = True
+            return
+        delimiter = kwargs.get('delimiter', ':')
+        if name.endswith('.item'):
+            keys = args
+        else:
+            keys = args[:1] or [kwargs.get('key')]
+        for kind in kinds:
+            for key in keys:
+                self.access(kind, _top_key(key, delimiter))
+            if name.startswith('config.'):
+                # config.get falls back to the master opts stored in pillar
+                self.access(kind, 'master')
+
+    @contextmanager
+    def inject(self, context):
+        '''
+        Override the grains, pillar, opts and functions of the renderers
+        sharing ``context`` with the recording wrappers, in this thread only,
+        for the duration of the render
+        '''
+        if not hasattr(_LOCAL, 'stack'):
+            _LOCAL.stack = []
+        _LOCAL.stack.append(self)
+        with _ACTIVE_LOCK:
+            _ACTIVE.add(self)
+        try:
+            with context.clone(grains=self.grains,
+                               pillar=self.pillar,
+                               opts=self.opts,
+                               salt=self.functions):
+                yield self
+        finally:
+            with _ACTIVE_LOCK:
+                _ACTIVE.discard(self)
+            _LOCAL.stack.pop()
+
+
+class RenderCache(object):
+    '''
+    In-memory store of rendered outputs. Each key can hold several variants,
+    one per distinct set of recorded inputs.
+    '''
+    def __init__(self, opts):
+        self.size = opts.get('render_cache_size', 1024)
+        self.ttl = opts.get('render_cache_ttl', 300)
+        self.renderers = opts.get('render_cache_renderers', DEFAULT_RENDERERS)
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'volatile': 0}
+
+    def cacheable(self, render_pipe):
+        '''
+        Return True if every renderer in the pipe can be memoized
+        '''
+        for render, _ in render_pipe:
+            if render.__module__.split('.')[-1] not in self.renderers:
+                return False
+        return True
+
+    @staticmethod
+    def _valid(variant, grains, pillar, opts):
+        sources = {'grains': grains, 'pillar': pillar, 'opts': opts}
+        for kind, deps in six.iteritems(variant['deps']):
+            source = sources[kind]
+            if _WHOLE in deps:
+                if dict((k, source[k]) for k in source) != deps[_WHOLE]:
+                    return False
+                continue
+            for key, value in six.iteritems(deps):
+                if source.get(key, MISSING) != value:
+                    return False
+        for path, digest in six.iteritems(variant['files']):
+            if _file_hash(path) != digest:
+                return False
+        return True
+
+    def fetch(self, key, grains, pillar, opts=None):
+        '''
+        Return a copy of the cached output for ``key`` if one of its variants
+        matches the current grains, pillar, opts and included files, else
+        ``MISSING``
+        '''
+        if opts is None:
+            opts = {}
+        variants = self.entries.get(key)
+        if variants:
+            now = time.time()
+            variants[:] = [var for var in variants if now - var['time'] < self.ttl]
+            for variant in variants:
+                if self._valid(variant, grains, pillar, opts):
+                    self.stats['hits'] += 1
+                    if variant['text'] is not None:
+                        return string_io(variant['text'])
+                    return copy.deepcopy(variant['data'])
+        self.stats['misses'] += 1
+        return MISSING
+
+    def store(self, key, recorder, ret):
+        '''
+        Store the output of a render along with the inputs it recorded
+        '''
+        if recorder.volatile:
+            self.stats['volatile'] += 1
+            return
+        variant = {'deps': recorder.deps,
+                   'files': recorder.files,
+                   'time': time.time(),
+                   'text': None,
+                   'data': None}
+        if hasattr(ret, 'getvalue'):
+            variant['text'] = ret.getvalue()
+        else:
+            try:
+                variant['data'] = copy.deepcopy(ret)
+            except Exception:
+                return
+        self.entries.setdefault(key, []).append(variant)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+def get_cache(opts):
+    '''
+    Return the process wide render cache, or ``None`` if ``render_cache`` is
+    not enabled in ``opts``
+    '''
+    global _CACHE  # pylint: disable=global-statement
+    if isinstance(opts, ContextData):
+        opts = opts.unwrapped()
+    if not opts or not opts.get('render_cache', False):
+        return None
+    if _CACHE is None:
+        _CACHE = RenderCache(opts)
+    return _CACHE
+
+
+def clear():
+    '''
+    Drop every cached render
+    '''
+    if _CACHE is not None:
+        _CACHE.entries.clear()
+
+
+def cache_key(template, input_data, render_pipe, saltenv, sls, kwargs):
+    '''
+    Build the lookup key for a render. Returns ``None`` if the keyword
+    arguments cannot be represented in a key.
+    '''
+    extra = []
+    for name in sorted(kwargs):
+        if name == 'rendered_sls':
+            # Tracks the includes seen so far, differs between calls
+            continue
+        try:
+            extra.append((name, repr(kwargs[name])))
+        except Exception:
+            return None
+    pipe = tuple((render.__module__, argline) for render, argline in render_pipe)
+    return (template, _hash_text(input_data), pipe, saltenv, sls, tuple(extra))
+
+
+def render_globals(render):
+    '''
+    Return the module globals of a render function
+    '''
+    return getattr(getattr(render, '__func__', render), '__globals__', {})
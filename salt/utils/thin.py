@@ -8,6 +8,7 @@ from __future__ import absolute_import
 
 import os
 import sys
+import gzip
 import json
 import shutil
 import tarfile
@@ -318,6 +319,83 @@ def thin_sum(cachedir, form='sha1'):
     return salt.utils.get_hash(thintar, form)
 
 
+def thin_chunk_path(cachedir, chunk):
+    '''
+    Return the path of a chunk of the thin tarball
+    '''
+    return os.path.join(cachedir, 'thin', 'chunks', '{0}.tgz'.format(chunk))
+
+
+def _chunk_key(name):
+    '''
+    Return the chunk a member of the thin tarball goes in: one per top level
+    package of each python version, one for the other files
+    '''
+    parts = name.split('/')
+    if len(parts) > 2 and parts[0] in ('py2', 'py3'):
+        return '/'.join(parts[:2])
+    return ''
+
+
+def thin_chunks(cachedir, form='sha1'):
+    '''
+    Split the thin tarball in content addressed chunks and return the list of
+    their checksums
+
+    There is one chunk per package in the thin tarball, so that a new version
+    of salt or of one of its dependencies only changes a few chunks. The
+    chunks are stored as ``thin/chunks/<checksum>.tgz`` in the cachedir, and
+    are built again only when the thin tarball changes.
+    '''
+    thintar = gen_thin(cachedir)
+    tsum = salt.utils.get_hash(thintar, form)
+    chunkdir = os.path.join(cachedir, 'thin', 'chunks')
+    manifest_path = os.path.join(chunkdir, 'manifest.json')
+    try:
+        with salt.utils.fopen(manifest_path) as fp_:
+            manifest = json.load(fp_)
+        if manifest['thin_sum'] == tsum and manifest['form'] == form and \
+                all(os.path.isfile(thin_chunk_path(cachedir, chunk))
+                    for chunk in manifest['chunks']):
+            return [str(chunk) for chunk in manifest['chunks']]
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+    if not os.path.isdir(chunkdir):
+        os.makedirs(chunkdir)
+
+    groups = {}
+    src = tarfile.open(thintar, 'r:gz')
+    try:
+        for member in src.getmembers():
+            groups.setdefault(_chunk_key(member.name), []).append(member)
+        chunks = []
+        for key in sorted(groups):
+            fd_, tmp = tempfile.mkstemp(dir=chunkdir)
+            # The chunks only depend on their content: no timestamp in the
+            # gzip header, the members in a fixed order
+            with os.fdopen(fd_, 'wb') as raw:
+                gzf = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+                tfp = tarfile.open(fileobj=gzf, mode='w')
+                for member in sorted(groups[key], key=lambda member: member.name):
+                    fileobj = src.extractfile(member) if member.isfile() else None
+                    tfp.addfile(member, fileobj)
+                tfp.close()
+                gzf.close()
+            chunk = salt.utils.get_hash(tmp, form)
+            os.rename(tmp, thin_chunk_path(cachedir, chunk))
+            chunks.append(chunk)
+    finally:
+        src.close()
+
+    # Drop the chunks of the previous thin tarballs
+    for name in os.listdir(chunkdir):
+        if name.endswith('.tgz') and name[:-4] not in chunks:
+            os.remove(os.path.join(chunkdir, name))
+    with salt.utils.fopen(manifest_path, 'w+') as fp_:
+        json.dump({'thin_sum': tsum, 'form': form, 'chunks': chunks}, fp_)
+    return chunks
+
+
 def gen_min(cachedir, extra_mods='', overwrite=False, so_mods='',
             python2_bin='python2', python3_bin='python3'):
     '''
@@ -13,6 +13,10 @@ try:
 except Exception:
     pass
 
+# prefer the libyaml C parser over the pure python one when available
+BaseLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+HAS_LIBYAML = BaseLoader is not yaml.SafeLoader
+
 # This function is safe and needs to stay as yaml.load. The load function
 # accepts a custom loader, and every time this function is used in Salt
 # the custom loader defined below is used. This should be altered though to
@@ -29,14 +33,13 @@ warnings.simplefilter('always', category=DuplicateKeyWarning)
 
 
 # with code integrated from https://gist.github.com/844388
-class SaltYamlSafeLoader(yaml.SafeLoader, object):
+class _SaltYamlConstructorMixin(object):
     '''
-    Create a custom YAML loader that uses the custom constructor. This allows
-    for the YAML loading defaults to be manipulated based on needs within salt
-    to make things like sls file more intuitive.
+    The salt specific constructors, shared by the loaders below regardless of
+    the parser they are built on
     '''
     def __init__(self, stream, dictclass=dict):
-        yaml.SafeLoader.__init__(self, stream)
+        super(_SaltYamlConstructorMixin, self).__init__(stream)
         if dictclass is not dict:
             # then assume ordered dict and use it for both !map and !omap
             self.add_constructor(
@@ -95,7 +98,7 @@ class SaltYamlSafeLoader(yaml.SafeLoader, object):
                 # an empty string. Change it to '0'.
                 if node.value == '':
                     node.value = '0'
-        return super(SaltYamlSafeLoader, self).construct_scalar(node)
+        return super(_SaltYamlConstructorMixin, self).construct_scalar(node)
 
     def flatten_mapping(self, node):
         merge = []
@@ -137,3 +140,20 @@ class SaltYamlSafeLoader(yaml.SafeLoader, object):
             mergeable_items = [x for x in merge if x[0].value not in existing_nodes]
 
             node.value = mergeable_items + node.value
+
+
+class SaltYamlSafeLoader(_SaltYamlConstructorMixin, BaseLoader):
+    '''
+    Create a custom YAML loader that uses the custom constructor. This allows
+    for the YAML loading defaults to be manipulated based on needs within salt
+    to make things like sls file more intuitive.
+
+    The libyaml C parser is used when PyYAML was built with it.
+    '''
+
+
+class SaltYamlPySafeLoader(_SaltYamlConstructorMixin, yaml.SafeLoader):
+    '''
+    The same as :class:`SaltYamlSafeLoader`, always using the pure python
+    parser
+    '''
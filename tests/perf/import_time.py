@@ -0,0 +1,124 @@
+# -*- encoding: utf-8 -*-
+'''
+Profile the imports done by the entry points of ``salt/scripts.py``.
+
+Every entry point runs in its own interpreter with ``--version``, which
+imports its command line class and parses the options before exiting. For
+each entry point the script reports the best wall time of a few runs, the
+number of modules imported and which of the heavy stacks were imported.
+
+Usage::
+
+    python tests/perf/import_time.py [rounds] [entry point ...]
+
+With ``-v`` the salt modules imported by each entry point are listed too.
+'''
+
+from __future__ import absolute_import, print_function
+# Import system libs
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The entry points and the arguments making them exit after parsing the
+# options
+ENTRY_POINTS = (
+    ('salt_master', ['--version']),
+    ('salt_minion', ['--disable-keepalive', '--version']),
+    ('salt_syndic', ['--version']),
+    ('salt_proxy_minion', ['--disable-keepalive', '--version']),
+    ('salt_key', ['--version']),
+    ('salt_cp', ['--version']),
+    ('salt_call', ['--version']),
+    ('salt_run', ['--version']),
+    ('salt_ssh', ['--version']),
+    ('salt_cloud', ['--version']),
+    ('salt_api', ['--version']),
+    ('salt_main', ['--version']),
+    ('salt_spm', ['--version']),
+)
+
+# Packages which entry points should only import when they use them
+HEAVY = ('tornado', 'zmq', 'Crypto', 'M2Crypto', 'jinja2', 'msgpack',
+         'requests', 'salt.transport', 'salt.crypt', 'salt.minion',
+         'salt.client', 'salt.loader', 'salt.pillar', 'salt.state')
+
+RUNNER = '''
+import atexit, json, sys, time
+start = time.time()
+
+def report():
+    with open({out!r}, 'w') as fp_:
+        json.dump({{'time': time.time() - start,
+                   'modules': sorted(sys.modules)}}, fp_)
+atexit.register(report)
+sys.argv = [{name!r}] + {args!r}
+import salt.scripts
+getattr(salt.scripts, {name!r})()
+'''
+
+
+def profile(name, args):
+    '''
+    Run an entry point in a new interpreter, return the time it took until
+    it exited and the modules it imported
+    '''
+    fd_, out = tempfile.mkstemp()
+    os.close(fd_)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT] + [path for path in env.get('PYTHONPATH', '').split(os.pathsep) if path])
+    try:
+        with open(os.devnull, 'w') as devnull:
+            subprocess.call(
+                [sys.executable, '-c', RUNNER.format(out=out, name=name, args=args)],
+                stdout=devnull, stderr=devnull, env=env)
+        with open(out) as fp_:
+            return json.load(fp_)
+    except ValueError:
+        # The entry point could not run here
+        return None
+    finally:
+        os.remove(out)
+
+
+def heavy_imports(modules):
+    '''
+    Return the heavy packages among a list of modules
+    '''
+    return [pkg for pkg in HEAVY
+            if any(mod == pkg or mod.startswith(pkg + '.') for mod in modules)]
+
+
+def main():
+    argv = sys.argv[1:]
+    verbose = '-v' in argv
+    argv = [arg for arg in argv if arg != '-v']
+    rounds = 3
+    if argv and argv[0].isdigit():
+        rounds = int(argv.pop(0))
+    entry_points = [(name, args) for name, args in ENTRY_POINTS
+                    if not argv or name in argv]
+    for name, args in entry_points:
+        runs = [profile(name, args) for _ in range(rounds)]
+        runs = [run for run in runs if run is not None]
+        if not runs:
+            print('{0}: could not run'.format(name))
+            continue
+        modules = runs[0]['modules']
+        print('{0}: best of {1}: {2:.3f}s, {3} modules'.format(
+            name, len(runs), min(run['time'] for run in runs), len(modules)))
+        print('  heavy imports: {0}'.format(
+            ', '.join(heavy_imports(modules)) or 'none'))
+        if verbose:
+            for mod in modules:
+                if mod.startswith('salt.'):
+                    print('    {0}'.format(mod))
+
+
+if __name__ == '__main__':
+    main()
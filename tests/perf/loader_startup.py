@@ -0,0 +1,166 @@
+# -*- encoding: utf-8 -*-
+'''
+Compare the startup of ``salt-call --local`` with and without the module
+index of the loader (the ``loader_index_cache`` option) and the cache of the
+__virtual__ results (the ``virtual_cache`` option).
+
+For each setting the script reports the best wall time of a few runs of
+salt-call, the directory listings and stats done by the loaders a job
+creates, and, when strace is installed, the number of file system syscalls
+made by salt-call. The default function is test.ping, sys.list_functions
+loads every execution module.
+
+Usage::
+
+    python tests/perf/loader_startup.py [rounds] [function]
+'''
+
+from __future__ import absolute_import, print_function
+# Import system libs
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Import salt libs
+import salt.config
+import salt.loader
+import salt.utils
+
+SALT_CALL = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'scripts', 'salt-call')
+FS_SYSCALLS = ('open', 'openat', 'stat', 'lstat', 'fstat', 'newfstatat',
+               'statx', 'getdents', 'getdents64', 'access')
+
+
+SETTINGS = (
+    {'loader_index_cache': False, 'virtual_cache': False},
+    {'loader_index_cache': True, 'virtual_cache': False},
+    {'loader_index_cache': True, 'virtual_cache': True},
+)
+
+
+def write_config(root, settings):
+    '''
+    Write a minion config file running everything from ``root``
+    '''
+    conf_dir = os.path.join(root, 'conf')
+    if not os.path.isdir(conf_dir):
+        os.makedirs(conf_dir)
+    with salt.utils.fopen(os.path.join(conf_dir, 'minion'), 'w') as fp_:
+        fp_.write('\n'.join([
+            'id: perf',
+            'root_dir: {0}'.format(root),
+            'pki_dir: {0}'.format(os.path.join(root, 'pki')),
+            'cachedir: {0}'.format(os.path.join(root, 'cache')),
+            'sock_dir: {0}'.format(os.path.join(root, 'sock')),
+            'log_file: {0}'.format(os.path.join(root, 'minion.log')),
+            'file_client: local'] +
+            ['{0}: {1}'.format(key, val) for key, val in sorted(settings.items())] +
+            ['']))
+    return conf_dir
+
+
+def time_salt_call(conf_dir, rounds, fun):
+    '''
+    Return the best wall time of ``rounds`` runs of salt-call
+    '''
+    best = None
+    for _ in range(rounds):
+        start = time.time()
+        subprocess.check_call(
+            [sys.executable, SALT_CALL, '--local', '-c', conf_dir,
+             '--out=quiet', fun])
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def count_syscalls(conf_dir, fun):
+    '''
+    Return the number of file system syscalls made by one run of salt-call,
+    or None when strace is not available
+    '''
+    strace = salt.utils.which('strace')
+    if not strace:
+        return None
+    out = tempfile.mktemp()
+    try:
+        subprocess.check_call(
+            [strace, '-f', '-c', '-o', out, sys.executable, SALT_CALL,
+             '--local', '-c', conf_dir, '--out=quiet', fun])
+        total = 0
+        with salt.utils.fopen(out) as fp_:
+            for line in fp_:
+                fields = line.split()
+                if fields and fields[-1] in FS_SYSCALLS:
+                    total += int(re.sub(r'\D', '', fields[3]))
+        return total
+    finally:
+        if os.path.exists(out):
+            os.remove(out)
+
+
+def count_loader_calls(conf_dir):
+    '''
+    Return the directory listings and stats done by the loaders of a job
+    '''
+    opts = salt.config.minion_config(os.path.join(conf_dir, 'minion'))
+    opts['grains'] = salt.loader.grains(opts)
+    calls = {'listdir': 0, 'stat': 0}
+    listdir, stat = os.listdir, os.stat
+
+    def _listdir(path):
+        calls['listdir'] += 1
+        return listdir(path)
+
+    def _stat(path):
+        calls['stat'] += 1
+        return stat(path)
+
+    os.listdir, os.stat = _listdir, _stat
+    try:
+        utils = salt.loader.utils(opts)
+        funcs = salt.loader.minion_mods(opts, utils=utils)
+        salt.loader.returners(opts, funcs)
+        salt.loader.states(opts, funcs, utils, {})
+        salt.loader.render(opts, funcs)
+        salt.loader.executors(opts, funcs)
+    finally:
+        os.listdir, os.stat = listdir, stat
+    return calls
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fun = sys.argv[2] if len(sys.argv) > 2 else 'test.ping'
+    root = tempfile.mkdtemp()
+    try:
+        for settings in SETTINGS:
+            conf_dir = write_config(root, settings)
+            # Warm up the caches
+            time_salt_call(conf_dir, 1, fun)
+            salt.loader._MODULE_INDEX.clear()
+            salt.loader._MODULE_INDEX_LOADED.clear()
+            salt.loader._VIRTUAL_CACHE.clear()
+            print(', '.join('{0}: {1}'.format(key, val)
+                            for key, val in sorted(settings.items())))
+            print('  salt-call {0} wall time, best of {1}: {2:.3f}s'.format(
+                fun, rounds, time_salt_call(conf_dir, rounds, fun)))
+            calls = count_loader_calls(conf_dir)
+            print('  loader listdir calls: {0}, stat calls: {1}'.format(
+                calls['listdir'], calls['stat']))
+            syscalls = count_syscalls(conf_dir, fun)
+            if syscalls is not None:
+                print('  salt-call file system syscalls: {0}'.format(syscalls))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# -*- encoding: utf-8 -*-
+'''
+Compare the time needed to load a large generated SLS file with the libyaml
+backed salt yaml loader and with the pure python one.
+
+Usage::
+
+    python tests/perf/yaml_render.py [number of states] [rounds]
+'''
+
+from __future__ import absolute_import, print_function
+# Import system libs
+import sys
+import time
+
+# Import salt libs
+import salt.utils.yamlloader as yamlloader
+from salt.utils.odict import OrderedDict
+
+
+def gen_sls(states):
+    '''
+    Generate an SLS document with ``states`` file.managed states, roughly ten
+    lines each
+    '''
+    lines = []
+    for num in range(states):
+        lines.extend([
+            'file_{0}:'.format(num),
+            '  file.managed:',
+            '    - name: /srv/app/conf.d/{0}.conf'.format(num),
+            '    - source: salt://app/files/{0}.conf'.format(num),
+            '    - mode: 0644',
+            '    - makedirs: True',
+            '    - context:',
+            '        port: {0}'.format(8000 + num),
+            '        tags: [web, app, "{0}"]'.format(num),
+            '    - require:',
+            '      - pkg: app',
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def time_loader(loader, data, rounds):
+    '''
+    Return the best wall time of ``rounds`` loads of ``data``
+    '''
+    best = None
+    for _ in range(rounds):
+        start = time.time()
+        loader(data, dictclass=OrderedDict).get_data()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    states = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    data = gen_sls(states)
+    print('Loading {0} lines, best of {1} rounds'.format(
+        data.count('\n'), rounds))
+    slow = time_loader(yamlloader.SaltYamlPySafeLoader, data, rounds)
+    print('pure python loader: {0:.3f}s'.format(slow))
+    if not yamlloader.HAS_LIBYAML:
+        print('PyYAML was built without libyaml, nothing to compare')
+        return
+    fast = time_loader(yamlloader.SaltYamlSafeLoader, data, rounds)
+    print('libyaml loader:     {0:.3f}s ({1:.1f}x)'.format(fast, slow / fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@
 from __future__ import absolute_import
 
 # Import Salt Libs
-from salt.cli.batch import Batch
+from salt.cli.batch import Batch, resolve_minions
 
 # Import Salt Testing Libs
 from salttesting import skipIf, TestCase
@@ -64,6 +64,100 @@ class BatchTestCase(TestCase):
         self.assertEqual(ret, None)
 
 
+def _returns(tgt, *args, **kwargs):
+    '''
+    Return the generator of a job, the minions named slow return after a few
+    tries
+    '''
+    tgt = list(tgt)
+    tries = dict((minion, 3 if minion.startswith('slow') else 0) for minion in tgt)
+
+    def _gen():
+        while tries:
+            for minion in sorted(tries):
+                if tries[minion]:
+                    tries[minion] -= 1
+                else:
+                    del tries[minion]
+                    yield {minion: {'ret': True}}
+            yield None
+    return _gen()
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BatchPresenceTestCase(TestCase):
+    '''
+    Unit Tests for the batch runs which do not ping the target first
+    '''
+    def _batch(self, minions, batch='2', pings=(), **kwargs):
+        opts = {'batch': batch, 'conf_file': {}, 'tgt': '*', 'transport': '',
+                'timeout': 5, 'fun': 'test.sleep', 'arg': [],
+                'batch_presence': True, 'minion_data_cache': False}
+        opts.update(kwargs)
+        self.jobs = []
+        self.local = MagicMock()
+        self.local.cmd_iter_no_block.side_effect = \
+            lambda tgt, *args, **kwargs: self.jobs.append(list(tgt)) or _returns(tgt)
+        self.local.cmd_iter.return_value = iter(pings)
+        ckminions = MagicMock()
+        ckminions.return_value.check_minions.return_value = minions
+        ckminions.return_value.connected_ids.return_value = set(minions)
+        with patch('salt.client.get_local_client', MagicMock(return_value=self.local)):
+            with patch('salt.utils.minions.CkMinions', ckminions):
+                return Batch(opts, quiet=True)
+
+    def test_resolve_minions(self):
+        opts = {'minion_data_cache': True}
+        ckminions = MagicMock()
+        ckminions.return_value.check_minions.return_value = ['foo', 'bar', 'baz']
+        ckminions.return_value.connected_ids.return_value = set(['foo', 'bar'])
+        with patch('salt.utils.minions.CkMinions', ckminions):
+            self.assertEqual(resolve_minions(opts, 'group1', 'nodegroup'),
+                             (['bar', 'foo'], set(['baz'])))
+            ckminions.return_value.check_minions.assert_called_with(
+                'N@group1', 'compound', greedy=False)
+            opts['minion_data_cache'] = False
+            self.assertEqual(resolve_minions(opts, '*'),
+                             (['bar', 'baz', 'foo'], set()))
+
+    def test_no_ping(self):
+        batch = self._batch(['foo', 'bar'])
+        self.assertEqual(batch.minions, ['bar', 'foo'])
+        self.assertEqual(batch.down_minions, set())
+        self.assertFalse(self.local.cmd_iter.called)
+
+    def test_grain_target_without_cache(self):
+        # Only the minions can match the grains, the target is pinged
+        pings = [{'minions': ['win1', 'win2'], 'jid': '1'},
+                 {'win1': {'ret': True}}]
+        batch = self._batch(['win1', 'linux1'], tgt='os:Windows',
+                            expr_form='grain', pings=pings)
+        self.assertTrue(self.local.cmd_iter.called)
+        self.assertEqual(self.local.cmd_iter.call_args[0][0], 'os:Windows')
+        self.assertEqual(batch.minions, ['win1'])
+        self.assertEqual(batch.down_minions, set(['win2']))
+
+    def test_grain_target_with_cache(self):
+        batch = self._batch(['win1'], tgt='os:Windows', expr_form='grain',
+                            minion_data_cache=True)
+        self.assertFalse(self.local.cmd_iter.called)
+        self.assertEqual(batch.minions, ['win1'])
+
+    def test_sliding_window(self):
+        batch = self._batch(['a', 'b', 'c', 'slow'])
+        rets = [ret for ret in batch.run() if ret]
+        self.assertEqual(len(rets), 4)
+        # returning minions are replaced while the slow one runs
+        self.assertEqual(self.jobs, [['slow', 'c'], ['b'], ['a']])
+
+    def test_no_block(self):
+        batch = self._batch(['slow1', 'slow2'])
+        rets = list(batch.run(block=False))
+        self.assertIn(None, rets)
+        self.assertEqual(sorted(ret for ret in rets if ret),
+                         [{'slow1': {'ret': True}}, {'slow2': {'ret': True}}])
+
+
 if __name__ == '__main__':
     from integration import run_tests
-    run_tests(BatchTestCase, needs_daemon=False)
+    run_tests(BatchTestCase, BatchPresenceTestCase, needs_daemon=False)
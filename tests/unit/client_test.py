@@ -5,16 +5,23 @@
 
 # Import python libs
 from __future__ import absolute_import
+import time
 
 # Import Salt Testing libs
 from salttesting import TestCase, skipIf
 from salttesting.helpers import ensure_in_syspath
-from salttesting.mock import patch, NO_MOCK, NO_MOCK_REASON
+from salttesting.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 ensure_in_syspath('../')
 
 # Import Salt libs
 import integration
 from salt import client
+import salt.utils.job
+
+# Import 3rd-party libs
+import tornado.concurrent
+import tornado.gen
+import tornado.ioloop
 from salt.exceptions import EauthAuthenticationError, SaltInvocationError, SaltClientError
 
 if integration.SaltClientTestCaseMixIn().get_config('minion')['transport'] != 'zeromq':
@@ -90,7 +97,176 @@ class LocalClientTestCase(TestCase,
                                   self.client.pub,
                                   'non_existent_group', 'test.ping', expr_form='nodegroup')
 
+    def _job_events(self, jid, events, delay):
+        '''
+        Return a get_event mock which sends the events of a job, the last one
+        after ``delay`` seconds
+        '''
+        start = time.time()
+        events = list(events)
+
+        def get_event(**kwargs):
+            if kwargs.get('no_block'):
+                return None
+            if len(events) > 1 or time.time() - start > delay:
+                if events:
+                    return events.pop(0)
+            time.sleep(kwargs['wait'])
+            return None
+        return MagicMock(side_effect=get_event)
+
+    def test_get_iter_returns_heartbeat(self):
+        jid = '20161018120000000000'
+        tag = salt.utils.job.heartbeat_tag(jid, 'minion1')
+        # The master fires the events of the minion as they were sent
+        events = [{'tag': tag,
+                   'data': {'tag': tag,
+                            'data': {'id': 'minion1', 'jid': jid, 'fun': 'test.sleep'},
+                            '_stamp': '2016-10-18T12:00:00.000000'}},
+                  {'tag': 'salt/job/{0}/ret/minion1'.format(jid),
+                   'data': {'id': 'minion1', 'jid': jid, 'return': True}}]
+        get_load = {'{0}.get_load'.format(self.client.opts['master_job_cache']):
+                    MagicMock(return_value={'fun': 'test.sleep'})}
+        with patch.object(self.client, 'event') as event_mock, \
+                patch.object(self.client, 'returners', get_load), \
+                patch.object(self.client, 'gather_job_info') as gather_mock:
+            event_mock.get_event = self._job_events(jid, events, 0.5)
+            rets = [ret for ret in self.client.get_iter_returns(
+                jid, ['minion1'], timeout=0.2) if ret]
+        self.assertEqual(rets, [{'minion1': {'ret': True, 'jid': jid}}])
+        # the minion sent a heartbeat, it is not asked with find_job
+        self.assertFalse(gather_mock.called)
+        # the waits are blocking
+        self.assertTrue(any(not call[1].get('no_block')
+                            for call in event_mock.get_event.call_args_list))
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class AsyncLocalClientTestCase(TestCase,
+                               integration.SaltClientTestCaseMixIn):
+    def setUp(self):
+        self.io_loop = tornado.ioloop.IOLoop(make_current=False)
+        self.local = MagicMock()
+        self.local.opts = self.get_config('master')
+        self.local._get_timeout.side_effect = lambda timeout: timeout or 1
+        self.local._check_pub_data.side_effect = lambda pub_data: pub_data
+        with patch('salt.client.LocalClient', MagicMock(return_value=self.local)):
+            with patch('salt.utils.event.get_event', MagicMock()):
+                self.async_client = client.AsyncLocalClient(io_loop=self.io_loop)
+        self.async_client.dispatcher.event.unpack.side_effect = lambda raw, serial: raw
+
+    def tearDown(self):
+        self.io_loop.close()
+
+    def _publish(self, minions, events, delays=None):
+        '''
+        Make the publications return the minions and send the events of the
+        job, after the given delays
+        '''
+        def pub_async(*args, **kwargs):
+            future = tornado.concurrent.Future()
+            future.set_result({'jid': kwargs['jid'], 'minions': minions})
+            for index, (tag, data) in enumerate(events):
+                self.io_loop.call_later(
+                    delays[index] if delays else 0,
+                    self.async_client.dispatcher._handle_event,
+                    (tag.format(jid=kwargs['jid']), data))
+            return future
+        self.local.pub_async.side_effect = pub_async
+
+    def test_dispatch(self):
+        dispatcher = self.async_client.dispatcher
+        self.assertIs(client.JobEventDispatcher(self.local.opts, io_loop=self.io_loop),
+                      dispatcher)
+        queue1 = dispatcher.subscribe('1')
+        queue2 = dispatcher.subscribe('2')
+        dispatcher._handle_event(('salt/job/1/ret/minion1', {'id': 'minion1'}))
+        dispatcher._handle_event(('syndic/syndic1/2', {'minions': ['minion2']}))
+        dispatcher._handle_event(('salt/job/3/ret/minion1', {'id': 'minion1'}))
+        self.assertEqual(queue1.qsize(), 1)
+        self.assertEqual(queue2.qsize(), 1)
+        dispatcher.unsubscribe('1', queue1)
+        self.assertEqual(list(dispatcher.jobs), ['2'])
+
+    def test_cmd(self):
+        self._publish(['minion1', 'minion2'],
+                      [('salt/job/{jid}/new', {'minions': ['minion1', 'minion2']}),
+                       ('salt/job/{jid}/ret/minion1', {'id': 'minion1', 'return': 1}),
+                       ('salt/job/{jid}/ret/minion2', {'id': 'minion2', 'return': 2})])
+        ret = self.io_loop.run_sync(lambda: self.async_client.cmd('*', 'test.ping'))
+        self.assertEqual(ret, {'minion1': 1, 'minion2': 2})
+        self.assertEqual(self.async_client.dispatcher.jobs, {})
+
+    def test_get_returns_timeout(self):
+        self._publish(['minion1', 'minion2'],
+                      [('salt/job/{jid}/ret/minion1', {'id': 'minion1', 'return': 1})])
+        rets = []
+
+        @tornado.gen.coroutine
+        def run():
+            pub_data = yield self.async_client.run_job('*', 'test.ping')
+            ret = yield self.async_client.get_returns(
+                pub_data['jid'], pub_data['minions'], timeout=1, callback=rets.append)
+            raise tornado.gen.Return(ret)
+        ret = self.io_loop.run_sync(run)
+        self.assertEqual(ret, {'minion1': {'ret': 1}})
+        self.assertEqual(rets, [{'minion1': {'ret': 1}}])
+
+    def test_get_returns_heartbeat(self):
+        # The master fires the heartbeats as the minion sent them
+        heartbeat = {'tag': 'salt/job/{jid}/alive/minion1',
+                     'data': {'id': 'minion1', 'fun': 'test.sleep'}}
+        self._publish(['minion1'],
+                      [('salt/job/{jid}/alive/minion1', heartbeat),
+                       ('salt/job/{jid}/alive/minion1', heartbeat),
+                       ('salt/job/{jid}/ret/minion1', {'id': 'minion1', 'return': 1})],
+                      delays=[0.2, 0.4, 0.6])
+
+        @tornado.gen.coroutine
+        def run():
+            pub_data = yield self.async_client.run_job('*', 'test.sleep')
+            ret = yield self.async_client.get_returns(
+                pub_data['jid'], pub_data['minions'], timeout=0.3)
+            raise tornado.gen.Return(ret)
+        ret = self.io_loop.run_sync(run, timeout=5)
+        self.assertEqual(ret, {'minion1': {'ret': 1}})
+
+    def test_iter_returns(self):
+        self._publish(['minion1', 'minion2'],
+                      [('salt/job/{jid}/ret/minion1', {'id': 'minion1', 'return': 1}),
+                       ('salt/job/{jid}/ret/minion2', {'id': 'minion2', 'return': 2})])
+
+        @tornado.gen.coroutine
+        def run():
+            pub_data = yield self.async_client.run_job('*', 'test.ping')
+            returns = yield self.async_client.iter_returns(
+                pub_data['jid'], pub_data['minions'], timeout=1)
+            rets = []
+            while True:
+                ret = yield returns.next()
+                if ret is None:
+                    break
+                rets.append(ret)
+            raise tornado.gen.Return(rets)
+        rets = self.io_loop.run_sync(run, timeout=5)
+        self.assertEqual(rets, [{'minion1': {'ret': 1}}, {'minion2': {'ret': 2}}])
+        self.assertEqual(self.async_client.dispatcher.jobs, {})
+
+    def test_unread_returns_released(self):
+        self._publish(['minion1'],
+                      [('salt/job/{jid}/ret/minion1', {'id': 'minion1', 'return': 1})])
+
+        @tornado.gen.coroutine
+        def run():
+            pub_data = yield self.async_client.run_job('*', 'test.ping', timeout=0.2)
+            # The returns are never read
+            self.assertIn(pub_data['jid'], self.async_client.dispatcher.jobs)
+            yield tornado.gen.sleep(0.5)
+        self.io_loop.run_sync(run, timeout=5)
+        self.assertEqual(self.async_client.dispatcher.jobs, {})
+        self.assertEqual(self.async_client.queues, {})
+
 
 if __name__ == '__main__':
     from integration import run_tests
-    run_tests(LocalClientTestCase, needs_daemon=False)
+    run_tests(LocalClientTestCase, AsyncLocalClientTestCase, needs_daemon=False)
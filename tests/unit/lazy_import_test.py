@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.lazy_import_test
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Check that the command line tools do not import the crypto, transport and
+    minion stacks before they use them.
+'''
+
+# Import Python libs
+from __future__ import absolute_import
+import json
+import os
+import subprocess
+import sys
+
+# Import Salt Testing libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../')
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _imported(module):
+    '''
+    Import a module in a new interpreter, return the modules it imported
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [CODE_DIR] + [path for path in env.get('PYTHONPATH', '').split(os.pathsep) if path])
+    out = subprocess.check_output(
+        [sys.executable, '-c',
+         'import json, sys; import {0}; print(json.dumps(sorted(sys.modules)))'.format(module)],
+        env=env)
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+class LazyImportTestCase(TestCase):
+    def assertNotImported(self, module, unwanted):
+        modules = _imported(module)
+        for name in unwanted:
+            self.assertNotIn(name, modules,
+                             '{0} imports {1}'.format(module, name))
+
+    def test_utils(self):
+        self.assertNotImported('salt.utils', ('Crypto', 'Crypto.Random'))
+
+    def test_key(self):
+        self.assertNotImported(
+            'salt.key',
+            ('Crypto', 'tornado', 'zmq', 'salt.crypt', 'salt.minion',
+             'salt.client', 'salt.transport'))
+
+    def test_runner(self):
+        self.assertNotImported(
+            'salt.runner', ('Crypto', 'jinja2', 'salt.crypt', 'salt.minion'))
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(LazyImportTestCase, needs_daemon=False)
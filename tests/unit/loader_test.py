@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.loader_test
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Test the collection of the grains and the caches of the loader
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# Import Salt Testing libs
+from salttesting import TestCase, skipIf
+from salttesting.helpers import ensure_in_syspath
+from salttesting.mock import NO_MOCK, NO_MOCK_REASON, patch
+ensure_in_syspath('../')
+
+# Import salt libs
+import salt.config
+import salt.loader
+import salt.utils
+from salt.utils.odict import OrderedDict
+
+HANG = threading.Event()
+
+
+def _core_os():
+    time.sleep(0.2)
+    return {'os': 'Debian', 'nested': {'core': True}}
+
+
+def _core_fqdn():
+    return {'fqdn': 'minion.example.com'}
+
+
+def _custom_os():
+    return {'os': 'Custom', 'nested': {'custom': True}}
+
+
+def _custom_error():
+    raise RuntimeError('broken grain')
+
+
+def _custom_hang():
+    HANG.wait(5)
+    return {'hang': True}
+
+
+class _GrainFuncs(OrderedDict):
+    '''
+    Stand-in for the grains LazyLoader, which clear() only reloads
+    '''
+    def clear(self):
+        pass
+
+
+def _grain_funcs():
+    return OrderedDict([('core.os', _core_os),
+                        ('core.fqdn', _core_fqdn),
+                        ('custom.os', _custom_os),
+                        ('custom.error', _custom_error)])
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class GrainsLoaderTestCase(TestCase):
+
+    def setUp(self):
+        self.opts = {'cachedir': '/tmp', 'grains_deep_merge': False}
+        HANG.clear()
+
+    def tearDown(self):
+        HANG.set()
+
+    def _grains(self, funcs=None, **opts):
+        self.opts.update(opts)
+        with patch('salt.loader.grain_funcs',
+                   return_value=funcs or _grain_funcs()):
+            return salt.loader.grains(self.opts)
+
+    def test_serial(self):
+        grains = self._grains()
+        self.assertEqual(grains['os'], 'Custom')
+        self.assertEqual(grains['fqdn'], 'minion.example.com')
+        self.assertEqual(grains['nested'], {'custom': True})
+
+    def test_concurrent_merge_order(self):
+        # core.os returns last but is still merged first
+        grains = self._grains(grains_concurrency=4)
+        self.assertEqual(grains['os'], 'Custom')
+        self.assertEqual(grains['nested'], {'custom': True})
+        grains = self._grains(grains_concurrency=4, grains_deep_merge=True)
+        self.assertEqual(grains['nested'], {'core': True, 'custom': True})
+
+    def test_concurrent_timeout(self):
+        funcs = _grain_funcs()
+        funcs['custom.hang'] = _custom_hang
+        start = time.time()
+        grains = self._grains(funcs, grains_concurrency=4, grains_timeout=0.5)
+        self.assertLess(time.time() - start, 4)
+        self.assertNotIn('hang', grains)
+        self.assertEqual(grains['os'], 'Custom')
+        timing = salt.loader.grains_timing()
+        self.assertEqual(timing['timed_out'], ['custom.hang'])
+
+    def test_concurrent_timeout_queued(self):
+        # Both threads hang, the queued function never starts
+        funcs = [('custom.hang1', _custom_hang), ('custom.hang2', _custom_hang),
+                 ('core.fqdn', _core_fqdn)]
+        start = time.time()
+        results = salt.loader._run_grain_funcs(funcs, concurrency=2, timeout=0.5)
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(results, [])
+        self.assertEqual(salt.loader.grains_timing()['timed_out'],
+                         ['custom.hang1', 'custom.hang2', 'core.fqdn'])
+
+    def test_timing(self):
+        self._grains(grains_concurrency=2)
+        timing = salt.loader.grains_timing()
+        self.assertEqual(
+            sorted(timing['functions']),
+            ['core.fqdn', 'core.os', 'custom.error', 'custom.os'])
+        self.assertGreaterEqual(timing['functions']['core.os'], 0.2)
+        self.assertGreaterEqual(timing['total'], 0.2)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class GrainsRefreshTestCase(TestCase):
+
+    def setUp(self):
+        self.opts = {'cachedir': '/tmp', 'grains_deep_merge': True}
+        self.calls = []
+
+    def _funcs(self):
+        calls = self.calls
+
+        def _ip():
+            calls.append('core.ip')
+            return {'ip': len(calls), 'nested': {'ip': True}}
+
+        def _os():
+            calls.append('core.os')
+            return {'os': 'Debian', 'nested': {'os': True}}
+
+        return _GrainFuncs([('core.ip', _ip), ('core.os', _os)])
+
+    def _grains(self, force_refresh=True, **kwargs):
+        with patch('salt.loader.grain_funcs', return_value=self._funcs()):
+            return salt.loader.grains(self.opts, force_refresh, **kwargs)
+
+    def test_refresh_expired_only(self):
+        self._grains()
+        self.opts['grains_refresh_ttl'] = {'core.ip': 0}
+        grains = self._grains()
+        self.assertEqual(self.calls, ['core.ip', 'core.os', 'core.ip'])
+        self.assertEqual(grains['ip'], 3)
+        self.assertEqual(grains['os'], 'Debian')
+        # Deep merging the grains must not alter the kept results
+        self.assertEqual(grains['nested'], {'ip': True, 'os': True})
+        grains = self._grains()
+        self.assertEqual(grains['nested'], {'ip': True, 'os': True})
+
+    def test_refresh_ttl_not_expired(self):
+        self._grains()
+        self.opts['grains_refresh_ttl'] = {'core.*': 3600}
+        self._grains()
+        self.assertEqual(self.calls, ['core.ip', 'core.os'])
+
+    def test_refresh_funcs(self):
+        self._grains()
+        self._grains(refresh_funcs=['core.o*'])
+        self.assertEqual(self.calls, ['core.ip', 'core.os', 'core.os'])
+
+    def test_refresh_timeout_skipped(self):
+        HANG.clear()
+        self.addCleanup(HANG.set)
+        self._grains()
+        funcs = self._funcs()
+        funcs['core.os'] = _custom_hang
+        self.opts.update({'grains_concurrency': 2, 'grains_timeout': 0.5,
+                          'grains_refresh_ttl': {'core.*': 3600}})
+        with patch('salt.loader.grain_funcs', return_value=funcs):
+            grains = salt.loader.grains(self.opts, True, refresh_funcs=['core.os'])
+        # The grains of the function which timed out are not kept
+        self.assertNotIn('os', grains)
+        self.assertNotIn('hang', grains)
+        self.assertEqual(grains['ip'], 1)
+        # and it is run again by the next refresh
+        HANG.set()
+        grains = self._grains()
+        self.assertEqual(grains['os'], 'Debian')
+        self.assertEqual(self.calls, ['core.ip', 'core.os', 'core.os'])
+
+    def test_no_force_refresh_runs_all(self):
+        self._grains()
+        self.opts['grains_refresh_ttl'] = {'core.ip': 3600}
+        self._grains(force_refresh=False)
+        self.assertEqual(self.calls, ['core.ip', 'core.os'] * 2)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ModuleIndexTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.mod_dir = os.path.join(self.tmp_dir, 'modules')
+        os.makedirs(os.path.join(self.mod_dir, 'pkgmod'))
+        for name in ('foo.py', 'bar.py', os.path.join('pkgmod', '__init__.py')):
+            with salt.utils.fopen(os.path.join(self.mod_dir, name), 'w') as fp_:
+                fp_.write('')
+        self._age(self.mod_dir)
+        self._age(os.path.join(self.mod_dir, 'pkgmod'))
+        self.opts = {'cachedir': self.tmp_dir, 'serial': 'msgpack'}
+        salt.loader._MODULE_INDEX.clear()
+        salt.loader._MODULE_INDEX_LOADED.clear()
+
+    def tearDown(self):
+        salt.loader._MODULE_INDEX.clear()
+        salt.loader._MODULE_INDEX_LOADED.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def _age(self, path, seconds=60):
+        mtime = time.time() - seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_indexed_listdir(self):
+        files, updated = salt.loader._indexed_listdir(self.mod_dir)
+        self.assertTrue(updated)
+        self.assertEqual(sorted(files), ['bar.py', 'foo.py', 'pkgmod'])
+        with patch('os.listdir', side_effect=AssertionError):
+            files, updated = salt.loader._indexed_listdir(self.mod_dir)
+        self.assertFalse(updated)
+        self.assertEqual(sorted(files), ['bar.py', 'foo.py', 'pkgmod'])
+
+    def test_indexed_listdir_changed(self):
+        salt.loader._indexed_listdir(self.mod_dir)
+        with salt.utils.fopen(os.path.join(self.mod_dir, 'baz.py'), 'w') as fp_:
+            fp_.write('')
+        self._age(self.mod_dir, 30)
+        files, updated = salt.loader._indexed_listdir(self.mod_dir)
+        self.assertTrue(updated)
+        self.assertIn('baz.py', files)
+
+    def test_indexed_listdir_racy(self):
+        os.utime(self.mod_dir, None)
+        files, updated = salt.loader._indexed_listdir(self.mod_dir)
+        self.assertFalse(updated)
+        self.assertIn('foo.py', files)
+        self.assertNotIn(self.mod_dir, salt.loader._MODULE_INDEX)
+
+    def test_indexed_listdir_not_a_dir(self):
+        path = os.path.join(self.mod_dir, 'foo.py')
+        self._age(path)
+        self.assertRaises(OSError, salt.loader._indexed_listdir, path)
+        self.assertRaises(OSError, salt.loader._indexed_listdir, path)
+        self.assertRaises(OSError, salt.loader._indexed_listdir,
+                          os.path.join(self.mod_dir, 'missing'))
+
+    def test_persisted_index(self):
+        salt.loader._indexed_listdir(self.mod_dir)
+        salt.loader._save_module_index(self.opts)
+        salt.loader._MODULE_INDEX.clear()
+        salt.loader._load_module_index(self.opts)
+        self.assertEqual(
+            sorted(salt.loader._MODULE_INDEX[self.mod_dir][1]),
+            ['bar.py', 'foo.py', 'pkgmod'])
+
+    def test_file_mapping(self):
+        opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        opts['cachedir'] = self.tmp_dir
+        loader = salt.loader.LazyLoader([self.mod_dir], opts, tag='module')
+        expected = loader.file_mapping
+        opts['loader_index_cache'] = True
+        loader = salt.loader.LazyLoader([self.mod_dir], opts, tag='module')
+        self.assertEqual(loader.file_mapping, expected)
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.tmp_dir, 'loader', 'module_index.p')))
+        salt.loader._MODULE_INDEX_LOADED.clear()
+        with patch('os.listdir', side_effect=AssertionError):
+            loader = salt.loader.LazyLoader([self.mod_dir], opts, tag='module')
+        self.assertEqual(loader.file_mapping, expected)
+        self.assertEqual(sorted(expected), ['bar', 'foo', 'pkgmod'])
+
+
+VIRTUAL_MODULES = {
+    'plain.py': 'def ping():\n    return True\n',
+    'renamed.py': (
+        "__virtualname__ = 'other'\n\n\n"
+        "def __virtual__():\n    return __virtualname__\n\n\n"
+        "def ping():\n    return 'other'\n"),
+    'unavail.py': (
+        "def __virtual__():\n    return (False, 'missing dependency')\n\n\n"
+        "def ping():\n    return True\n"),
+    'broken.py': 'import salt_no_such_library\n',
+}
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class VirtualCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.mod_dir = os.path.join(self.tmp_dir, 'modules')
+        os.makedirs(self.mod_dir)
+        for name, code in VIRTUAL_MODULES.items():
+            with salt.utils.fopen(os.path.join(self.mod_dir, name), 'w') as fp_:
+                fp_.write(code)
+        self.opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        self.opts.update({'cachedir': self.tmp_dir,
+                          'grains': {'os': 'Debian'},
+                          'virtual_cache': True})
+        salt.loader._VIRTUAL_CACHE.clear()
+
+    def tearDown(self):
+        salt.loader._VIRTUAL_CACHE.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def _loader(self):
+        return salt.loader.LazyLoader([self.mod_dir], self.opts,
+                                      tag='module',
+                                      loaded_base_name='salt.loaded.vtest')
+
+    def _imported(self, func):
+        loader = self._loader()
+        imported = []
+        load_module = salt.loader.imp.load_module
+
+        def _load_module(name, *args):
+            imported.append(name.rsplit('.', 1)[-1])
+            return load_module(name, *args)
+
+        with patch('imp.load_module', _load_module):
+            func(loader)
+        return loader, sorted(imported)
+
+    def test_cache(self):
+        loader, imported = self._imported(lambda loader: loader._load_all())
+        self.assertEqual(imported, ['broken', 'plain', 'renamed', 'unavail'])
+        self.assertEqual(sorted(loader), ['other.ping', 'plain.ping'])
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.tmp_dir, 'loader', 'virtual_cache.p')))
+        salt.loader._VIRTUAL_CACHE.clear()
+
+        loader, imported = self._imported(lambda loader: loader._load_all())
+        self.assertEqual(imported, ['plain', 'renamed'])
+        self.assertEqual(sorted(loader), ['other.ping', 'plain.ping'])
+        self.assertIn('missing dependency',
+                      loader.missing_fun_string('unavail.ping'))
+
+        loader, imported = self._imported(lambda loader: loader['plain.ping'])
+        self.assertEqual(imported, ['plain'])
+        loader, imported = self._imported(lambda loader: loader['other.ping'])
+        self.assertEqual(imported, ['renamed'])
+
+    def test_grains_changed(self):
+        self._imported(lambda loader: loader._load_all())
+        self.opts['grains'] = {'os': 'RedHat'}
+        loader, imported = self._imported(lambda loader: loader._load_all())
+        self.assertEqual(imported, ['broken', 'plain', 'renamed', 'unavail'])
+
+    def test_module_changed(self):
+        self._imported(lambda loader: loader._load_all())
+        path = os.path.join(self.mod_dir, 'unavail.py')
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        loader, imported = self._imported(lambda loader: loader._load_all())
+        self.assertEqual(imported, ['plain', 'renamed', 'unavail'])
+
+    def test_expiration(self):
+        self.opts['virtual_cache_expiration'] = 1
+        self._imported(lambda loader: loader._load_all())
+        with patch('time.time', return_value=time.time() + 2):
+            loader, imported = self._imported(
+                lambda loader: loader._load_all())
+        self.assertEqual(imported, ['broken', 'plain', 'renamed', 'unavail'])
+
+    def test_clear(self):
+        self._imported(lambda loader: loader._load_all())
+        salt.loader.clear_virtual_cache(self.opts)
+        self.assertFalse(os.path.isfile(
+            os.path.join(self.tmp_dir, 'loader', 'virtual_cache.p')))
+        loader, imported = self._imported(lambda loader: loader._load_all())
+        self.assertEqual(imported, ['broken', 'plain', 'renamed', 'unavail'])
+
+    def test_disabled_without_grains(self):
+        self.opts['grains'] = {}
+        self._imported(lambda loader: loader._load_all())
+        self.assertFalse(os.path.isfile(
+            os.path.join(self.tmp_dir, 'loader', 'virtual_cache.p')))
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(GrainsLoaderTestCase, GrainsRefreshTestCase, ModuleIndexTestCase,
+              VirtualCacheTestCase, needs_daemon=False)
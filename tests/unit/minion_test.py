@@ -7,6 +7,11 @@
 from __future__ import absolute_import
 import copy
 import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
 
 # Import Salt Testing libs
 from salttesting import TestCase, skipIf
@@ -15,9 +20,13 @@ from salttesting.mock import NO_MOCK, NO_MOCK_REASON, patch, MagicMock
 
 # Import salt libs
 from salt import minion
+import salt.cli.caller
+import salt.defaults.exitcodes
 from salt.utils import event
 from salt.exceptions import SaltSystemExit
+import salt.payload
 import salt.syspaths
+import salt.utils
 import tornado
 
 ensure_in_syspath('../')
@@ -79,6 +88,19 @@ class MinionTestCase(TestCase):
         finally:
             minion.destroy()
 
+    def test_minion_stats(self):
+        mock_opts = {'cachedir': '',
+                     'extension_modules': ''}
+        try:
+            minion = salt.minion.Minion(mock_opts, jid_queue=[123], io_loop=tornado.ioloop.IOLoop())
+            minion._handle_decoded_payload({'fun': 'foo.bar', 'jid': 123})
+            with patch('salt.utils.event.get_event') as get_event:
+                minion.minion_stats('minion_stats', {})
+            data, = get_event.return_value.fire_event.call_args[0]
+            self.assertEqual(data['stats']['jid_queue']['duplicates'], 1)
+        finally:
+            minion.destroy()
+
     @patch('salt.minion.Minion.ctx', MagicMock(return_value={}))
     @patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True))
     @patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True))
@@ -139,7 +161,461 @@ class MinionTestCase(TestCase):
         finally:
             minion.destroy()
 
+    @patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start')
+    def test_handle_decoded_payload_job_pool(self, start):
+        '''
+        Tests that the _handle_decoded_payload function hands the job to the
+        job worker pool, and only starts a process when the pool is busy.
+        '''
+        mock_opts = {'cachedir': '',
+                     'extension_modules': '',
+                     'minion_jid_queue_hwm': 100}
+        try:
+            minion = salt.minion.Minion(mock_opts, jid_queue=[], io_loop=tornado.ioloop.IOLoop())
+            minion.job_pool = MagicMock()
+            minion.job_pool.dispatch.return_value = True
+            minion._handle_decoded_payload({'fun': 'foo.bar', 'jid': 1})
+            minion.job_pool.dispatch.assert_called_once_with({'fun': 'foo.bar', 'jid': 1})
+            self.assertFalse(start.called)
+            minion.job_pool.dispatch.return_value = False
+            with patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join'):
+                minion._handle_decoded_payload({'fun': 'foo.bar', 'jid': 2})
+            self.assertTrue(start.called)
+        finally:
+            minion.destroy()
+
+    def test_connection_change_restarts_job_pool(self):
+        '''
+        Tests that the job workers are replaced when the connection to the
+        master changes, since they keep the state of the minion from when
+        they were forked
+        '''
+        mock_opts = {'cachedir': '',
+                     'extension_modules': '',
+                     'minion_jid_queue_hwm': 100,
+                     'master': 'master1',
+                     'master_type': 'str',
+                     'transport': 'tcp'}
+        serial = salt.payload.Serial({'serial': 'msgpack'})
+
+        def _package(tag, data):
+            return tag + event.TAGEND + serial.dumps(data)
+
+        io_loop = tornado.ioloop.IOLoop()
+        minion_obj = minion.Minion(mock_opts, jid_queue=[], io_loop=io_loop)
+        try:
+            minion_obj.ready = True
+            minion_obj.connected = True
+            minion_obj.job_pool = MagicMock()
+            package = _package(minion.master_event(type='disconnected'),
+                               {'master': 'master1'})
+            io_loop.run_sync(lambda: minion_obj.handle_event(package))
+            self.assertFalse(minion_obj.connected)
+            self.assertEqual(minion_obj.job_pool.restart.call_count, 1)
+            package = _package(minion.master_event(type='connected'), {})
+            io_loop.run_sync(lambda: minion_obj.handle_event(package))
+            self.assertTrue(minion_obj.connected)
+            self.assertEqual(minion_obj.job_pool.restart.call_count, 2)
+        finally:
+            minion_obj.destroy()
+
+
+class _PoolMinion(object):
+    '''
+    Minion stand-in recording the jobs run by the job workers
+    '''
+    opts = {}
+    connected = False
+
+    def __init__(self, proc_dir):
+        self.proc_dir = proc_dir
+
+    @staticmethod
+    def _target(minion_instance, opts, data, connected):
+        time.sleep(data.get('sleep', 0))
+        path = os.path.join(minion_instance.proc_dir, '{0}.done'.format(data['jid']))
+        with salt.utils.fopen(path, 'w') as fp_:
+            fp_.write(str(os.getpid()))
+
+
+class JobWorkerPoolTestCase(TestCase):
+    def setUp(self):
+        self.proc_dir = tempfile.mkdtemp()
+        self.pool = None
+
+    def tearDown(self):
+        if self.pool is not None:
+            self.pool.stop()
+            for worker in self.pool.retired:
+                worker['process'].join(5)
+        shutil.rmtree(self.proc_dir)
+
+    def _pool(self, size=1, max_jobs=0):
+        self.pool = minion.JobWorkerPool(_PoolMinion(self.proc_dir), size, max_jobs)
+        self.pool.start()
+        return self.pool
+
+    def _wait(self, jid):
+        path = os.path.join(self.proc_dir, '{0}.done'.format(jid))
+        for _ in range(100):
+            if os.path.isfile(path):
+                with salt.utils.fopen(path) as fp_:
+                    pid = fp_.read()
+                if pid:
+                    return int(pid)
+            time.sleep(0.1)
+        self.fail('Job {0} did not run'.format(jid))
+
+    def test_dispatch(self):
+        pool = self._pool()
+        pid = pool.workers[0]['process'].pid
+        # The proc file of the job is removed once it is done
+        with salt.utils.fopen(os.path.join(self.proc_dir, '1'), 'w') as fp_:
+            fp_.write('')
+        self.assertTrue(pool.dispatch({'jid': '1'}))
+        self.assertEqual(self._wait('1'), pid)
+        for _ in range(50):
+            if not os.path.isfile(os.path.join(self.proc_dir, '1')):
+                break
+            time.sleep(0.1)
+        self.assertFalse(os.path.isfile(os.path.join(self.proc_dir, '1')))
+        self.assertTrue(pool.dispatch({'jid': '2'}))
+        self.assertEqual(self._wait('2'), pid)
+
+    def test_busy(self):
+        pool = self._pool()
+        self.assertTrue(pool.dispatch({'jid': '1', 'sleep': 1}))
+        self.assertFalse(pool.dispatch({'jid': '2'}))
+        self._wait('1')
+        for _ in range(50):
+            if pool.dispatch({'jid': '3'}):
+                break
+            time.sleep(0.1)
+        else:
+            self.fail('The worker did not become idle')
+        self._wait('3')
+
+    def test_recycle(self):
+        pool = self._pool(max_jobs=1)
+        self.assertTrue(pool.dispatch({'jid': '1'}))
+        first = self._wait('1')
+        pool.workers[0]['process'].join(5)
+        self.assertTrue(pool.dispatch({'jid': '2'}))
+        self.assertNotEqual(self._wait('2'), first)
+
+    def test_restart(self):
+        pool = self._pool(size=2)
+        pids = set(worker['process'].pid for worker in pool.workers)
+        pool.restart()
+        self.assertEqual(len(pool.workers), 2)
+        self.assertFalse(pids & set(worker['process'].pid for worker in pool.workers))
+        for worker in pool.retired:
+            worker['process'].join(5)
+            self.assertFalse(worker['process'].is_alive())
+
+
+class _Functions(dict):
+    '''
+    Stand-in for the execution modules loader of a minion
+    '''
+    def __init__(self, *args, **kwargs):
+        super(_Functions, self).__init__(*args, **kwargs)
+        self.pack = {'__context__': {}}
+
+    def missing_fun_string(self, fun):
+        return '\'{0}\' is not available.'.format(fun)
+
+
+class _ExecMinion(object):
+    ready = True
+    connected = False
+    function_errors = {}
+    returners = {}
+    serial = salt.payload.Serial('msgpack')
+
+    def __init__(self, proc_dir):
+        self.opts = {'id': 'minion'}
+        self.proc_dir = proc_dir
+        self.functions = _Functions()
+        self.functions['test.echo'] = self.echo
+        self.functions['test.fail'] = self.fail
+        self.functions['test.running'] = self.running
+
+    def echo(self, text):
+        return text
+
+    def fail(self):
+        self.functions.pack['__context__']['retcode'] = 2
+        return False
+
+    def running(self):
+        self.opts['test'] = True
+        ret = []
+        for jid in os.listdir(self.proc_dir):
+            with salt.utils.fopen(os.path.join(self.proc_dir, jid), 'rb') as fp_:
+                ret.append(self.serial.loads(fp_.read()))
+        return ret
+
+
+class LocalExecServiceTestCase(TestCase):
+    def setUp(self):
+        self.sock_dir = tempfile.mkdtemp()
+        self.opts = {'id': 'minion', 'sock_dir': self.sock_dir,
+                     'hash_type': 'md5', 'local_exec_timeout': 1}
+        self.io_loop = tornado.ioloop.IOLoop(make_current=False)
+        self.proc_dir = os.path.join(self.sock_dir, 'proc')
+        os.mkdir(self.proc_dir)
+        self.minion = _ExecMinion(self.proc_dir)
+        # The signal handlers can only be set in the main thread
+        patcher = patch('salt.utils.process.default_signals', MagicMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.service = minion.LocalExecService(self.opts, [self.minion],
+                                               io_loop=self.io_loop)
+        self.service.start()
+        self.thread = threading.Thread(target=self.io_loop.start)
+        self.thread.start()
+
+    def tearDown(self):
+        self.io_loop.add_callback(self.io_loop.stop)
+        self.thread.join()
+        self.service.close()
+        self.io_loop.close(all_fds=True)
+        shutil.rmtree(self.sock_dir)
+
+    def _call(self, fun, *args):
+        opts = dict(self.opts, fun=fun, arg=list(args))
+        caller = salt.cli.caller.ServiceCaller.connect(opts)
+        self.assertIsNotNone(caller)
+        return caller.call()
+
+    def test_socket_mode(self):
+        mode = os.stat(minion.local_exec_sock_path(self.opts)).st_mode
+        self.assertEqual(mode & 0o777, 0o600)
+
+    def test_call(self):
+        ret = self._call('test.echo', 'hello')
+        self.assertEqual(ret['return'], 'hello')
+        self.assertEqual(ret['retcode'], 0)
+        self.assertEqual(ret['fun'], 'test.echo')
+
+    def test_retcode(self):
+        ret = self._call('test.fail')
+        self.assertEqual(ret['retcode'], 2)
+
+    def test_missing_function(self):
+        with patch('sys.stderr'):
+            with self.assertRaises(SystemExit) as exc:
+                self._call('test.missing')
+        self.assertEqual(exc.exception.code, -1)
+
+    def test_invalid_arguments(self):
+        with patch('sys.stderr') as stderr:
+            self.assertRaises(SystemExit, self._call, 'test.echo', 'a', 'b')
+        self.assertIn('Passed invalid arguments', stderr.write.call_args[0][0])
+
+    def test_not_running(self):
+        self.service.close()
+        opts = dict(self.opts, fun='test.echo', arg=[])
+        self.assertIsNone(salt.cli.caller.ServiceCaller.connect(opts))
+
+    def test_process(self):
+        ret = self._call('test.running')
+        # The function ran in a process of its own, listed in the proc dir
+        running = [data for data in ret['return'] if data['jid'] == ret['jid']]
+        self.assertEqual(len(running), 1)
+        self.assertEqual(running[0]['fun'], 'test.running')
+        self.assertNotEqual(running[0]['pid'], os.getpid())
+        self.assertEqual(os.listdir(self.proc_dir), [])
+        # and did not change the minion
+        self.assertNotIn('test', self.minion.opts)
+
+    def test_timeout(self):
+        # A service which never answers
+        self.service.close()
+        sock_path = minion.local_exec_sock_path(self.opts)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(sock_path)
+        server.listen(1)
+        try:
+            caller = salt.cli.caller.ServiceCaller.connect(
+                dict(self.opts, fun='test.echo', arg=['hello']))
+            factory = MagicMock()
+            with patch('salt.cli.caller.Caller.factory', factory):
+                with patch('sys.stderr') as stderr:
+                    with self.assertRaises(SystemExit) as exc:
+                        caller.call()
+        finally:
+            server.close()
+            os.unlink(sock_path)
+        # The request was delivered, it is not run a second time
+        self.assertFalse(factory.called)
+        self.assertEqual(exc.exception.code,
+                         salt.defaults.exitcodes.EX_GENERIC)
+        self.assertIn('may still run', stderr.write.call_args[0][0])
+
+    def test_send_failed(self):
+        caller = salt.cli.caller.ServiceCaller.connect(
+            dict(self.opts, fun='test.echo', arg=['hello']))
+        caller.sock.close()
+        caller.sock = MagicMock()
+        caller.sock.sendall.side_effect = socket.error
+        factory = MagicMock()
+        factory.return_value.call.return_value = {'return': 'local'}
+        with patch('salt.cli.caller.Caller.factory', factory):
+            self.assertEqual(caller.call(), {'return': 'local'})
+
+    def test_client_gone(self):
+        reply = MagicMock()
+        reply.stream.closed.return_value = True
+        with patch('salt.minion.SignalHandlingMultiprocessingProcess') as proc:
+            self.service.handle_request({'fun': 'test.echo'}, reply)
+        self.assertFalse(proc.called)
+        self.assertFalse(reply.called)
+
+
+def _future(result=None, exc=None):
+    future = tornado.concurrent.Future()
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+    return future
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ReturnSpoolTestCase(TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.opts = {'id': 'spooler',
+                     'cachedir': self.cachedir,
+                     'extension_modules': '',
+                     'multiprocessing': False,
+                     'cache_jobs': False,
+                     'pub_ret': True,
+                     'return_spool': True,
+                     'return_spool_batch': 2,
+                     'return_retry_timer': 5,
+                     'return_retry_timer_max': 0}
+        self.io_loop = tornado.ioloop.IOLoop(make_current=False)
+        self.minion = minion.Minion(self.opts, io_loop=self.io_loop)
+
+    def tearDown(self):
+        self.minion.destroy()
+        self.io_loop.close()
+        shutil.rmtree(self.cachedir)
+
+    def _ret(self, jid):
+        return {'jid': jid, 'fun': 'test.ping', 'return': True}
+
+    def test_spool_on_timeout(self):
+        send = MagicMock(side_effect=minion.SaltReqTimeoutError)
+        with patch.object(self.minion, '_send_req_sync', send):
+            self.assertEqual(self.minion._return_pub(self._ret('1')), '')
+            # The next return goes behind the spooled one without waiting
+            self.assertEqual(self.minion._return_pub(self._ret('2')), '')
+        self.assertEqual(send.call_count, 1)
+        spooled = [load for _, load in self.minion.return_spool.read()]
+        self.assertEqual([load['jid'] for load in spooled], ['1', '2'])
+        self.assertEqual(spooled[0]['cmd'], '_return')
+        self.assertEqual(spooled[0]['id'], 'spooler')
+
+    def test_no_spool(self):
+        self.minion.return_spool = None
+        send = MagicMock(side_effect=minion.SaltReqTimeoutError)
+        with patch.object(self.minion, '_send_req_sync', send):
+            self.assertEqual(self.minion._return_pub(self._ret('1')), '')
+        self.assertFalse(os.path.isdir(os.path.join(self.cachedir, 'return_spool')))
+
+    def test_flush(self):
+        for jid in ('1', '2', '3'):
+            self.minion.return_spool.spool(self._ret(jid))
+        send = MagicMock(return_value=_future(True))
+        with patch.object(self.minion, '_send_req_async', send):
+            self.io_loop.run_sync(self.minion._flush_return_spool)
+        self.assertEqual(send.call_count, 2)
+        load = send.call_args_list[0][0][0]
+        self.assertEqual(load['cmd'], '_return_batch')
+        self.assertEqual([ret['jid'] for ret in load['returns']], ['1', '2'])
+        self.assertEqual(len(self.minion.return_spool), 0)
+
+    def test_flush_unreachable(self):
+        self.minion.return_spool.spool(self._ret('1'))
+        send = MagicMock(return_value=_future(exc=minion.SaltReqTimeoutError()))
+        with patch.object(self.minion, '_send_req_async', send):
+            self.io_loop.run_sync(self.minion._flush_return_spool)
+        self.assertEqual(len(self.minion.return_spool), 1)
+
+    def test_flush_old_master(self):
+        self.minion.return_spool.spool(dict(self._ret('1'), cmd='_return'))
+        send = MagicMock(side_effect=[_future(False), _future('')])
+        with patch.object(self.minion, '_send_req_async', send):
+            self.io_loop.run_sync(self.minion._flush_return_spool)
+        self.assertEqual(send.call_args[0][0]['cmd'], '_return')
+        self.assertEqual(len(self.minion.return_spool), 0)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class EventCoalesceTestCase(TestCase):
+    def setUp(self):
+        self.opts = {'id': 'coalescer',
+                     'cachedir': '',
+                     'extension_modules': '',
+                     'master': 'salt',
+                     'minion_event_coalesce': 1,
+                     'minion_event_coalesce_max': 3}
+        self.io_loop = tornado.ioloop.IOLoop(make_current=False)
+        self.minion = minion.Minion(self.opts, io_loop=self.io_loop)
+        self.minion.ready = True
+
+    def tearDown(self):
+        self.minion.destroy()
+        self.io_loop.close()
+
+    def _fire(self, data, tag, events=None, pretag=None):
+        package = salt.utils.to_bytes('fire_master' + event.TAGEND) + \
+            salt.payload.Serial({'serial': 'msgpack'}).dumps(
+                {'data': data, 'tag': tag, 'events': events, 'pretag': pretag})
+        self.io_loop.run_sync(lambda: self.minion.handle_event(package))
+
+    def test_coalesce(self):
+        fire = MagicMock()
+        with patch.object(self.minion, '_fire_master', fire):
+            self._fire({'foo': 'bar'}, 'custom/tag')
+            self._fire(None, 'fire_master', events=[{'tag': 'a', 'data': {}}], pretag='pre')
+            self.assertFalse(fire.called)
+            self.minion._flush_master_events()
+        self.assertEqual(fire.call_count, 2)
+        events = fire.call_args_list[0][1]['events']
+        self.assertEqual(events, [{'id': 'coalescer', 'cmd': '_minion_event',
+                                   'pretag': None, 'data': {'foo': 'bar'},
+                                   'tag': 'custom/tag'}])
+        self.assertFalse(fire.call_args_list[0][1]['sync'])
+        self.assertEqual(fire.call_args_list[1][1]['pretag'], 'pre')
+        self.assertEqual(len(self.minion.event_coalescer), 0)
+
+    def test_flush_when_full(self):
+        fire = MagicMock()
+        with patch.object(self.minion, '_fire_master', fire):
+            for idx in range(3):
+                self._fire({'idx': idx}, 'custom/tag')
+        self.assertEqual(fire.call_count, 1)
+        self.assertEqual(len(fire.call_args[1]['events']), 3)
+
+    def test_stats(self):
+        with patch.object(self.minion, '_fire_master', MagicMock()):
+            for idx in range(2):
+                self._fire({'idx': idx}, 'custom/tag')
+            self.minion._flush_master_events()
+            self._fire({'idx': 2}, 'custom/tag')
+        with patch('salt.utils.event.get_event') as get_event:
+            self.minion.minion_stats('minion_stats', {})
+        data, = get_event.return_value.fire_event.call_args[0]
+        self.assertEqual(data['stats']['event_coalescer'],
+                         {'queued': 1, 'sent': 2, 'loads': 1})
+
 
 if __name__ == '__main__':
     from integration import run_tests
-    run_tests(MinionTestCase, needs_daemon=False)
+    run_tests(MinionTestCase, JobWorkerPoolTestCase, LocalExecServiceTestCase,
+              ReturnSpoolTestCase, EventCoalesceTestCase, needs_daemon=False)
@@ -5,6 +5,8 @@
 
 # Import Python Libs
 from __future__ import absolute_import
+import shutil
+import tempfile
 
 # Import Salt Testing Libs
 from salttesting import TestCase, skipIf
@@ -121,6 +123,49 @@ class MineTestCase(TestCase):
                                      ('192.168.0.1:80', 'abcdefhjhi1234567899'),
                                  ]}}})
 
+    def test_get_cached(self):
+        '''
+        Test that mine.get only has the master send the data when it changed
+        '''
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        master = {'etag': 'tag1', 'data': {'minion1': True}}
+        loads = []
+
+        def _mine_get(load, opts):
+            loads.append(dict(load))
+            if 'etag' not in load:
+                return master['data']
+            if load['etag'] == master['etag']:
+                return [master['etag']]
+            return [master['etag'], master['data']]
+
+        opts = {'file_client': 'remote', 'id': 'minion1',
+                'cachedir': tmpdir, 'mine_get_cache': True}
+        with patch.dict(mine.__opts__, opts):
+            with patch.object(mine, '_mine_get', _mine_get):
+                self.assertEqual(mine.get('*', 'test.ping'), {'minion1': True})
+                self.assertEqual(loads[-1]['etag'], '')
+                self.assertEqual(mine.get('*', 'test.ping'), {'minion1': True})
+                self.assertEqual(loads[-1]['etag'], 'tag1')
+                self.assertEqual(mine.get('*', 'test.ping',
+                                          exclude_minion=True), {})
+                master.update({'etag': 'tag2', 'data': {'minion2': True}})
+                self.assertEqual(mine.get('*', 'test.ping'), {'minion2': True})
+                self.assertEqual(loads[-1]['etag'], 'tag1')
+                self.assertEqual(mine.get('*', 'test.ping'), {'minion2': True})
+                self.assertEqual(loads[-1]['etag'], 'tag2')
+                # Another target is cached on its own
+                mine.get('minion*', 'test.ping')
+                self.assertEqual(loads[-1]['etag'], '')
+
+                # A master which does not index the mine ignores the tag
+                def _old_master(load, opts):
+                    return {'minion3': True}
+                with patch.object(mine, '_mine_get', _old_master):
+                    self.assertEqual(mine.get('*', 'test.ping'),
+                                     {'minion3': True})
+
 
 if __name__ == '__main__':
     from integration import run_tests
@@ -46,7 +46,7 @@ class MockState(object):
         flag = None
 
         def __init__(self, opts, pillar=False, pillar_enc=None):
-            pass
+            self.profile = MagicMock(enabled=False)
 
         def verify_data(self, data):
             '''
@@ -150,6 +150,21 @@ class StatusTestCase(TestCase):
             with patch.dict(status.__salt__, {'cmd.run': exc_mock}):
                 status.uptime()
 
+    def test_minion_stats(self):
+        '''
+        Test modules.status.minion_stats reading the counters of the minion
+        '''
+        stats = {'jid_queue': {'seen': 3, 'duplicates': 1}}
+        eventer = MagicMock()
+        eventer.get_event.return_value = {'complete': True, 'stats': stats}
+        fire = MagicMock(return_value=True)
+        with patch.dict(status.__salt__, {'event.fire': fire}):
+            with patch('salt.utils.event.get_event', MagicMock(return_value=eventer)):
+                self.assertEqual(status.minion_stats(), stats)
+                fire.assert_called_once_with({}, 'minion_stats')
+                eventer.get_event.return_value = None
+                self.assertRaises(CommandExecutionError, status.minion_stats)
+
 
 if __name__ == '__main__':
     from integration import run_tests
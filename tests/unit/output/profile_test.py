@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+'''
+unittests for profile outputter
+'''
+
+# Import Python Libs
+from __future__ import absolute_import
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt Libs
+from salt.output import profile
+
+
+class ProfileTestCase(TestCase):
+    '''
+    Test cases for salt.output.profile
+    '''
+    def setUp(self):
+        profile.__opts__ = {'color': False, 'state_profile_top': 1}
+        self.data = {
+            'total': 3.0,
+            'phases': {'render': 1.0, 'call': 1.5},
+            'sls': {'web': {'total': 2.5, 'render': 1.0, 'call': 1.5},
+                    'users': {'total': 0.5, 'render': 0.5}},
+            'states': {
+                'pkg_|-nginx_|-nginx_|-installed': {
+                    'id': 'nginx', 'function': 'pkg.installed',
+                    'sls': 'web', 'total': 1.2, 'call': 1.2},
+                'file_|-conf_|-/etc/conf_|-managed': {
+                    'id': 'conf', 'function': 'file.managed',
+                    'sls': 'web', 'total': 0.3, 'call': 0.3}}}
+
+    def test_hotspots(self):
+        sls, states = profile.hotspots(self.data, 1)
+        self.assertEqual([name for name, _ in sls], ['web'])
+        self.assertEqual([entry['id'] for _, entry in states], ['nginx'])
+
+    def test_output(self):
+        ret = profile.output({'minion': {'__profile__': self.data}})
+        self.assertIn('Profile for minion', ret)
+        self.assertIn('render: 1.000 s', ret)
+        self.assertIn('2.500 s  web  (render 1.000 s, call 1.500 s)', ret)
+        self.assertIn('1.200 s  nginx  (pkg.installed, web)', ret)
+        self.assertNotIn('users', ret)
+        self.assertNotIn('conf', ret)
+
+    def test_output_without_profile(self):
+        self.assertEqual(profile.output({'minion': {'ret': True}}), '')
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(ProfileTestCase, needs_daemon=False)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+'''
+Test the outputters which write to a stream as they render
+'''
+
+# Import Python Libs
+from __future__ import absolute_import
+import copy
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.mock import patch
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt Libs
+import salt.config
+import salt.loader
+import salt.output
+from salt.output import highstate
+from salt.output import nested
+from salt.ext.six.moves import StringIO
+
+STATE_RET = {
+    'minion1': {
+        'file_|-motd_|-/etc/motd_|-managed': {
+            'result': True, 'comment': 'File is in the correct state',
+            'name': '/etc/motd', 'changes': {}, '__run_num__': 0,
+            'start_time': '10:00:00.000000', 'duration': 1.5,
+            '__id__': 'motd'}}}
+
+
+class StreamOutputTestCase(TestCase):
+    def setUp(self):
+        self.opts = {'color': False, 'state_verbose': True,
+                     'state_output': 'full', 'strip_colors': True}
+        nested.__opts__ = self.opts
+        highstate.__opts__ = self.opts
+
+    def test_nested(self):
+        data = {'minion1': {'list': [1, 'two', {'three': None}],
+                            'text': 'multi\nline'}}
+        stream = StringIO()
+        nested.output_stream(data, stream)
+        self.assertEqual(stream.getvalue(), nested.output(data) + '\n')
+
+    def test_highstate(self):
+        stream = StringIO()
+        highstate.output_stream(copy.deepcopy(STATE_RET), stream)
+        self.assertEqual(
+            stream.getvalue(),
+            highstate.output(copy.deepcopy(STATE_RET)) + '\n')
+        self.assertIn('Succeeded: 1', stream.getvalue())
+
+
+class DisplayOutputTestCase(TestCase):
+    def setUp(self):
+        self.opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+        self.opts['color'] = False
+
+    def _display(self, data, out):
+        stdout = StringIO()
+        with patch('sys.stdout', stdout):
+            salt.output.display_output(data, out, self.opts)
+        return stdout.getvalue()
+
+    def test_stream_printer(self):
+        data = {'minion1': {'foo': 'bar'}}
+        self.assertEqual(self._display(data, 'nested'),
+                         'minion1:\n    ----------\n    foo:\n        bar\n')
+
+    def test_printer(self):
+        data = {'minion1': True}
+        self.opts['output_indent'] = None
+        self.assertEqual(self._display(data, 'json'),
+                         '{"minion1": true}\n')
+
+    def test_fallback(self):
+        # The highstate outputter can not render this, nested does
+        self.assertEqual(self._display(['foo'], 'highstate'), '- foo\n')
+
+    def test_no_fallback_once_written(self):
+        def _printer(data, stream, **kwargs):
+            stream.write('minion1:\n')
+            raise KeyError('foo')
+        with patch('salt.output.get_stream_printer', return_value=_printer):
+            self.assertEqual(self._display({'minion1': {}}, 'nested'),
+                             'minion1:\n')
+
+    def test_output_streams(self):
+        streams = salt.loader.output_streams(self.opts)
+        self.assertIs(streams.get('json'), None)
+        self.assertTrue(callable(streams['nested']))
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(StreamOutputTestCase, DisplayOutputTestCase, needs_daemon=False)
@@ -26,6 +26,7 @@ ensure_in_syspath('../../')
 
 # Import Salt libs
 import salt.utils
+import salt.utils.jid
 from salt.returners import local_cache
 
 TMP_CACHE_DIR = '/tmp/salt_test_job_cache/'
@@ -163,6 +164,76 @@ class LocalCacheCleanOldJobsTestCase(TestCase):
         return temp_dir, jid_file_path
 
 
+class LocalCacheJobIndexTestCase(TestCase):
+    '''
+    Tests for the job index of local_cache
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.opts = {'cachedir': self.tmpdir, 'hash_type': 'sha256',
+                     'keep_jobs': 24}
+        self.patcher = patch.dict(local_cache.__opts__, self.opts)
+        self.patcher.start()
+        self._save('20161017100000000001', 'test.ping', 'web*', 'root')
+        self._save('20161017110000000002', 'state.highstate', 'web1', 'root')
+        self._save('20161017120000000003', 'state.highstate', 'db1', 'alice')
+        self._save('20161017130000000004', 'saltutil.find_job', 'db1', 'root')
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def _save(self, jid, fun, tgt, user):
+        local_cache.save_load(
+            jid, {'jid': jid, 'fun': fun, 'arg': [], 'tgt': tgt,
+                  'tgt_type': 'glob', 'user': user},
+            minions=[])
+
+    def _jids(self, **kwargs):
+        return [job['JID'] for job in local_cache.get_jids_query(**kwargs)]
+
+    def test_query(self):
+        self.assertEqual(
+            self._jids(),
+            ['20161017130000000004', '20161017120000000003',
+             '20161017110000000002', '20161017100000000001'])
+        self.assertEqual(
+            self._jids(search_function='state.*', search_target='web*'),
+            ['20161017110000000002'])
+        self.assertEqual(self._jids(search_user='alice'),
+                         ['20161017120000000003'])
+        self.assertEqual(
+            self._jids(start_jid='20161017110000000000',
+                       end_jid='20161017120000000003'),
+            ['20161017120000000003', '20161017110000000002'])
+        job = local_cache.get_jids_query(count=1, offset=1)
+        self.assertEqual(job, [{
+            'JID': '20161017120000000003',
+            'Function': 'state.highstate',
+            'Arguments': [],
+            'Target': 'db1',
+            'Target-type': 'glob',
+            'User': 'alice',
+            'StartTime': '2016, Oct 17 12:00:00.000003'}])
+
+    def test_get_jids_filter(self):
+        jobs = local_cache.get_jids_filter(2)
+        self.assertEqual([job['JID'] for job in jobs],
+                         ['20161017110000000002', '20161017120000000003'])
+
+    def test_build_index(self):
+        shutil.rmtree(os.path.join(self.tmpdir, 'jobs_index'))
+        self.assertEqual(len(self._jids()), 4)
+        self._save('20161017140000000005', 'test.ping', 'web*', 'root')
+        self.assertEqual(len(self._jids()), 5)
+
+    def test_clean_old_index(self):
+        self._save(salt.utils.jid.gen_jid(), 'test.ping', 'web*', 'root')
+        local_cache.clean_old_jobs()
+        self.assertEqual(len(self._jids()), 1)
+
+
 if __name__ == '__main__':
     from integration import run_tests
-    run_tests(LocalCacheCleanOldJobsTestCase, needs_daemon=False)
+    run_tests(LocalCacheCleanOldJobsTestCase, LocalCacheJobIndexTestCase,
+              needs_daemon=False)
@@ -12,6 +12,7 @@ from salttesting.helpers import ensure_in_syspath
 from salttesting.mock import (
     NO_MOCK,
     NO_MOCK_REASON,
+    MagicMock,
     patch
 )
 
@@ -81,6 +82,56 @@ class JobsTest(TestCase):
             self.assertEqual(jobs.list_jobs(search_target='non-existant'),
                              returns['non-existant'])
 
+    def test_list_jobs_pagination(self):
+        '''
+        test jobs.list_jobs runner with count and offset args
+        '''
+        mock_jobs_cache = dict(
+            ('2016052403550{0}000000'.format(idx),
+             {'Function': 'test.ping', 'Target': '*', 'User': 'root'})
+            for idx in range(5))
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.get_jids': lambda: mock_jobs_cache}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(
+                sorted(jobs.list_jobs(count=2, offset=1)),
+                ['20160524035502000000', '20160524035503000000'])
+            if jobs.DATEUTIL_SUPPORT:
+                self.assertEqual(
+                    sorted(jobs.list_jobs(end_time='2016-05-24 03:55:01')),
+                    ['20160524035500000000', '20160524035501000000'])
+
+    def test_list_jobs_query(self):
+        '''
+        test jobs.list_jobs runner with a returner filtering the jobs
+        '''
+        query = MagicMock(return_value=[
+            {'JID': '20160524035524895387', 'Function': 'test.ping'}])
+
+        class MockMasterMinion(object):
+
+            returners = {'local_cache.get_jids': MagicMock(),
+                         'local_cache.get_jids_query': query}
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+        with patch.object(salt.minion, 'MasterMinion', MockMasterMinion):
+            self.assertEqual(
+                jobs.list_jobs(search_function='test.*', count=10),
+                {'20160524035524895387': {'Function': 'test.ping'}})
+        self.assertFalse(MockMasterMinion.returners['local_cache.get_jids'].called)
+        query.assert_called_once_with(
+            search_metadata=None, search_function='test.*',
+            search_target=None, search_user=None, start_jid=None,
+            end_jid=None, count=10, offset=0)
+
 
 if __name__ == '__main__':
     from integration import run_tests
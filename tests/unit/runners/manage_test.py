@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+'''
+unit tests for the manage runner
+'''
+
+# Import Python Libs
+from __future__ import absolute_import
+import shutil
+import tempfile
+
+# Import Salt Testing Libs
+from salttesting import skipIf, TestCase
+from salttesting.helpers import ensure_in_syspath
+from salttesting.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    MagicMock,
+    patch
+)
+
+ensure_in_syspath('../../')
+
+# Import Salt Libs
+from salt.runners import manage
+import salt.utils.presence
+
+manage.__opts__ = {}
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ManagePresenceTestCase(TestCase):
+    '''
+    Validate the manage runner with the presence table
+    '''
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.opts = {'cachedir': self.tmpdir, 'pki_dir': self.tmpdir,
+                     'presence_table': True, 'presence_timeout': 60,
+                     'timeout': 5}
+        table = salt.utils.presence.PresenceTable(self.opts)
+        table.seen('minion1')
+        table.connected('minion2')
+        table.lost('minion3')
+        ckminions = MagicMock()
+        ckminions.return_value.check_minions.return_value = [
+            'minion1', 'minion2', 'minion3', 'minion4']
+        self.patches = [patch.dict(manage.__opts__, self.opts),
+                        patch('salt.utils.minions.CkMinions', ckminions),
+                        patch('salt.runners.manage._ping',
+                              MagicMock(return_value=([], ['minion3', 'minion4']))),
+                        patch('salt.runners.manage.list_state',
+                              MagicMock(return_value=[]))]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_status(self):
+        self.assertEqual(manage.status(),
+                         {'up': ['minion1', 'minion2'],
+                          'down': ['minion3', 'minion4']})
+        self.assertEqual(manage.up(), ['minion1', 'minion2'])
+        self.assertEqual(manage.down(), ['minion3', 'minion4'])
+        # Only the minions the table does not show as present are pinged
+        manage._ping.assert_called_with(['minion3', 'minion4'], 'list',
+                                        manage.__opts__['timeout'])
+        self.assertEqual(manage.present(), ['minion1', 'minion2'])
+        self.assertEqual(manage.not_present(), ['minion3', 'minion4'])
+
+    def test_status_idle_minion(self):
+        # minion4 was idle for longer than presence_timeout
+        manage._ping.return_value = (['minion4'], ['minion3'])
+        manage.list_state.return_value = ['minion4']
+        wheel = MagicMock()
+        with patch('salt.wheel.Wheel', wheel):
+            self.assertEqual(manage.down(removekeys=True), ['minion3'])
+        wheel.return_value.call_func.assert_called_once_with(
+            'key.delete', match='minion3')
+        self.assertEqual(manage.present(), ['minion1', 'minion2', 'minion4'])
+        self.assertEqual(manage.not_present(), ['minion3'])
+
+    def test_last_seen(self):
+        ret = manage.last_seen()
+        self.assertIsNone(ret['minion4'])
+        self.assertEqual(ret['minion3']['state'], 'lost')
+        self.assertTrue(ret['minion2']['present'])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(ManagePresenceTestCase, needs_daemon=False)
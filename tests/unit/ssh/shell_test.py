@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+'''
+Test the commands and the scheduling of salt-ssh
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from salttesting import TestCase, skipIf
+from salttesting.mock import patch, NO_MOCK, NO_MOCK_REASON
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt libs
+import salt.client.ssh
+from salt.client.ssh import shell
+
+
+class ShellTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.opts = {'cachedir': self.tmpdir,
+                     '_ssh_version': (7, 2)}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _shell(self, **kwargs):
+        return shell.Shell(self.opts, 'host1', user='root', port='22',
+                           priv='/tmp/key', timeout=60, **kwargs)
+
+    def test_no_control_master(self):
+        cmd = self._shell()._cmd_str('true')
+        self.assertNotIn('ControlPath', cmd)
+
+    def test_control_master(self):
+        self.opts['ssh_control_persist'] = 300
+        ssh_shell = self._shell()
+        path = ssh_shell.control_path()
+        self.assertEqual(os.path.dirname(path),
+                         os.path.join(self.tmpdir, 'ssh_control'))
+        for ssh in ('ssh', 'scp'):
+            cmd = ssh_shell._cmd_str('true', ssh=ssh)
+            self.assertIn('-o ControlMaster=auto ', cmd)
+            self.assertIn('-o ControlPath={0} '.format(path), cmd)
+            self.assertIn('-o ControlPersist=300 ', cmd)
+        self.assertTrue(os.path.isdir(os.path.dirname(path)))
+        # The same target always gets the same socket
+        self.assertEqual(self._shell().control_path(), path)
+        self.assertNotEqual(
+            shell.Shell(self.opts, 'host2', user='root', port='22').control_path(),
+            path)
+
+    def test_control_master_old_ssh(self):
+        self.opts['ssh_control_persist'] = 300
+        self.opts['_ssh_version'] = (5, 3)
+        self.assertNotIn('ControlPath', self._shell()._cmd_str('true'))
+
+
+def _routine(self, que, opts, host, target, mine=False):
+    if host != 'dead':
+        que.put({'id': host, 'ret': True})
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class HandleSSHTestCase(TestCase):
+    def test_handle_ssh(self):
+        ssh = salt.client.ssh.SSH.__new__(salt.client.ssh.SSH)
+        ssh.opts = {'ssh_max_procs': 2}
+        ssh.defaults = {}
+        ssh.targets = dict((host, {}) for host in ('host1', 'host2', 'host3', 'dead'))
+        with patch.object(salt.client.ssh.SSH, 'handle_routine', _routine):
+            rets = list(ssh.handle_ssh())
+        self.assertEqual(len(rets), 4)
+        self.assertEqual(dict((host, True) for host in ('host1', 'host2', 'host3')),
+                         dict(next(iter(ret.items())) for ret in rets
+                              if 'dead' not in ret))
+        self.assertIn('did not return any data',
+                      [ret['dead'] for ret in rets if 'dead' in ret][0])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(ShellTestCase, HandleSSHTestCase, needs_daemon=False)
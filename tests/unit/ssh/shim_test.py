@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+'''
+Test the deployment of salt thin by the salt-ssh shim
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+
+# Import Salt Testing libs
+from salttesting import TestCase, skipIf
+from salttesting.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt libs
+import salt.utils
+import salt.client.ssh.ssh_py_shim
+from salt.ext.six.moves import StringIO  # pylint: disable=import-error
+
+# salt.client.ssh has a ssh_py_shim attribute of its own
+ssh_py_shim = sys.modules['salt.client.ssh.ssh_py_shim']
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class NeedChunksTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.chunks = [self._chunk('version', '2016.11.0'),
+                       self._chunk('py2/salt/__init__.py', 'salt')]
+        ssh_py_shim.OPTIONS = ssh_py_shim.OBJ()
+        ssh_py_shim.OPTIONS.saltdir = os.path.join(self.tmpdir, 'thin')
+        ssh_py_shim.OPTIONS.delimiter = 'RSTR'
+        ssh_py_shim.OPTIONS.hashfunc = 'sha1'
+        ssh_py_shim.OPTIONS.chunks = [chunk for chunk, _ in self.chunks]
+        ssh_py_shim.CHUNKS_UNPACKED = False
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        ssh_py_shim.OPTIONS = None
+
+    def _chunk(self, name, content):
+        '''
+        Write a chunk with one file, return its checksum and its path
+        '''
+        src = os.path.join(self.tmpdir, 'src')
+        with salt.utils.fopen(src, 'w') as fp_:
+            fp_.write(content)
+        path = os.path.join(self.tmpdir, 'chunk.tgz')
+        tfp = tarfile.open(path, 'w:gz')
+        tfp.add(src, arcname=name)
+        tfp.close()
+        chunk = salt.utils.get_hash(path, 'sha1')
+        os.rename(path, os.path.join(self.tmpdir, chunk))
+        return chunk, os.path.join(self.tmpdir, chunk)
+
+    def _need_chunks(self):
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            with patch.object(ssh_py_shim, 'main', MagicMock(return_value=0)) as main:
+                with self.assertRaises(SystemExit) as exc:
+                    ssh_py_shim.need_chunks()
+        return exc.exception.code, stdout.getvalue(), main.called
+
+    def test_missing_chunks(self):
+        code, stdout, ran = self._need_chunks()
+        self.assertEqual(code, ssh_py_shim.EX_THIN_DEPLOY)
+        self.assertEqual(stdout, 'RSTR\nchunks {0} {1}\n'.format(*ssh_py_shim.OPTIONS.chunks))
+        self.assertFalse(ran)
+        self.assertEqual(os.stat(ssh_py_shim.chunks_dir()).st_mode & 0o777, 0o700)
+
+        # Only the chunks which are still missing are asked for
+        chunk, path = self.chunks[0]
+        shutil.copy(path, os.path.join(ssh_py_shim.chunks_dir(), chunk + '.tgz'))
+        code, stdout, ran = self._need_chunks()
+        self.assertEqual(stdout, 'RSTR\nchunks {0}\n'.format(self.chunks[1][0]))
+
+    def test_sudo_keeps_chunks(self):
+        cdir = ssh_py_shim.chunks_dir()
+        os.makedirs(cdir, 0o770)
+        os.chmod(cdir, 0o770)
+        chunk, path = self.chunks[0]
+        shutil.copy(path, os.path.join(cdir, chunk + '.tgz'))
+        # prep_dir gives the group of the super user access to the directory
+        with patch.dict(os.environ, {'SUDO_GID': str(os.getegid())}):
+            code, stdout, ran = self._need_chunks()
+        self.assertEqual(stdout, 'RSTR\nchunks {0}\n'.format(self.chunks[1][0]))
+
+        # Without SUDOing the group must not have access
+        code, stdout, ran = self._need_chunks()
+        self.assertEqual(stdout, 'RSTR\nchunks {0} {1}\n'.format(*ssh_py_shim.OPTIONS.chunks))
+
+    def test_unpack_chunks(self):
+        os.makedirs(ssh_py_shim.chunks_dir(), 0o700)
+        for chunk, path in self.chunks:
+            shutil.copy(path, os.path.join(ssh_py_shim.chunks_dir(), chunk + '.tgz'))
+        stale = os.path.join(ssh_py_shim.chunks_dir(), 'stale.tgz')
+        with salt.utils.fopen(stale, 'w'):
+            pass
+        code, stdout, ran = self._need_chunks()
+        self.assertEqual(code, 0)
+        self.assertEqual(stdout, '')
+        self.assertTrue(ran)
+        self.assertTrue(ssh_py_shim.CHUNKS_UNPACKED)
+        with salt.utils.fopen(os.path.join(ssh_py_shim.OPTIONS.saltdir, 'version')) as fp_:
+            self.assertEqual(fp_.read(), '2016.11.0')
+        self.assertTrue(os.path.isfile(
+            os.path.join(ssh_py_shim.OPTIONS.saltdir, 'py2', 'salt', '__init__.py')))
+        self.assertFalse(os.path.exists(stale))
+
+        # The thin built from the chunks was not good enough, get them again
+        code, stdout, ran = self._need_chunks()
+        self.assertEqual(stdout, 'RSTR\nchunks {0} {1}\n'.format(*ssh_py_shim.OPTIONS.chunks))
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(NeedChunksTestCase, needs_daemon=False)
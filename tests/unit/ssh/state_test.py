@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+'''
+Test the state tarballs of salt-ssh
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import stat
+import tarfile
+import tempfile
+from contextlib import closing
+
+# Import Salt Testing libs
+from salttesting import TestCase, skipIf
+from salttesting.mock import MagicMock, patch, NO_MOCK, NO_MOCK_REASON
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt libs
+import salt.utils
+import salt.utils.files
+from salt.client.ssh import state
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PrepTransTarTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, 'motd')
+        with salt.utils.fopen(self.src, 'w') as fp_:
+            fp_.write('hello')
+        self.file_client = MagicMock()
+        self.file_client.opts = {'cachedir': self.tmpdir}
+        self.file_client.cache_file.side_effect = \
+            lambda name, *args, **kwargs: self.src if name.endswith('motd') else ''
+        self.file_client.cache_dir.return_value = []
+        self.tar_cache = os.path.join(self.tmpdir, 'salt-ssh', 'trans_tar')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _prep(self, id_, chunks=None):
+        file_refs = {'base': [['salt://motd']]}
+        trans_tar = state.prep_trans_tar(
+            self.file_client, chunks or [{'state': 'file'}], file_refs,
+            {'role': 'web'}, id_)
+        self.addCleanup(salt.utils.safe_rm, trans_tar)
+        return trans_tar
+
+    def test_reuse(self):
+        first = self._prep('host1')
+        second = self._prep('host2')
+        self.assertNotEqual(first, second)
+        self.assertEqual(salt.utils.get_hash(first), salt.utils.get_hash(second))
+        self.assertEqual(len(os.listdir(self.tar_cache)), 1)
+        with closing(tarfile.open(second)) as tfp:
+            self.assertEqual(
+                sorted(tfp.getnames()),
+                ['base/motd', 'lowstate.json', 'pillar.json'])
+        # The callers remove their tarball, the cached one stays
+        os.remove(first)
+        self.assertEqual(len(os.listdir(self.tar_cache)), 1)
+
+    def test_changed_content(self):
+        first = self._prep('host1')
+        with salt.utils.fopen(self.src, 'w') as fp_:
+            fp_.write('changed')
+        second = self._prep('host2')
+        self.assertNotEqual(salt.utils.get_hash(first), salt.utils.get_hash(second))
+        third = self._prep('host3', chunks=[{'state': 'pkg'}])
+        self.assertNotEqual(salt.utils.get_hash(second), salt.utils.get_hash(third))
+        self.assertEqual(len(os.listdir(self.tar_cache)), 3)
+
+    def test_expire(self):
+        self._prep('host1')
+        old = os.path.join(self.tar_cache, os.listdir(self.tar_cache)[0])
+        os.utime(old, (1, 1))
+        self._prep('host2', chunks=[{'state': 'pkg'}])
+        self.assertEqual(len(os.listdir(self.tar_cache)), 1)
+        self.assertFalse(os.path.exists(old))
+
+    def test_private(self):
+        first = self._prep('host1')
+        second = self._prep('host2')
+        cached = os.path.join(self.tar_cache, os.listdir(self.tar_cache)[0])
+        for path in (first, second, cached):
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_reuse_failed(self):
+        self._prep('host1')
+        trans_tar = salt.utils.files.mkstemp()
+        self.addCleanup(salt.utils.safe_rm, trans_tar)
+        cached = os.path.join(self.tar_cache, os.listdir(self.tar_cache)[0])
+        with patch('os.link', MagicMock(side_effect=OSError)), \
+                patch('shutil.copyfile', MagicMock(side_effect=IOError)):
+            self.assertFalse(state._reuse_trans_tar(cached, trans_tar))
+        # The private file of the caller is still there, and nothing else
+        self.assertEqual(stat.S_IMODE(os.stat(trans_tar).st_mode), 0o600)
+        self.assertEqual(
+            [name for name in os.listdir(os.path.dirname(trans_tar))
+             if name.startswith(os.path.basename(trans_tar))],
+            [os.path.basename(trans_tar)])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(PrepTransTarTestCase, needs_daemon=False)
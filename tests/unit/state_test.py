@@ -21,6 +21,7 @@ ensure_in_syspath('../')
 # Import Salt libs
 import salt.state
 import salt.config
+import salt.utils
 import salt.exceptions
 from salt.utils.odict import OrderedDict, DefaultOrderedDict
 
@@ -136,6 +137,89 @@ class HighStateTestCase(TestCase):
         self.assertEqual(state_usage_dict['base']['used'], ['state.a', 'state.b'])
         self.assertEqual(state_usage_dict['base']['unused'], ['state.c'])
 
+    def _write_sls(self, name, contents):
+        with salt.utils.fopen(os.path.join(self.state_tree_dir, name), 'w') as fp_:
+            fp_.write(contents)
+
+    def test_compiled_highstate_cache(self):
+        self.highstate.opts['state_compile_cache'] = True
+        self._write_sls('top.sls', 'base:\n  match:\n    - one\n')
+        self._write_sls('one.sls', 'one:\n  test.succeed_without_changes\n')
+        first = self.highstate.call_highstate()
+        self.assertEqual(len(first), 1)
+        self.assertTrue(os.path.isfile(os.path.join(
+            self.cache_dir, 'highstate.compiled.cache.p')))
+
+        # An unchanged state tree is not rendered again
+        with patch.object(self.highstate, 'render_highstate',
+                          side_effect=AssertionError('rendered')):
+            second = self.highstate.call_highstate()
+        self.assertEqual(list(first), list(second))
+
+        # A changed SLS file invalidates the compiled highstate
+        self._write_sls('one.sls', 'two:\n  test.succeed_without_changes\n')
+        third = self.highstate.call_highstate()
+        self.assertIn('test_|-two_|-two_|-succeed_without_changes', third)
+
+    def test_compiled_highstate_cache_pillar_change(self):
+        self.highstate.opts['state_compile_cache'] = True
+        self._write_sls('top.sls', 'base:\n  match:\n    - one\n')
+        self._write_sls('one.sls', 'one:\n  test.succeed_without_changes\n')
+        self.highstate.call_highstate()
+        self.assertIsNotNone(self.highstate.load_compiled_chunks('highstate'))
+        self.highstate.state.opts['pillar'] = {'changed': True}
+        self.assertIsNone(self.highstate.load_compiled_chunks('highstate'))
+
+    def test_pkg_snapshot_dropped_on_changes(self):
+        state = self.highstate.state
+        low = {'state': 'cmd', 'fun': 'run', 'name': 'yum -y install vim'}
+        state.states_con['pkg.snapshot'] = {}
+        state.check_refresh(low, {'changes': {}})
+        self.assertIn('pkg.snapshot', state.states_con)
+        # A state which changed something may have changed the packages
+        state.check_refresh(low, {'changes': {'retcode': 0}})
+        self.assertNotIn('pkg.snapshot', state.states_con)
+
+    def test_profile_disabled(self):
+        self._write_sls('top.sls', 'base:\n  match:\n    - one\n')
+        self._write_sls('one.sls', 'one:\n  test.succeed_without_changes\n')
+        self.highstate.call_highstate()
+        profile = self.highstate.state.profile.data()
+        self.assertEqual(profile['phases'], {})
+        self.assertEqual(profile['states'], {})
+
+    def test_profile(self):
+        highstate = salt.state.HighState(self.config, profile=True)
+        self._write_sls('top.sls', 'base:\n  match:\n    - one\n')
+        self._write_sls('one.sls', 'one:\n  test.succeed_without_changes\n')
+        highstate.call_highstate()
+        profile = highstate.state.profile.data()
+        for phase in ('pillar', 'load_modules', 'render_top', 'render',
+                      'compile', 'requisites', 'call'):
+            self.assertIn(phase, profile['phases'])
+        self.assertIn('render', profile['sls']['one'])
+        self.assertIn('call', profile['sls']['one'])
+        state = profile['states']['test_|-one_|-one_|-succeed_without_changes']
+        self.assertEqual(state['id'], 'one')
+        self.assertEqual(state['function'], 'test.succeed_without_changes')
+        self.assertEqual(state['sls'], 'one')
+        self.assertGreaterEqual(profile['total'], state['total'])
+
+    def test_profile_file_transfer(self):
+        highstate = salt.state.HighState(self.config, profile=True)
+        dest = os.path.join(self.root_dir, 'managed.txt')
+        self._write_sls('top.sls', 'base:\n  match:\n    - one\n')
+        self._write_sls('one.sls', '{0}:\n  file.managed:\n'
+                                   '    - source: salt://managed.txt\n'.format(dest))
+        self._write_sls('managed.txt', 'managed\n')
+        highstate.call_highstate()
+        profile = highstate.state.profile.data()
+        # The transfer of the source of the file is timed
+        state = profile['states']['file_|-{0}_|-{0}_|-managed'.format(dest)]
+        self.assertIn('file_transfer', state)
+        self.assertGreaterEqual(state['call'], state['file_transfer'])
+        self.assertIn('file_transfer', profile['phases'])
+
 
 class TopFileMergeTestCase(TestCase):
     '''
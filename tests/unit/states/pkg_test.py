@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+'''
+Test the package database snapshot and the aggregation of the pkg states
+'''
+# Import Python libs
+from __future__ import absolute_import
+
+# Import Salt Testing Libs
+from salttesting import skipIf, TestCase
+from salttesting.mock import (
+    NO_MOCK,
+    NO_MOCK_REASON,
+    MagicMock,
+    patch)
+
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+# Import Salt Libs
+import salt.utils
+from salt.states import pkg
+
+pkg.__salt__ = {}
+pkg.__opts__ = {}
+pkg.__context__ = {}
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class PkgSnapshotTestCase(TestCase):
+    '''
+    Test cases for the package database snapshot of salt.states.pkg
+    '''
+    def setUp(self):
+        pkg.__context__.clear()
+
+    def test_list_pkgs_without_snapshot(self):
+        mock = MagicMock(return_value={'vim': ['7.4']})
+        with patch.dict(pkg.__opts__, {'state_pkg_snapshot': False}):
+            with patch.dict(pkg.__salt__, {'pkg.list_pkgs': mock}):
+                pkg._list_pkgs(versions_as_list=True)
+                pkg._list_pkgs(versions_as_list=True)
+        self.assertEqual(mock.call_count, 2)
+        self.assertEqual(pkg.__context__, {})
+
+    def test_list_pkgs_snapshot(self):
+        mock = MagicMock(return_value={'vim': ['7.4']})
+        with patch.dict(pkg.__opts__, {'state_pkg_snapshot': True}):
+            with patch.dict(pkg.__salt__, {'pkg.list_pkgs': mock}):
+                self.assertEqual(
+                    pkg._list_pkgs(versions_as_list=True, __id__='one'),
+                    {'vim': ['7.4']})
+                pkg._list_pkgs(versions_as_list=True, __id__='two')
+                self.assertEqual(mock.call_count, 1)
+                # Different arguments get their own entry
+                pkg._list_pkgs(purge_desired=True)
+                self.assertEqual(mock.call_count, 2)
+                # The state system drops the snapshot after a change
+                pkg.__context__.pop('pkg.snapshot')
+                pkg._list_pkgs(versions_as_list=True)
+                self.assertEqual(mock.call_count, 3)
+
+    def test_latest_version_snapshot(self):
+        mock = MagicMock(side_effect=[{'vim': '8.0', 'git': '2.1'}, '1.10'])
+        with patch.dict(pkg.__opts__, {'state_pkg_snapshot': True}):
+            with patch.dict(pkg.__salt__, {'pkg.latest_version': mock}):
+                self.assertEqual(
+                    pkg._latest_version('vim', 'git', fromrepo=None),
+                    {'vim': '8.0', 'git': '2.1'})
+                self.assertEqual(
+                    pkg._latest_version('vim', fromrepo=None, refresh=False),
+                    '8.0')
+                self.assertEqual(
+                    pkg._latest_version('vim', 'nginx', fromrepo=None),
+                    {'vim': '8.0', 'nginx': '1.10'})
+        mock.assert_called_with('nginx', fromrepo=None)
+
+    def test_latest_version_refresh(self):
+        mock = MagicMock(return_value='8.0')
+        with patch.dict(pkg.__opts__, {'state_pkg_snapshot': True}):
+            with patch.dict(pkg.__salt__, {'pkg.latest_version': mock}):
+                pkg._latest_version('vim', refresh=False)
+                pkg._latest_version('vim', refresh=True)
+        self.assertEqual(mock.call_count, 2)
+
+
+class PkgAggregateTestCase(TestCase):
+    '''
+    Test cases for salt.states.pkg.mod_aggregate
+    '''
+    def _chunk(self, name, **kwargs):
+        chunk = {'state': 'pkg', 'fun': 'installed', 'name': name,
+                 '__id__': name}
+        chunk.update(kwargs)
+        return chunk
+
+    def test_mod_aggregate(self):
+        low = self._chunk('vim')
+        chunks = [low,
+                  self._chunk('nginx', version='1.10'),
+                  self._chunk('git', fromrepo='backports'),
+                  self._chunk('local', sources=[{'local': '/tmp/local.rpm'}]),
+                  self._chunk('tmux', fun='removed')]
+        low = pkg.mod_aggregate(low, chunks, {})
+        self.assertEqual(low['pkgs'], ['vim', {'nginx': '1.10'}])
+        self.assertTrue(chunks[1]['__agg__'])
+        self.assertNotIn('__agg__', chunks[2])
+        self.assertNotIn('__agg__', chunks[3])
+
+    def test_mod_aggregate_sources(self):
+        low = self._chunk('local', sources=[{'local': '/tmp/local.rpm'}])
+        chunks = [low, self._chunk('vim')]
+        low = pkg.mod_aggregate(low, chunks, {})
+        self.assertNotIn('pkgs', low)
+        self.assertNotIn('__agg__', chunks[1])
+
+    def test_mod_aggregate_requisites(self):
+        repo = {'state': 'pkgrepo', 'fun': 'managed', 'name': 'backports',
+                '__id__': 'backports'}
+        low = self._chunk('vim')
+        chunks = [low,
+                  repo,
+                  self._chunk('git', require=[{'pkgrepo': 'backports'}]),
+                  self._chunk('tmux', watch=[{'file': '/etc/tmux.conf'}])]
+        low = pkg.mod_aggregate(low, chunks, {})
+        # git is installed after the repository it requires
+        self.assertEqual(low['pkgs'], ['vim'])
+        self.assertNotIn('__agg__', chunks[2])
+        self.assertNotIn('__agg__', chunks[3])
+        # Once the repository is there it can be merged
+        low = self._chunk('vim')
+        chunks[0] = low
+        running = {salt.utils.gen_state_tag(repo): {'result': True}}
+        low = pkg.mod_aggregate(low, chunks, running)
+        self.assertEqual(low['pkgs'], ['vim', 'git'])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(PkgSnapshotTestCase, PkgAggregateTestCase, needs_daemon=False)
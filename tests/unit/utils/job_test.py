@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Libs
+from salt.utils import job
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+JID = '20161018120000000000'
+
+
+class JobLivenessTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.liveness = job.JobLiveness({'cachedir': self.tmpdir,
+                                         'pki_dir': self.tmpdir})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_heartbeat_tag(self):
+        self.assertEqual(job.heartbeat_tag(JID, 'minion1'),
+                         'salt/job/{0}/alive/minion1'.format(JID))
+
+    def test_heartbeat_minion(self):
+        self.assertEqual(
+            job.heartbeat_minion(job.heartbeat_tag(JID, 'minion1'), JID),
+            'minion1')
+        self.assertIsNone(
+            job.heartbeat_minion(job.heartbeat_tag('1', 'minion1'), JID))
+        self.assertIsNone(
+            job.heartbeat_minion('salt/job/{0}/ret/minion1'.format(JID), JID))
+        self.assertIsNone(job.heartbeat_minion(None, JID))
+
+    def test_beat(self):
+        self.assertEqual(self.liveness.alive(JID, 30), set())
+        self.assertTrue(self.liveness.beat(JID, 'minion1'))
+        self.assertTrue(self.liveness.beat(JID, 'minion2'))
+        self.assertTrue(self.liveness.beat(JID, 'minion2'))
+        self.assertEqual(self.liveness.alive(JID, 30),
+                         set(['minion1', 'minion2']))
+
+    def test_beat_invalid(self):
+        self.assertFalse(self.liveness.beat('../etc', 'minion1'))
+        self.assertFalse(self.liveness.beat(JID, '../../minion1'))
+        self.assertEqual(self.liveness.alive('../etc', 30), set())
+
+    def test_clear(self):
+        self.liveness.beat(JID, 'minion1')
+        self.liveness.beat(JID, 'minion2')
+        self.liveness.clear(JID, 'minion1')
+        self.assertEqual(self.liveness.alive(JID, 30), set(['minion2']))
+        self.liveness.clear(JID, 'minion2')
+        self.liveness.clear(JID, 'minion2')
+        self.assertFalse(os.path.exists(os.path.join(self.liveness.path, JID)))
+
+    def test_old_heartbeats(self):
+        self.liveness.beat(JID, 'minion1')
+        self.liveness.beat(JID, 'minion2')
+        old = time.time() - 60
+        os.utime(os.path.join(self.liveness.path, JID, 'minion1'), (old, old))
+        self.assertEqual(self.liveness.alive(JID, 30), set(['minion2']))
+        self.liveness.clean(30)
+        self.assertEqual(os.listdir(os.path.join(self.liveness.path, JID)),
+                         ['minion2'])
+        os.utime(os.path.join(self.liveness.path, JID, 'minion2'), (old, old))
+        self.liveness.clean(30)
+        self.assertEqual(os.listdir(self.liveness.path), [])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(JobLivenessTestCase, needs_daemon=False)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+import copy
+import shutil
+import tempfile
+
+# Import Salt Libs
+import salt.cache
+import salt.config
+import salt.key
+from salt.utils import mine
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+
+class MineIndexTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.opts = copy.deepcopy(salt.config.DEFAULT_MASTER_OPTS)
+        self.opts.update({'cachedir': self.tmpdir,
+                          'pki_dir': self.tmpdir,
+                          'mine_index': True})
+        self.cache = salt.cache.Cache(self.opts)
+        self.index = mine.MineIndex(self.opts, self.cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _send(self, index, minion, data):
+        # Store the mine data of a minion the way the master does
+        old = self.cache.fetch('minions/{0}'.format(minion), 'mine')
+        self.cache.store('minions/{0}'.format(minion), 'mine', data)
+        index.update(minion, old, data)
+
+    def test_build(self):
+        self.cache.store('minions/minion1', 'mine', {'test.ping': True,
+                                                     'grains.items': {'os': 'A'}})
+        self.cache.store('minions/minion2', 'mine', {'test.ping': True})
+        version, data = self.index.get('test.ping')
+        self.assertEqual(data, {'minion1': True, 'minion2': True})
+        self.assertEqual(self.index.get('grains.items')[1],
+                         {'minion1': {'os': 'A'}})
+        self.assertEqual(self.index.get('network.ip_addrs')[1], {})
+        # Another master worker uses the same index
+        other = mine.MineIndex(self.opts, salt.cache.Cache(self.opts))
+        self.assertEqual(other.get('test.ping'), (version, data))
+
+    def test_update(self):
+        self._send(self.index, 'minion1', {'test.ping': True})
+        version, data = self.index.get('test.ping')
+        self.assertEqual(data, {'minion1': True})
+        other = mine.MineIndex(self.opts, salt.cache.Cache(self.opts))
+        self._send(other, 'minion2', {'test.ping': True, 'test.arg': [1]})
+        new_version, data = self.index.get('test.ping')
+        self.assertNotEqual(new_version, version)
+        self.assertEqual(data, {'minion1': True, 'minion2': True})
+        self.assertEqual(self.index.get('test.arg')[1], {'minion2': [1]})
+        # Sending the same data does not change the index
+        self._send(other, 'minion2', {'test.ping': True, 'test.arg': [1]})
+        self.assertEqual(self.index.get('test.ping')[0], new_version)
+        # Functions the minion stopped sending are removed from the index
+        self._send(other, 'minion2', {'test.ping': True})
+        self.assertEqual(self.index.get('test.arg')[1], {})
+        self.assertEqual(self.index.get('test.ping')[0], new_version)
+        other.update('minion1', {'test.ping': True}, None)
+        self.assertEqual(self.index.get('test.ping')[1], {'minion2': True})
+
+    def test_lookup(self):
+        self._send(self.index, 'minion1', {'test.ping': True})
+        self._send(self.index, 'minion2', {'test.ping': True})
+        self._send(self.index, 'minion3', {'test.ping': False})
+        tag, ret = self.index.lookup('test.ping', ['minion1', 'minion3'])
+        self.assertEqual(ret, {'minion1': True})
+        self.assertEqual(
+            self.index.lookup('test.ping', ['minion3', 'minion1']), (tag, ret))
+        self.assertNotEqual(
+            self.index.lookup('test.ping', ['minion1', 'minion2'])[0], tag)
+        self._send(self.index, 'minion2', {'test.ping': 'pong'})
+        self.assertNotEqual(
+            self.index.lookup('test.ping', ['minion1', 'minion3'])[0], tag)
+
+    def test_rebuild(self):
+        self._send(self.index, 'minion1', {'test.ping': True})
+        tag = self.index.lookup('test.ping', ['minion1'])[0]
+        self.cache.flush(mine.BANK)
+        # The tags handed out before the index was rebuilt do not match
+        self.assertNotEqual(self.index.lookup('test.ping', ['minion1']),
+                            (tag, {'minion1': True}))
+        self.assertEqual(self.index.lookup('test.ping', ['minion1'])[1],
+                         {'minion1': True})
+
+    def test_deleted_key(self):
+        self._send(self.index, 'minion1', {'test.ping': True})
+        self.assertEqual(self.index.get('test.ping')[1], {'minion1': True})
+        # The key of minion1 is gone, its cache is removed
+        salt.key.Key(dict(self.opts, __role='master')).check_minion_cache()
+        self.assertEqual(self.index.get('test.ping')[1], {})
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(MineIndexTestCase, needs_daemon=False)
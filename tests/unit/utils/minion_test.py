@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+
+# Import Salt Libs
+from salt.utils import minion
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+from salttesting.mock import patch
+
+ensure_in_syspath('../../')
+
+
+class JidQueueTestCase(TestCase):
+    def test_add(self):
+        queue = minion.JidQueue(3, ['1', '2'])
+        self.assertTrue(queue.add('3'))
+        self.assertFalse(queue.add('2'))
+        self.assertEqual(queue, ['1', '2', '3'])
+        self.assertEqual((queue.seen, queue.duplicates), (3, 1))
+        self.assertEqual(queue.stats(), {'size': 3, 'queued': 3,
+                                         'seen': 3, 'duplicates': 1})
+
+    def test_eviction(self):
+        queue = minion.JidQueue(2)
+        for jid in ('1', '2', '3'):
+            queue.add(jid)
+        self.assertEqual(queue, ['2', '3'])
+        self.assertNotIn('1', queue)
+        # An evicted jid is accepted again
+        self.assertTrue(queue.add('1'))
+        self.assertEqual(queue, ['3', '1'])
+
+    def test_no_size(self):
+        queue = minion.JidQueue(0)
+        self.assertTrue(queue.add('1'))
+        self.assertTrue(queue.add('1'))
+        self.assertEqual(len(queue), 0)
+
+
+class ReturnSpoolTestCase(TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.spool = minion.ReturnSpool({'cachedir': self.cachedir}, max_size=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir)
+
+    def test_spool(self):
+        self.assertEqual(self.spool.pending(), [])
+        first = self.spool.spool({'jid': '1'})
+        self.spool.spool({'jid': '2'})
+        self.assertEqual(len(self.spool), 2)
+        self.assertEqual(self.spool.read(1), [(first, {'jid': '1'})])
+        self.spool.remove([first])
+        self.assertEqual([load for _, load in self.spool.read()], [{'jid': '2'}])
+
+    def test_full(self):
+        for jid in ('1', '2', '3'):
+            self.spool.spool({'jid': jid})
+        self.assertEqual([load['jid'] for _, load in self.spool.read()],
+                         ['2', '3'])
+
+    def test_unreadable(self):
+        self.spool.spool({'jid': '1'})
+        with open(os.path.join(self.spool.path, '0_0_0.p'), 'wb') as fp_:
+            fp_.write(b'\xc1')
+        self.assertEqual([load for _, load in self.spool.read()], [{'jid': '1'}])
+        self.assertEqual(len(self.spool), 1)
+
+    def test_master_spools(self):
+        spool1 = minion.ReturnSpool({'cachedir': self.cachedir, 'master': 'master1'})
+        spool2 = minion.ReturnSpool({'cachedir': self.cachedir, 'master': 'master2'})
+        self.assertNotEqual(spool1.path, spool2.path)
+        spool1.spool({'jid': '1'})
+        self.assertEqual(len(spool2), 0)
+        self.assertEqual(spool2.read(), [])
+        self.assertEqual(len(minion.ReturnSpool({'cachedir': self.cachedir,
+                                                 'master': 'master1'})), 1)
+
+    def test_count_in_memory(self):
+        self.spool.spool({'jid': '1'})
+        self.spool.spool({'jid': '2'})
+        with patch('os.listdir') as listdir:
+            self.assertEqual(len(self.spool), 2)
+            self.assertFalse(listdir.called)
+        self.spool.remove([name for name, _ in self.spool.read(1)])
+        self.assertEqual(len(self.spool), 1)
+
+    def test_full_other_process(self):
+        self.assertEqual(len(self.spool), 0)
+        # A job process spools returns with its own copy of the spool
+        other = minion.ReturnSpool({'cachedir': self.cachedir}, max_size=2)
+        other.spool({'jid': '1'})
+        other.spool({'jid': '2'})
+        self.spool.spool({'jid': '3'})
+        self.assertEqual([load['jid'] for _, load in self.spool.read()],
+                         ['2', '3'])
+
+
+class EventCoalescerTestCase(TestCase):
+    def test_flush(self):
+        coalescer = minion.EventCoalescer(3)
+        self.assertFalse(coalescer.add([{'tag': 'a'}]))
+        self.assertFalse(coalescer.add([{'tag': 'b'}], 'pre'))
+        self.assertTrue(coalescer.add([{'tag': 'c'}]))
+        self.assertEqual(coalescer.flush(),
+                         [(None, [{'tag': 'a'}, {'tag': 'c'}]),
+                          ('pre', [{'tag': 'b'}])])
+        self.assertEqual(coalescer.stats(),
+                         {'queued': 0, 'sent': 3, 'loads': 2})
+        self.assertEqual(coalescer.flush(), [])
+
+    def test_split(self):
+        coalescer = minion.EventCoalescer(2)
+        coalescer.add([{'tag': str(idx)} for idx in range(5)])
+        self.assertEqual([len(events) for _, events in coalescer.flush()],
+                         [2, 2, 1])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(JidQueueTestCase, ReturnSpoolTestCase, EventCoalescerTestCase,
+              needs_daemon=False)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Libs
+import salt.master
+from salt.utils import presence
+
+# Import Salt Testing Libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+from salttesting.mock import MagicMock
+
+ensure_in_syspath('../../')
+
+
+class PresenceTableTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.table = presence.PresenceTable({'cachedir': self.tmpdir,
+                                             'pki_dir': self.tmpdir})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _age(self, minion, seconds):
+        past = time.time() - seconds
+        os.utime(os.path.join(self.tmpdir, 'presence', minion), (past, past))
+
+    def test_seen(self):
+        self.assertEqual(self.table.present(60), set())
+        self.assertIsNone(self.table.minion_status('minion1', 60))
+        self.assertTrue(self.table.seen('minion1'))
+        self.assertTrue(self.table.seen('minion2'))
+        self.assertTrue(self.table.seen('minion2'))
+        self.assertEqual(self.table.present(60), set(['minion1', 'minion2']))
+        self._age('minion1', 120)
+        self.assertEqual(self.table.present(60), set(['minion2']))
+        status = self.table.minion_status('minion1', 60)
+        self.assertEqual(status['state'], presence.SEEN)
+        self.assertFalse(status['present'])
+        self.assertLess(status['last_seen'], time.time() - 100)
+
+    def test_connected(self):
+        self.table.connected('minion1')
+        # A connected minion does not need to send requests to be present
+        self._age('minion1', 120)
+        self.assertEqual(self.table.present(60), set(['minion1']))
+        # Its requests keep it connected
+        self.table.seen('minion1')
+        self.assertEqual(self.table.minion_status('minion1', 60)['state'],
+                         presence.CONNECTED)
+        self.table.lost('minion1')
+        status = self.table.minion_status('minion1', 60)
+        self.assertEqual(status['state'], presence.LOST)
+        self.assertFalse(status['present'])
+        self.table.connected('minion1')
+        self.assertTrue(self.table.minion_status('minion1', 60)['present'])
+
+    def test_reset_connected(self):
+        self.table.connected('minion1')
+        self.table.seen('minion2')
+        self.table.reset_connected()
+        self.assertEqual(self.table.minion_status('minion1', 60)['state'],
+                         presence.LOST)
+        self.assertEqual(self.table.present(60), set(['minion2']))
+
+    def test_invalid_id(self):
+        self.assertFalse(self.table.seen('../minion1'))
+        self.assertIsNone(self.table.minion_status('../minion1', 60))
+
+    def test_forget(self):
+        self.table.seen('minion1')
+        self.table.seen('minion2')
+        self.table.forget(['minion1', 'minion3'])
+        self.assertEqual(set(self.table.status(60)), set(['minion2']))
+
+
+
+class PresenceEventsTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.maintenance = MagicMock(spec=salt.master.Maintenance)
+        self.maintenance.presence_events = True
+        self.maintenance.ckminions = MagicMock()
+        self.maintenance.event = MagicMock()
+        self.maintenance.opts = {'cachedir': self.tmpdir,
+                                 'pki_dir': self.tmpdir,
+                                 'presence_table': True,
+                                 'presence_timeout': 60}
+        presence.PresenceTable(self.maintenance.opts).seen('minion1')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_idle_connected_minions_present(self):
+        # minion2 stays idle, the table does not see it
+        self.maintenance.ckminions.connected_ids.return_value = set(['minion2'])
+        old_present = set(['minion2'])
+        salt.master.Maintenance.handle_presence(self.maintenance, old_present)
+        self.assertEqual(old_present, set(['minion1', 'minion2']))
+        data = self.maintenance.event.fire_event.call_args_list[0][0][0]
+        self.assertEqual(data, {'new': ['minion1'], 'lost': []})
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(PresenceTableTestCase, PresenceEventsTestCase, needs_daemon=False)
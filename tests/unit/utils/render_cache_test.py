@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+'''
+    tests.unit.utils.render_cache_test
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Test the memoization of template renders
+'''
+
+# Import python libs
+from __future__ import absolute_import
+import copy
+import os
+import shutil
+import tempfile
+import textwrap
+
+# Import Salt Testing libs
+from salttesting import TestCase
+from salttesting.helpers import ensure_in_syspath
+ensure_in_syspath('../../')
+
+# Import salt libs
+import salt.config
+import salt.loader
+import salt.template
+import salt.utils
+import salt.utils.render_cache
+
+# A renderer reading one grain and one pillar key, loaded like the other
+# renderers
+FAKE_RENDERER = textwrap.dedent('''\
+    import threading
+
+    CALLS = []
+
+
+    def render(data, saltenv='base', sls='', **kwargs):
+        CALLS.append(sls)
+        if sls == 'volatile':
+            return {'out': __salt__['cmd.run']('echo')}
+        if sls == 'missing':
+            return {'out': __pillar__.get('absent')}
+        if sls == 'function':
+            return {'out': __salt__['grains.get']('id')}
+        if sls == 'opts':
+            return {'out': __opts__['id']}
+        if sls == 'thread':
+            # Another render reading the grains at the same time
+            seen = []
+            thread = threading.Thread(target=lambda: seen.append(__grains__['os']))
+            thread.start()
+            thread.join()
+            return {'out': '{0}-{1}'.format(seen[0], __pillar__.get('role'))}
+        return {'out': '{0}-{1}'.format(__grains__['os'], __pillar__.get('role'))}
+    ''')
+
+
+class RenderCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with salt.utils.fopen(os.path.join(self.tmpdir, 'fake.py'), 'w') as fp_:
+            fp_.write(FAKE_RENDERER)
+        self.opts = copy.deepcopy(salt.config.DEFAULT_MINION_OPTS)
+        self.opts.update({'id': 'minion1',
+                          'render_cache': True,
+                          'render_cache_renderers': ['fake'],
+                          'render_dirs': [self.tmpdir],
+                          'grains': {'os': 'Debian', 'id': 'minion1'},
+                          'pillar': {'role': 'web', 'unused': 1}})
+        self.grains = self.opts['grains']
+        self.pillar = self.opts['pillar']
+        functions = {'grains.get': lambda key, default='': self.grains.get(key, default),
+                     'cmd.run': lambda cmd: cmd}
+        self.renderers = salt.loader.render(self.opts, functions)
+        self.calls = salt.utils.render_cache.render_globals(
+            self.renderers['fake'])['CALLS']
+        salt.utils.render_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _compile(self, sls='web'):
+        return salt.template.compile_template(
+            ':string:', self.renderers, 'fake', [], [],
+            sls=sls, input_data='#!fake\nfoo: bar')
+
+    def test_identical_inputs_reuse_render(self):
+        self.assertEqual(self._compile(), {'out': 'Debian-web'})
+        self.assertEqual(self._compile(), {'out': 'Debian-web'})
+        self.assertEqual(self.calls, ['web'])
+
+    def test_unused_keys_do_not_invalidate(self):
+        self._compile()
+        self.pillar['unused'] = 2
+        self.grains['id'] = 'minion2'
+        self._compile()
+        self.assertEqual(self.calls, ['web'])
+
+    def test_used_keys_invalidate(self):
+        self._compile()
+        self.grains['os'] = 'RedHat'
+        self.assertEqual(self._compile(), {'out': 'RedHat-web'})
+        self.assertEqual(self.calls, ['web', 'web'])
+
+    def test_function_access_recorded(self):
+        self.assertEqual(self._compile('function'), {'out': 'minion1'})
+        self._compile('function')
+        self.assertEqual(len(self.calls), 1)
+        self.grains['id'] = 'minion2'
+        self.assertEqual(self._compile('function'), {'out': 'minion2'})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_missing_key_recorded(self):
+        self._compile('missing')
+        self._compile('missing')
+        self.assertEqual(self.calls, ['missing'])
+        self.pillar['absent'] = True
+        self.assertEqual(self._compile('missing'), {'out': True})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_volatile_render_not_cached(self):
+        self._compile('volatile')
+        self._compile('volatile')
+        self.assertEqual(self.calls, ['volatile', 'volatile'])
+
+    def test_other_threads_not_cached(self):
+        self.assertEqual(self._compile('thread'), {'out': 'Debian-web'})
+        # The grain was read by another thread, which the render could not
+        # record
+        self.grains['os'] = 'RedHat'
+        self.assertEqual(self._compile('thread'), {'out': 'RedHat-web'})
+        self.assertEqual(self.calls, ['thread', 'thread'])
+
+    def test_opts_recorded(self):
+        self.assertEqual(self._compile('opts'), {'out': 'minion1'})
+        self._compile('opts')
+        self.assertEqual(self.calls, ['opts'])
+        # The renderers of another minion share the cache of the process
+        opts = dict(self.opts, id='minion2')
+        self.renderers = salt.loader.render(opts, {})
+        self.assertEqual(self._compile('opts'), {'out': 'minion2'})
+
+    def test_globals_not_replaced(self):
+        render_globals = salt.utils.render_cache.render_globals(
+            self.renderers['fake'])
+        grains = render_globals['__grains__']
+        self._compile()
+        self.assertIs(render_globals['__grains__'], grains)
+        self.assertEqual(dict(grains), self.grains)
+
+    def test_result_is_a_copy(self):
+        self._compile()['out'] = 'changed'
+        self.assertEqual(self._compile(), {'out': 'Debian-web'})
+
+    def test_disabled(self):
+        self.opts['render_cache'] = False
+        self.renderers = salt.loader.render(self.opts, {})
+        self.calls = salt.utils.render_cache.render_globals(
+            self.renderers['fake'])['CALLS']
+        self._compile()
+        self._compile()
+        self.assertEqual(self.calls, ['web', 'web'])
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(RenderCacheTestCase, needs_daemon=False)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+from __future__ import absolute_import
+import os
+import shutil
+import tarfile
+import tempfile
+
+# Import Salt Libs
+from salt.utils import thin
+
+# Import Salt Testing Libs
+from salttesting import TestCase, skipIf
+from salttesting.mock import patch, NO_MOCK, NO_MOCK_REASON
+from salttesting.helpers import ensure_in_syspath
+
+ensure_in_syspath('../../')
+
+
+def _make_tar(path, files):
+    '''
+    Write a gzipped tarball with the given files and contents
+    '''
+    root = tempfile.mkdtemp()
+    try:
+        tfp = tarfile.open(path, 'w:gz')
+        for name, content in sorted(files.items()):
+            src = os.path.join(root, name)
+            if not os.path.isdir(os.path.dirname(src)):
+                os.makedirs(os.path.dirname(src))
+            with open(src, 'w') as fp_:
+                fp_.write(content)
+            os.utime(src, (1000, 1000))
+            tfp.add(src, arcname=name)
+        tfp.close()
+    finally:
+        shutil.rmtree(root)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class ThinChunksTestCase(TestCase):
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.thintar = os.path.join(self.cachedir, 'thin.tgz')
+        self.files = {'py2/salt/__init__.py': 'salt',
+                      'py2/salt/minion.py': 'minion',
+                      'py2/jinja2/__init__.py': 'jinja2',
+                      'py2/yaml.py': 'yaml',
+                      'salt-call': 'salt-call',
+                      'version': '2016.11.0'}
+        _make_tar(self.thintar, self.files)
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir)
+
+    def _chunks(self):
+        with patch('salt.utils.thin.gen_thin', return_value=self.thintar):
+            return thin.thin_chunks(self.cachedir)
+
+    def _members(self, chunk):
+        tfp = tarfile.open(thin.thin_chunk_path(self.cachedir, chunk))
+        try:
+            return sorted(tfp.getnames())
+        finally:
+            tfp.close()
+
+    def test_chunks(self):
+        chunks = self._chunks()
+        self.assertEqual(
+            [self._members(chunk) for chunk in chunks],
+            [['py2/yaml.py', 'salt-call', 'version'],
+             ['py2/jinja2/__init__.py'],
+             ['py2/salt/__init__.py', 'py2/salt/minion.py']])
+        self.assertEqual(self._chunks(), chunks)
+
+    def test_chunks_content_addressed(self):
+        chunks = self._chunks()
+        # A new version of salt only changes its chunk and the base one
+        self.files['py2/salt/minion.py'] = 'new minion'
+        self.files['version'] = '2016.11.1'
+        _make_tar(self.thintar, self.files)
+        new_chunks = self._chunks()
+        self.assertEqual(new_chunks[1], chunks[1])
+        self.assertNotEqual(new_chunks[0], chunks[0])
+        self.assertNotEqual(new_chunks[2], chunks[2])
+        # The old chunks are gone
+        self.assertEqual(
+            sorted(name for name in os.listdir(os.path.join(self.cachedir, 'thin', 'chunks'))
+                   if name.endswith('.tgz')),
+            sorted('{0}.tgz'.format(chunk) for chunk in new_chunks))
+
+
+if __name__ == '__main__':
+    from integration import run_tests
+    run_tests(ThinChunksTestCase, needs_daemon=False)
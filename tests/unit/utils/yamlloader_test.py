@@ -8,7 +8,9 @@ from __future__ import absolute_import
 
 # Import Salt Libs
 from yaml.constructor import ConstructorError
-from salt.utils.yamlloader import SaltYamlSafeLoader
+from salt.utils.yamlloader import SaltYamlSafeLoader, SaltYamlPySafeLoader
+from salt.utils.odict import OrderedDict
+import salt.utils.yamlloader
 import salt.utils
 
 # Import Salt Testing Libs
@@ -107,6 +109,80 @@ p2:
   v2: betabeta''')
 
 
+PARITY_DOCUMENTS = (
+    b'''
+top:
+  - alpha
+  - beta: {gamma: delta}
+''',
+    b'''
+perms: 0644
+zero: 0000
+hex: 0x1f
+octal_str: '0755'
+float: 1.5
+bool: yes
+null_value: ~
+''',
+    b'''
+p1: &p1
+  v1: alpha
+p2:
+  <<: *p1
+  v2: beta
+p3:
+  <<: [*p1, {v3: gamma}]
+''',
+    b'''
+explicit_str: !!str 123
+explicit_float: !!float 1
+set: !!set {b, a}
+binary: !!binary aGVsbG8=
+date: 2016-10-01
+''',
+    u'''
+unicode: "\u00e9t\u00e9"
+multi: |
+  line one
+  line two
+folded: >
+  folded
+  text
+'''.encode('utf-8'),
+)
+
+
+class YamlLoaderParityTestCase(TestCase):
+    '''
+    The libyaml backed loader must produce the same data as the pure python
+    one
+    '''
+    @staticmethod
+    def _load(loader, data, dictclass=dict):
+        return loader(data, dictclass=dictclass).get_data()
+
+    def test_loader_base(self):
+        self.assertTrue(issubclass(SaltYamlSafeLoader,
+                                   salt.utils.yamlloader.BaseLoader))
+
+    def test_parity(self):
+        for doc in PARITY_DOCUMENTS:
+            self.assertEqual(self._load(SaltYamlSafeLoader, doc),
+                             self._load(SaltYamlPySafeLoader, doc))
+
+    def test_parity_ordered(self):
+        for doc in PARITY_DOCUMENTS:
+            fast = self._load(SaltYamlSafeLoader, doc, OrderedDict)
+            slow = self._load(SaltYamlPySafeLoader, doc, OrderedDict)
+            self.assertIsInstance(fast, OrderedDict)
+            self.assertEqual(list(fast.items()), list(slow.items()))
+
+    def test_parity_duplicates(self):
+        for loader in (SaltYamlSafeLoader, SaltYamlPySafeLoader):
+            with self.assertRaises(ConstructorError):
+                self._load(loader, b'p1: alpha\np1: beta')
+
+
 if __name__ == '__main__':
     from integration import run_tests
-    run_tests(YamlLoaderTestCase, needs_daemon=False)
+    run_tests(YamlLoaderTestCase, YamlLoaderParityTestCase, needs_daemon=False)